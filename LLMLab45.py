@@ -1,12 +1,24 @@
 import os
+import json
+import time
+import hashlib
+import asyncio
+import weakref
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
 from dotenv import load_dotenv
 from pydantic import Extra
 import requests
-from typing import Any, List, Mapping, Optional, ClassVar
+import httpx
+from requests.adapters import HTTPAdapter
+from typing import Any, Iterator, List, Mapping, Optional, ClassVar
 
-from langchain.callbacks.manager import CallbackManagerForLLMRun
+from langchain.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 from langchain.llms.base import LLM
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.outputs import GenerationChunk
 from langchain_core.prompts import ChatPromptTemplate
 
 from langchain.prompts import PromptTemplate
@@ -15,15 +27,223 @@ from langchain.chains import RetrievalQA
 from langchain_community.vectorstores import FAISS # type: ignore
 from langchain_ollama import OllamaEmbeddings # type: ignore
 
+from rate_limit import rate_limiter, limiter_stats, LLM_EXPECTED_COMPLETION_TOKENS
+from single_flight import SingleFlight
+
 parser = StrOutputParser()
 load_dotenv()
 
+# Maximum in-flight requests per LLM endpoint, shared by every thread in the process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+_endpoint_slots = {}
+_endpoint_slots_lock = threading.Lock()
+
+def endpoint_slot(url):
+    with _endpoint_slots_lock:
+        if url not in _endpoint_slots:
+            _endpoint_slots[url] = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+        return _endpoint_slots[url]
+
+# Pooled keep-alive HTTP client: connection reuse, timeouts and jittered retries
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "180"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (requests.exceptions.SSLError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {"requests": 0, "retries": 0, "failures": 0, "retried_status": 0, "retried_errors": 0,
+          "prompt_tokens": 0, "completion_tokens": 0}
+_stats_lock = threading.Lock()
+
+# Identical requests already in flight (a rerun, the same CV from two sessions) share one response
+LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+llm_flights = SingleFlight()
+
+def flight_key(url, payload):
+    return hashlib.sha256((url + "\0" + json.dumps(payload, sort_keys=True)).encode("utf-8")).hexdigest()
+
+def http_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LLM_POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.verify = False
+            _session = session
+        return _session
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+def client_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["pool_size"] = LLM_POOL_SIZE
+    stats["max_concurrency"] = LLM_MAX_CONCURRENCY
+    stats.update(limiter_stats())
+    stats["coalesced"] = llm_flights.stats["coalesced"]
+    return stats
+
+def estimate_tokens(text):
+    # Rough GPT tokenizer average of ~4 characters per token
+    return max(1, len(text) // 4) if text else 0
+
+def request_tokens(prompt):
+    # Tokens reserved against the rate limit before sending; settled from the usage afterwards
+    return estimate_tokens(prompt) + LLM_EXPECTED_COMPLETION_TOKENS
+
+def record_usage(prompt, body):
+    # Prefer the provider's usage block when the response carries one; returns the total tokens
+    usage = None
+    if isinstance(body, dict):
+        usage = body.get("usage") or (body.get("data") or {}).get("usage")
+    if isinstance(usage, dict) and "prompt_tokens" in usage:
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+    else:
+        content = body
+        if isinstance(body, dict) and isinstance(body.get("data"), dict):
+            content = body["data"].get("content", "")
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content if isinstance(content, str) else str(content))
+    _count("prompt_tokens", prompt_tokens)
+    _count("completion_tokens", completion_tokens)
+    return prompt_tokens + completion_tokens
+
+def _event_text(event):
+    # Pull the text delta out of one streamed event, whatever envelope it uses
+    if isinstance(event, str):
+        return event
+    if not isinstance(event, dict):
+        return ""
+    data = event.get("data")
+    if isinstance(data, dict) and isinstance(data.get("content"), str):
+        return data["content"]
+    if isinstance(data, str):
+        return data
+    for key in ("content", "delta", "text", "token"):
+        if isinstance(event.get(key), str):
+            return event[key]
+    choices = event.get("choices")
+    if choices:
+        delta = choices[0].get("delta") or choices[0].get("message") or {}
+        return delta.get("content") or ""
+    return ""
+
+def iter_stream_text(response):
+    # Yields text as it arrives from a streaming completion: server-sent events,
+    # newline-delimited JSON, or plain chunked text. An endpoint that ignores
+    # stream_response answers with the usual JSON envelope, which is unwrapped whole.
+    content_type = response.headers.get("Content-Type", "")
+    if "charset" not in content_type:
+        # Streams are UTF-8; without a charset requests would hand back bytes (ndjson) or Latin-1 (text/*)
+        response.encoding = "utf-8"
+    if "event-stream" in content_type or "ndjson" in content_type or "jsonl" in content_type:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or line.startswith(":"):
+                continue
+            if line.startswith("data:"):
+                line = line[5:].strip()
+            elif "event-stream" in content_type:
+                continue  # event:/id:/retry: fields
+            if line == "[DONE]":
+                break
+            try:
+                text = _event_text(json.loads(line))
+            except ValueError:
+                text = line
+            if text:
+                yield text
+    elif "json" in content_type:
+        body = response.content.decode("utf-8", "replace")
+        try:
+            text = _event_text(json.loads(body))
+        except ValueError:
+            text = body
+        if text:
+            yield text
+    else:
+        for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+            if chunk:
+                yield chunk if isinstance(chunk, str) else chunk.decode("utf-8", "replace")
+
+def retry_after_seconds(response):
+    # Retry-After is either delta-seconds or an HTTP date
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# Async client: one httpx.AsyncClient (and endpoint semaphore) per event loop
+LLM_ASYNC_CONCURRENCY = int(os.getenv("LLM_ASYNC_CONCURRENCY", "64"))
+ASYNC_RETRY_EXCEPTIONS = (httpx.TransportError,)
+_async_clients = weakref.WeakKeyDictionary()
+_async_slots = weakref.WeakKeyDictionary()
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+def async_http_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            verify=False,
+            limits=httpx.Limits(max_connections=LLM_ASYNC_CONCURRENCY, max_keepalive_connections=LLM_POOL_SIZE),
+            timeout=httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        )
+        _async_clients[loop] = client
+    return client
+
+def async_endpoint_slot(url):
+    loop = asyncio.get_running_loop()
+    slots = _async_slots.setdefault(loop, {})
+    if url not in slots:
+        slots[url] = asyncio.Semaphore(LLM_ASYNC_CONCURRENCY)
+    return slots[url]
+
+def background_loop():
+    # Long-lived event loop on a daemon thread so sync callers (e.g. Streamlit scripts)
+    # can share one async client across batches
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-async-loop", daemon=True).start()
+            _background_loop = loop
+        return _background_loop
+
+def submit_coroutine(coro):
+    # Returns a concurrent.futures.Future resolved on the background loop
+    return asyncio.run_coroutine_threadsafe(coro, background_loop())
+
+def backoff_delay(attempt, retry_after=None):
+    if retry_after is not None:
+        return min(retry_after, LLM_BACKOFF_MAX)
+    # Full jitter keeps parallel workers from retrying in lockstep
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
 class LlamaLLM(LLM):
     llm_url: ClassVar[str] = 'https://api.lab45.ai/v1.1/skills/completion/query'
+    model_name: ClassVar[str] = "gpt-35-turbo-16k"
         
     @property
     def _llm_type(self) -> str:
-        return "gpt-35-turbo-16k"
+        return self.model_name
     
     def _call( # type: ignore
         self,
@@ -36,6 +256,25 @@ class LlamaLLM(LLM):
         if stop is not None:
             raise ValueError("stop kwargs are not permitted.")
 
+        payload = self._payload(prompt, user)
+        if LLM_SINGLE_FLIGHT:
+            return llm_flights.do(flight_key(self.llm_url, payload), lambda: self._complete(prompt, payload))
+        return self._complete(prompt, payload)
+
+    def _complete(self, prompt, payload):
+        headers = self._headers()
+        reserved = request_tokens(prompt)
+
+        response = self._post(payload, headers, tokens=reserved)
+
+       # print("API Response:", response.json())
+        response.raise_for_status()
+
+        body = response.json()  # get the response from the API
+        rate_limiter(self.llm_url).settle(reserved, record_usage(prompt, body))
+        return body
+
+    def _payload(self, prompt, user, stream=False):
         payload = {
         "messages": [
             {
@@ -44,27 +283,157 @@ class LlamaLLM(LLM):
             }
         ],
         "skill_parameters": {
-            "model_name": "gpt-35-turbo-16k",
+            "model_name": self.model_name,
             "max_output_tokens": 4096,
             "temperature": 0,
             "top_k": 5
         },
-        "stream_response": False
+        "stream_response": stream
         }
+        return payload
+
+    def _headers(self):
         token2 = os.environ['TOKEN']
         if token2 is None:
             raise ValueError("TOKEN environment variable is not set.")
         #os.environ["TOKEN"] = "Bearer token|1f9b0b2b-dcb7-4e85-aec3-5a04a5eb25ab|84585ddcc6f8fc5a6872c417e46de733525ba1bc8b0376f69b56e4b0257df6da"
         token = os.getenv("TOKEN")
-        print(token)
         headers = {"Content-Type": "application/json","Authorization": token}
+        return headers
 
-        response = requests.post(self.llm_url, json=payload, headers=headers, verify=False)
+    def _post(self, payload, headers, stream=False, tokens=0):
+        # Every attempt waits for the shared rate limit; tokens is the reservation, given
+        # back when the attempt produces no completion
+        session = http_session()
+        limiter = rate_limiter(self.llm_url)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            limiter.acquire(tokens)
+            _count("requests")
+            try:
+                with endpoint_slot(self.llm_url):
+                    response = session.post(self.llm_url, json=payload, headers=headers, stream=stream,
+                                            timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT))
+            except RETRY_EXCEPTIONS as e:
+                limiter.settle(tokens, 0)
+                if attempt == LLM_MAX_RETRIES:
+                    _count("failures")
+                    raise
+                _count("retries")
+                _count("retried_errors")
+                delay = backoff_delay(attempt)
+                logging.error(f"LLM request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
 
-       # print("API Response:", response.json())
+            if response.status_code not in RETRY_STATUS or attempt == LLM_MAX_RETRIES:
+                if response.status_code >= 400:
+                    _count("failures")
+                    limiter.settle(tokens, 0)
+                return response
+            _count("retries")
+            _count("retried_status")
+            limiter.settle(tokens, 0)
+            delay = backoff_delay(attempt, retry_after_seconds(response))
+            if response.status_code == 429:
+                # Over the provider's quota: hold back everyone sharing the budget, not just this caller
+                limiter.pause(delay)
+            logging.error(f"LLM request returned {response.status_code}, retrying in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+
+    def _stream( # type: ignore
+        self,
+        prompt: str,
+        user: str = "user",
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        if stop is not None:
+            raise ValueError("stop kwargs are not permitted.")
+
+        payload = self._payload(prompt, user, stream=True)
+        headers = self._headers()
+
+        reserved = request_tokens(prompt)
+
+        # Retries only cover the connection phase; once tokens flow we do not replay
+        response = self._post(payload, headers, stream=True, tokens=reserved)
+        response.raise_for_status()
+
+        text = []
+        try:
+            for piece in iter_stream_text(response):
+                text.append(piece)
+                if run_manager:
+                    run_manager.on_llm_new_token(piece)
+                yield GenerationChunk(text=piece)
+        finally:
+            response.close()
+            rate_limiter(self.llm_url).settle(reserved, record_usage(prompt, "".join(text)))
+
+    async def _acall( # type: ignore
+        self,
+        prompt: str,
+        user: str = "user",
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        if stop is not None:
+            raise ValueError("stop kwargs are not permitted.")
+
+        payload = self._payload(prompt, user)
+        if LLM_SINGLE_FLIGHT:
+            return await llm_flights.ado(flight_key(self.llm_url, payload), lambda: self._acomplete(prompt, payload))
+        return await self._acomplete(prompt, payload)
+
+    async def _acomplete(self, prompt, payload):
+        headers = self._headers()
+        reserved = request_tokens(prompt)
+
+        response = await self._apost(payload, headers, tokens=reserved)
         response.raise_for_status()
 
-        return response.json()  # get the response from the API
+        body = response.json()  # get the response from the API
+        rate_limiter(self.llm_url).settle(reserved, record_usage(prompt, body))
+        return body
+
+    async def _apost(self, payload, headers, tokens=0):
+        client = async_http_client()
+        limiter = rate_limiter(self.llm_url)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await limiter.aacquire(tokens)
+            _count("requests")
+            try:
+                async with async_endpoint_slot(self.llm_url):
+                    response = await client.post(self.llm_url, json=payload, headers=headers)
+            except ASYNC_RETRY_EXCEPTIONS as e:
+                limiter.settle(tokens, 0)
+                if attempt == LLM_MAX_RETRIES:
+                    _count("failures")
+                    raise
+                _count("retries")
+                _count("retried_errors")
+                delay = backoff_delay(attempt)
+                logging.error(f"LLM request failed ({e!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUS or attempt == LLM_MAX_RETRIES:
+                if response.status_code >= 400:
+                    _count("failures")
+                    limiter.settle(tokens, 0)
+                return response
+            _count("retries")
+            _count("retried_status")
+            limiter.settle(tokens, 0)
+            delay = backoff_delay(attempt, retry_after_seconds(response))
+            if response.status_code == 429:
+                # Over the provider's quota: hold back everyone sharing the budget, not just this caller
+                limiter.pause(delay)
+            logging.error(f"LLM request returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
 
     @property
     def _identifying_params(self) -> Mapping[str, Any]:
@@ -0,0 +1,382 @@
+# HTTP API around the parsing and layout code, for systems that need resume JSON or documents.
+#
+#   python -m api --host 0.0.0.0 --port 8080
+#
+#   POST /{agent}/parse                    multipart "file"          -> {"file_name", "result"}
+#   POST /{agent}/parse/batch              multipart "files" (many)  -> [{"file_name", "result" | "error"}]
+#   POST /{agent}/render/{layout}          JSON parsed result        -> DOCX/PPTX
+#   POST /{agent}/render/{layout}/batch    JSON list of results      -> streamed ZIP
+#   POST /{agent}/batch/{layout}           multipart "files" (many)  -> parsed and rendered, streamed ZIP
+#   GET  /health, GET /metrics
+#
+# agent is "recruit" or "sales"; layout is a name from the app ("kallisti", ...). The API is its
+# own process: it shares only the on-disk parse cache (and the LLM rate budget, when one is set)
+# with the app and the other tools. Its LLM connection pools, render pool and parse-cache memory
+# tier are its own, shared by the requests it serves. Built on Starlette/uvicorn, which ship
+# with Streamlit.
+import os
+import json
+import time
+import asyncio
+import inspect
+import logging
+import argparse
+import importlib
+import contextlib
+import concurrent.futures
+from functools import partial
+
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from uploads import BytesUpload
+from parse_cache import parse_cache, cache_key
+from export import render_to_bytes, zip_layouts, shutdown_render_pool
+from LLMLab45 import client_stats
+from resume_parser import AGENTS
+from rate_limit import BATCH, llm_priority
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# Requests doing parse/render work at once; more wait up to API_QUEUE_SECONDS, then get a 503
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "16"))
+API_QUEUE_SECONDS = float(os.getenv("API_QUEUE_SECONDS", "30"))
+API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "200"))
+# ZIP bytes buffered ahead of a slow client before rendering pauses
+API_STREAM_BUFFER = 64
+# Size cap for the X-Failed-Files header listing resumes a batch could not parse
+API_FAILED_HEADER_BYTES = 8000
+# A render thread gives up on a client that has not taken a chunk for this long
+API_STREAM_TIMEOUT = float(os.getenv("API_STREAM_TIMEOUT", "60"))
+
+MEDIA_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+_metrics = {"requests": 0, "in_flight": 0, "rejected": 0, "errors": 0, "parsed": 0, "cache_hits": 0,
+            "rendered": 0, "seconds": 0.0, "by_route": {}}
+_slots = None
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _core(request):
+    agent = request.path_params["agent"]
+    if agent not in AGENTS:
+        raise ApiError(404, f"Unknown agent {agent!r}; use one of {', '.join(AGENTS)}")
+    return importlib.import_module(AGENTS[agent])
+
+
+def _layout(core, request):
+    layout = request.path_params["layout"].lower()
+    if layout not in core.LAYOUTS:
+        raise ApiError(404, f"Unknown layout {layout!r}; use one of {', '.join(core.LAYOUTS)}")
+    return core.LAYOUTS[layout]
+
+
+def limited(endpoint):
+    # Request-level concurrency limit. The slot is held until the response (including a
+    # streamed body) has been sent, and errors become JSON.
+    async def wrapper(request):
+        global _slots
+        if _slots is None:
+            _slots = asyncio.Semaphore(API_MAX_CONCURRENCY)
+        route = request.scope["route"].path
+        _metrics["requests"] += 1
+        _metrics["by_route"][route] = _metrics["by_route"].get(route, 0) + 1
+        try:
+            await asyncio.wait_for(_slots.acquire(), API_QUEUE_SECONDS)
+        except asyncio.TimeoutError:
+            _metrics["rejected"] += 1
+            return JSONResponse({"error": "Too many requests in progress"}, status_code=503, headers={"Retry-After": "5"})
+        _metrics["in_flight"] += 1
+        start = time.perf_counter()
+
+        def release():
+            _metrics["in_flight"] -= 1
+            _metrics["seconds"] += time.perf_counter() - start
+            _slots.release()
+
+        try:
+            response = await endpoint(request)
+        except ApiError as e:
+            release()
+            return JSONResponse({"error": str(e)}, status_code=e.status)
+        except Exception as e:
+            release()
+            _metrics["errors"] += 1
+            logging.error(f"API {route} failed: {e}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+        response.background = BackgroundTask(release)
+        return response
+    return wrapper
+
+
+async def parse_upload(core, upload):
+    # Parse cache first, then the async extraction path on this loop's pooled LLM client
+    key = await asyncio.to_thread(cache_key, upload, core.CACHE_VERSION, core.llm.model_name)
+    cached = await asyncio.to_thread(parse_cache.get, key)
+    if cached is not None:
+        _metrics["cache_hits"] += 1
+        return cached
+    resume_text = await asyncio.to_thread(core.read_resume, upload)
+    if not resume_text:
+        raise ValueError("Empty or unreadable resume text.")
+    kwargs = {}
+    if "on_rated" in inspect.signature(core.aparse_resume).parameters:
+        kwargs["on_rated"] = partial(parse_cache.put, key)
+    parsed_result = await core.aparse_resume(resume_text, **kwargs)
+    if not isinstance(parsed_result, dict):
+        raise ValueError("Parsing returned no result.")
+    await asyncio.to_thread(parse_cache.put, key, parsed_result)
+    _metrics["parsed"] += 1
+    return parsed_result
+
+
+async def _uploads(request, field):
+    form = await request.form()
+    files = [item for item in form.getlist(field) if hasattr(item, "filename")]
+    if not files:
+        raise ApiError(400, f"Send the resume(s) as multipart field {field!r}")
+    if len(files) > API_MAX_BATCH:
+        raise ApiError(413, f"At most {API_MAX_BATCH} files per request")
+    return [BytesUpload(await item.read(), item.filename or "resume", item.content_type) for item in files]
+
+
+async def _parse_all(core, uploads):
+    # (file name, result or None, error or None) in upload order. Batches run at batch
+    # priority, so single /parse requests go first for the LLM budget.
+    async def one(upload):
+        try:
+            return upload.name, await parse_upload(core, upload), None
+        except Exception as e:
+            logging.error(f"API: failed to parse {upload.name}: {e}")
+            return upload.name, None, str(e)
+    with llm_priority(BATCH):
+        return await asyncio.gather(*(one(upload) for upload in uploads))
+
+
+async def _json_body(request):
+    try:
+        return await request.json()
+    except ValueError as e:
+        raise ApiError(400, f"Body is not valid JSON: {e}")
+
+
+class _StreamSink:
+    """Write-only file handed to zip_layouts on a worker thread; chunks come out as an async iterator.
+
+    Once the response is over (sent, or the client went away) the sink is closed and any
+    further write raises ConnectionAbortedError, so the rendering thread stops instead of
+    waiting forever on a queue nobody reads.
+    """
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue(API_STREAM_BUFFER)
+        self.closed = False
+
+    def _put(self, item):
+        # Blocks the rendering thread while the client is API_STREAM_BUFFER chunks behind
+        if self.closed:
+            raise ConnectionAbortedError("The client is no longer reading the ZIP")
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        try:
+            future.result(API_STREAM_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.closed = True
+            raise ConnectionAbortedError(f"The client took no data for {API_STREAM_TIMEOUT:.0f}s")
+
+    def write(self, data):
+        self._put(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def seekable(self):
+        return False
+
+    def close(self):
+        if not self.closed:
+            self._put(None)
+
+    def abort(self):
+        # On the event loop: refuse further writes and free a writer blocked on a full queue
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    async def chunks(self):
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
+
+
+def _zip_response(parsed_results, render, file_name):
+    # ZIP entries are rendered (on the render pool for big batches) while earlier bytes stream out
+    sink = _StreamSink(asyncio.get_running_loop())
+
+    def build():
+        try:
+            zip_layouts(parsed_results, render, sink)
+            _metrics["rendered"] += len(parsed_results)
+        except ConnectionAbortedError as e:
+            logging.error(f"API: ZIP stream abandoned: {e}")
+        except Exception as e:
+            logging.error(f"API: ZIP stream failed: {e}")
+        finally:
+            try:
+                sink.close()
+            except ConnectionAbortedError:
+                pass
+
+    async def body():
+        task = asyncio.create_task(asyncio.to_thread(build))
+        try:
+            async for chunk in sink.chunks():
+                yield chunk
+            await task
+        finally:
+            # Also runs when the client disconnects mid-stream
+            sink.abort()
+
+    return StreamingResponse(body(), media_type="application/zip",
+                             headers={"Content-Disposition": f'attachment; filename="{file_name}"'})
+
+
+def _failed_headers(failed, limit=API_FAILED_HEADER_BYTES):
+    # Whole entries are dropped from the end until the JSON fits in one header; the count is always complete
+    shown = dict(failed)
+    header = json.dumps(shown)
+    while len(header) > limit and shown:
+        shown.popitem()
+        header = json.dumps(shown)
+    headers = {"X-Failed-Count": str(len(failed)), "X-Failed-Files": header}
+    if len(shown) < len(failed):
+        headers["X-Failed-Truncated"] = "true"
+    return headers
+
+
+@limited
+async def parse(request):
+    core = _core(request)
+    upload = (await _uploads(request, "file"))[0]
+    try:
+        result = await parse_upload(core, upload)
+    except Exception as e:
+        raise ApiError(422, f"Could not parse {upload.name}: {e}")
+    return JSONResponse({"file_name": upload.name, "result": result})
+
+
+@limited
+async def parse_batch(request):
+    core = _core(request)
+    results = await _parse_all(core, await _uploads(request, "files"))
+    return JSONResponse([
+        {"file_name": name, "result": result} if error is None else {"file_name": name, "error": error}
+        for name, result, error in results
+    ])
+
+
+@limited
+async def render(request):
+    core = _core(request)
+    layout_function = _layout(core, request)
+    parsed_result = await _json_body(request)
+    if not isinstance(parsed_result, dict):
+        raise ApiError(400, "Send one parsed resume as a JSON object")
+    file_name, data = await asyncio.to_thread(render_to_bytes, parsed_result, core.renderer(layout_function))
+    if not file_name:
+        raise ApiError(422, "The layout failed to render this resume")
+    _metrics["rendered"] += 1
+    return Response(data, media_type=MEDIA_TYPES.get(os.path.splitext(file_name)[1], "application/octet-stream"),
+                    headers={"Content-Disposition": f'attachment; filename="{file_name}"'})
+
+
+@limited
+async def render_batch(request):
+    core = _core(request)
+    layout_function = _layout(core, request)
+    body = await _json_body(request)
+    if not isinstance(body, list) or len(body) > API_MAX_BATCH:
+        raise ApiError(400, f"Send a JSON list of at most {API_MAX_BATCH} parsed resumes")
+    # Plain results or [file name, result] pairs as stored by the app and the batch CLI. Checked
+    # here, because once the ZIP starts streaming an error can no longer change the status.
+    parsed_results = []
+    for i, item in enumerate(body):
+        if isinstance(item, dict):
+            parsed_results.append((f"resume-{i}", item))
+        elif isinstance(item, list) and len(item) == 2 and isinstance(item[0], str) and isinstance(item[1], dict):
+            parsed_results.append(tuple(item))
+        else:
+            raise ApiError(400, f"Item {i} is neither a parsed resume object nor a [file name, parsed resume] pair")
+    return _zip_response(parsed_results, core.renderer(layout_function), "resumes.zip")
+
+
+@limited
+async def batch(request):
+    core = _core(request)
+    layout_function = _layout(core, request)
+    results = await _parse_all(core, await _uploads(request, "files"))
+    parsed_results = [(name, result) for name, result, error in results if error is None]
+    failed = {name: error for name, _, error in results if error is not None}
+    response = _zip_response(parsed_results, core.renderer(layout_function), "resumes.zip")
+    if failed:
+        response.headers.update(_failed_headers(failed))
+    return response
+
+
+async def health(request):
+    return JSONResponse({"status": "ok", "in_flight": _metrics["in_flight"]})
+
+
+async def metrics(request):
+    return JSONResponse(dict(_metrics, llm=client_stats(), parse_cache_memory_entries=len(parse_cache.memory),
+                             max_concurrency=API_MAX_CONCURRENCY))
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    shutdown_render_pool()
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/metrics", metrics),
+        Route("/{agent}/parse", parse, methods=["POST"]),
+        Route("/{agent}/parse/batch", parse_batch, methods=["POST"]),
+        Route("/{agent}/render/{layout}", render, methods=["POST"]),
+        Route("/{agent}/render/{layout}/batch", render_batch, methods=["POST"]),
+        Route("/{agent}/batch/{layout}", batch, methods=["POST"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(prog="python -m api", description="Resume parsing and formatting HTTP API.")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8080")))
+    args = parser.parse_args(argv)
+    # One process: the parse cache's memory tier, LLM connection pools and render pool are shared by every request
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
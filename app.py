@@ -6,6 +6,7 @@ import logging
 import bcrypt
 from doc_gen import recruit_agent, pd2csv
 import ppt
+from spill_store import remember_results
 from pydantic import BaseModel
 
 from dotenv import dotenv_values, set_key
@@ -54,13 +55,13 @@ user = User(username="admin", password="password123")
 # Recruit Agent
 def show_recruit_agent():
         parsed_result = recruit_agent()
-        st.session_state.resumes.append(parsed_result)
+        st.session_state.resumes = remember_results(st.session_state.resumes, parsed_result)
 # Sales Agent
 def show_sales_agent():
         st.markdown("### 📈 Sales Agent")
         st.write("Generate a one-slide PowerPoint presentation for the given profile.")
         parsed_result = ppt.ppt_call()
-        st.session_state.resumes.append(parsed_result)
+        st.session_state.resumes = remember_results(st.session_state.resumes, parsed_result)
 
 # Admin Page
 def show_admin_page():
@@ -0,0 +1,75 @@
+import io
+import os
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+
+from PIL import Image
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+ASSET_DIR = os.getenv("ASSET_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "New folder"))
+# Images bigger than this (longest side, px) are downsampled once at load; placed logos never need more
+ASSET_MAX_PX = int(os.getenv("ASSET_MAX_PX", "1024"))
+
+LOGO = os.path.join(ASSET_DIR, "Wipro_Primary Logo_Color_RGB.png")
+
+# data is the encoded image; sha1 matches the digest python-pptx uses to share image parts
+Asset = namedtuple("Asset", "path data sha1 width height")
+
+_assets = {}
+_assets_lock = threading.Lock()
+
+
+def _load(path, max_px):
+    with open(path, "rb") as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()  # decodes the whole image, so truncated or corrupt files fail here
+        width, height = image.size
+        if max_px and max(width, height) > max_px:
+            image.thumbnail((max_px, max_px), Image.LANCZOS)
+            width, height = image.size
+            resized = io.BytesIO()
+            image.save(resized, format="PNG", optimize=True)
+            data = resized.getvalue()
+    return Asset(path, data, hashlib.sha1(data).hexdigest(), width, height)
+
+
+def asset(path, max_px=ASSET_MAX_PX):
+    """The image at path, read, validated and downsampled once per process.
+
+    Returns None (logged once) for missing or unreadable files, which callers treat like the
+    old os.path.exists() check. Later calls are served from memory.
+    """
+    if not path:
+        return None
+    key = (os.path.abspath(path), max_px)
+    with _assets_lock:
+        if key in _assets:
+            return _assets[key]
+        try:
+            loaded = _load(path, max_px)
+        except (OSError, ValueError) as e:
+            logging.error(f"Image asset {path} unavailable: {e}")
+            loaded = None
+        _assets[key] = loaded
+        return loaded
+
+
+def asset_stream(path, max_px=ASSET_MAX_PX):
+    # A fresh in-memory file for APIs that read images from a stream (python-pptx add_picture)
+    loaded = asset(path, max_px)
+    return io.BytesIO(loaded.data) if loaded else None
+
+
+def asset_version(*paths):
+    # Content hash of the assets an export embeds, for cache keys: a new logo means new bundles
+    return "/".join((asset(path).sha1[:12] if asset(path) else "none") for path in paths)
+
+
+def preload(*paths, max_px=ASSET_MAX_PX):
+    # Load at process start so the first render or rerun does not pay for it
+    return [asset(path, max_px) for path in paths]
@@ -0,0 +1,84 @@
+# Benchmark PDF text extraction backends over a folder of sample resumes.
+#
+#   python bench_extract.py ./sample_cvs --backend full --backend fast --workers 4
+#
+# Each backend runs in a fresh interpreter so peak RSS is not polluted by the others.
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+from pdf_extract import BACKENDS, extract_pages, page_count, shutdown_pool
+
+
+def _pdfs(folder):
+    for root, _, files in sorted(os.walk(folder)):
+        for file in sorted(files):
+            if file.lower().endswith(".pdf"):
+                yield os.path.join(root, file)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS; children covers the page process pool
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / scale, children / scale
+
+
+def run_backend(folder, backend, workers):
+    files = pages = chars = 0
+    start = time.perf_counter()
+    for path in _pdfs(folder):
+        with open(path, "rb") as f:
+            data = f.read()
+        texts = extract_pages(data, backend, workers=workers)
+        files += 1
+        pages += page_count(data, backend)
+        chars += sum(len(text) for text in texts)
+    elapsed = time.perf_counter() - start
+    shutdown_pool()  # reap workers so their RSS shows up in RUSAGE_CHILDREN
+    own, children = _peak_rss_mb()
+    return {
+        "backend": backend,
+        "workers": workers,
+        "files": files,
+        "pages": pages,
+        "chars": chars,
+        "seconds": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed else 0.0,
+        "peak_rss_mb": own,
+        "peak_child_rss_mb": children,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark read_resume PDF extraction backends.")
+    parser.add_argument("folder", help="folder of sample PDF resumes")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS), help="backend(s) to run (default: all)")
+    parser.add_argument("--workers", type=int, default=1, help="process-pool workers for large PDFs")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    backends = args.backend or sorted(BACKENDS)
+    if args.single:
+        print(json.dumps(run_backend(args.folder, backends[0], args.workers)))
+        return
+
+    print(f"{'backend':<8} {'files':>6} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'rss MB':>7} {'child MB':>9}")
+    for backend in backends:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), args.folder, "--backend", backend,
+             "--workers", str(args.workers), "--single"],
+            check=True, capture_output=True, text=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{backend:<8} {result['files']:>6} {result['pages']:>6} {result['seconds']:>8.2f} "
+              f"{result['pages_per_sec']:>8.1f} {result['peak_rss_mb']:>7.1f} {result['peak_child_rss_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Benchmark per-document render time of the DOCX/PPTX layouts.
+#
+#   python bench_render.py --count 200
+#   python bench_render.py --results ~/Documents/resumeparser/spill/<batch>.jsonl --layout layout2
+#   python bench_render.py --writer python-docx --writer xml
+#   python bench_render.py --count 200 --bundle --workers 1 --workers 8
+#
+# Parsed results come from a spilled batch (JSON lines of [file_name, parsed_result]) or are
+# synthesised. The first render of each layout includes compiling its template and is reported apart.
+# --bundle times whole ZIP exports instead, serial versus the render process pool.
+import io
+import json
+import time
+import argparse
+
+import doccreation
+import pptcreation
+from docx_template import WRITERS
+from export import Renderer, zip_layouts, shutdown_render_pool
+
+LAYOUTS = {
+    "layout1": doccreation.layout1,
+    "layout2": doccreation.layout2,
+    "layout3": doccreation.layout3,
+    "layout4": doccreation.layout4,
+    "generate_formatted_resume": doccreation.generate_formatted_resume,
+    "layout5": pptcreation.layout5,
+}
+
+
+def synthetic_resume(i):
+    return {
+        "Name": f"Candidate {i}",
+        "Email": f"candidate{i}@example.com",
+        "Phone": "+1 555 0100",
+        "LinkedIn": f"linkedin.com/in/candidate{i}",
+        "Address": "1 Main Street",
+        "Summary": "Engineer with a track record of shipping reliable systems. " * 4,
+        "Skills": [f"Skill {k}" for k in range(12)],
+        "Education": [
+            {"Institution": "State University", "Degree": "BSc", "Field": "Computer Science"},
+            {"Institution": "Tech Institute", "Degree": "MSc", "Field": "Data Science"},
+        ],
+        "Experience": [
+            {"Company": f"Company {k}", "Duration": "2019 - 2022", "Title": "Software Engineer",
+             "Roles and Responsibilities": [f"Delivered project {j} end to end" for j in range(5)]}
+            for k in range(4)
+        ],
+    }
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)[1] for line in f if line.strip()]
+
+
+def run_layout(name, results, writer=None):
+    render = LAYOUTS[name]
+    if writer and name != "layout5":
+        render = lambda parsed_result, sink, layout=render: layout(parsed_result, sink, writer=writer)
+    start = time.perf_counter()
+    render(results[0], io.BytesIO())
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    size = 0
+    for parsed_result in results:
+        sink = io.BytesIO()
+        render(parsed_result, sink)
+        size += sink.tell()
+    elapsed = time.perf_counter() - start
+    return {
+        "layout": name,
+        "writer": writer if name != "layout5" else "pptx",
+        "docs": len(results),
+        "first_ms": first * 1000,
+        "ms_per_doc": elapsed * 1000 / len(results),
+        "docs_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "kb_per_doc": size / 1024 / len(results),
+    }
+
+
+def run_bundle(name, results, writer, workers):
+    kwargs = {"writer": writer} if name != "layout5" else {}
+    render = Renderer(LAYOUTS[name], **kwargs)
+    parsed_results = [(f"resume-{i}.pdf", parsed_result) for i, parsed_result in enumerate(results)]
+    zip_layouts(parsed_results, render, workers=workers)  # warm the pool and compiled templates
+    start = time.perf_counter()
+    size = zip_layouts(parsed_results, render, workers=workers).seek(0, io.SEEK_END)
+    elapsed = time.perf_counter() - start
+    return {"docs": len(results), "seconds": elapsed, "docs_per_sec": len(results) / elapsed, "zip_mb": size / 1024 / 1024}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark resume layout rendering.")
+    parser.add_argument("--results", help="spilled batch (.jsonl) of parsed results to render")
+    parser.add_argument("--count", type=int, default=100, help="synthetic resumes to render when --results is not given")
+    parser.add_argument("--layout", action="append", choices=sorted(LAYOUTS), help="layout(s) to run (default: all)")
+    parser.add_argument("--writer", action="append", choices=WRITERS, help="DOCX writer(s) to run (default: DOCX_WRITER)")
+    parser.add_argument("--bundle", action="store_true", help="time whole ZIP exports instead of single documents")
+    parser.add_argument("--workers", type=int, action="append", help="render pool size(s) for --bundle (default: 1 and RENDER_WORKERS)")
+    args = parser.parse_args(argv)
+
+    results = load_results(args.results) if args.results else [synthetic_resume(i) for i in range(args.count)]
+    if args.bundle:
+        from export import RENDER_WORKERS
+        print(f"{'layout':<26} {'writer':<12} {'workers':>7} {'docs':>5} {'seconds':>8} {'docs/s':>8} {'ZIP MB':>7}")
+        for writer in args.writer or [doccreation.BULK_DOCX_WRITER]:
+            for name in args.layout or list(LAYOUTS):
+                for workers in args.workers or [1, RENDER_WORKERS]:
+                    result = run_bundle(name, results, writer, workers)
+                    print(f"{name:<26} {writer:<12} {workers:>7} {result['docs']:>5} {result['seconds']:>8.2f} "
+                          f"{result['docs_per_sec']:>8.1f} {result['zip_mb']:>7.1f}")
+        shutdown_render_pool()
+        return
+
+    print(f"{'layout':<26} {'writer':<12} {'docs':>5} {'first ms':>9} {'ms/doc':>8} {'docs/s':>8} {'KB/doc':>7}")
+    writers = args.writer or [doccreation.DOCX_WRITER]
+    for writer in writers:
+        for name in args.layout or list(LAYOUTS):
+            if name == "layout5" and writer != writers[0]:
+                continue  # PPTX has a single writer
+            result = run_layout(name, results, writer)
+            print(f"{name:<26} {result['writer']:<12} {result['docs']:>5} {result['first_ms']:>9.1f} {result['ms_per_doc']:>8.2f} "
+                  f"{result['docs_per_sec']:>8.1f} {result['kb_per_doc']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Check that the "xml" DOCX writer produces the same documents as the python-docx writer.
+#
+#   python check_docx_writer.py
+#   python check_docx_writer.py --results ~/Documents/resumeparser/spill/<batch>.jsonl
+#
+# The python-docx output is the golden file: every XML part of each layout is rendered by
+# both writers and compared after canonicalisation (C14N). Zip metadata such as timestamps
+# is not compared. Exits non-zero on the first mismatch.
+import io
+import sys
+import zipfile
+import argparse
+
+from lxml import etree
+
+import doccreation
+from bench_render import synthetic_resume, load_results
+
+LAYOUTS = {
+    "layout1": doccreation.layout1,
+    "layout2": doccreation.layout2,
+    "layout3": doccreation.layout3,
+    "layout4": doccreation.layout4,
+    "generate_formatted_resume": doccreation.generate_formatted_resume,
+}
+
+
+def edge_cases():
+    # Inputs that exercise escaping, whitespace, breaks and missing/empty sections
+    return [
+        {"Name": "Only Name"},
+        {},
+        {
+            "Name": "  Zoë <O'Brien> & Co  ",
+            "Email": "",
+            "Phone": "+44\t020 7946 0000",
+            "LinkedIn": "linkedin.com/in/zoe?x=1&y=2",
+            "Address": "Line one\nLine two\r\nLine three",
+            "Summary": "Leading and trailing spaces   ",
+            "Skills": ["C++ & Rust", "", "\tIndented", "Ünïcödé ✓"],
+            "Education": [{"Institution": "", "Degree": "BSc", "Field": ""}],
+            "Experience": [
+                {"Company": "", "Duration": "", "Title": "", "Roles and Responsibilities": ["", "a > b", "x\ny"]},
+                {"Company": "Acme"},
+            ],
+        },
+    ]
+
+
+def parts(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        return {
+            name: etree.tostring(etree.fromstring(zipf.read(name)), method="c14n")
+            for name in zipf.namelist()
+            if name.endswith(".xml") or name.endswith(".rels")
+        }
+
+
+def render(layout, parsed_result, writer):
+    sink = io.BytesIO()
+    file_name = layout(parsed_result, sink, writer=writer)
+    return file_name, sink.getvalue()
+
+
+def check(results):
+    checked = 0
+    for name, layout in LAYOUTS.items():
+        for i, parsed_result in enumerate(results):
+            golden_name, golden = render(layout, parsed_result, "python-docx")
+            file_name, data = render(layout, parsed_result, "xml")
+            if golden_name != file_name:
+                return f"{name} #{i}: file name {file_name!r} != {golden_name!r}"
+            if golden_name is None:
+                continue
+            expected, actual = parts(golden), parts(data)
+            if sorted(expected) != sorted(actual):
+                return f"{name} #{i}: parts differ: {sorted(set(expected) ^ set(actual))}"
+            for part in expected:
+                if expected[part] != actual[part]:
+                    return f"{name} #{i}: {part} differs"
+            checked += 1
+    print(f"OK: {checked} documents identical across writers")
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the xml DOCX writer against python-docx.")
+    parser.add_argument("--results", help="spilled batch (.jsonl) of parsed results to check as well")
+    args = parser.parse_args(argv)
+
+    results = edge_cases() + [synthetic_resume(i) for i in range(3)]
+    if args.results:
+        results += load_results(args.results)
+    error = check(results)
+    if error:
+        print(f"MISMATCH: {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
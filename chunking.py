@@ -0,0 +1,182 @@
+import os
+import re
+import json
+import asyncio
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from LLMLab45 import estimate_tokens
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# Resume text above this many (estimated) tokens is split and extracted chunk by chunk
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", "8000"))
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", "4"))
+
+PAGE_BREAK = "\f"
+SECTION_HEADING = re.compile(
+    r"^\s*(profile|summary|professional summary|career summary|objective|experience|work experience|"
+    r"professional experience|employment history|experience and accomplishments|projects|education|"
+    r"academic profile|qualifications|skills|technical skills|key skills|certifications|achievements|"
+    r"accomplishments|personal details)\s*:?\s*$",
+    re.IGNORECASE,
+)
+# Fields that identify "the same" entry when two chunks both extracted it
+IDENTITY_FIELDS = ("Title", "Company", "Degree", "Institution")
+
+_pool = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="chunk")
+
+
+def _blocks(text):
+    # Pages first, then sections within a page
+    for page in text.split(PAGE_BREAK):
+        block = []
+        for line in page.splitlines():
+            if SECTION_HEADING.match(line) and block:
+                yield "\n".join(block)
+                block = []
+            block.append(line)
+        if block:
+            yield "\n".join(block)
+
+
+def _split_oversized(block, budget):
+    # A single section larger than the budget falls back to line, then character, splits
+    pieces, current, size = [], [], 0
+    for line in block.splitlines():
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            step = budget * 4
+            pieces.extend(line[i:i + step] for i in range(0, len(line), step))
+            continue
+        if size + cost > budget and current:
+            pieces.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += cost
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_resume(text, budget=CHUNK_TOKEN_BUDGET):
+    # Packs page/section blocks greedily into chunks of at most `budget` tokens
+    if estimate_tokens(text) <= budget:
+        return [text]
+    chunks, current, size = [], [], 0
+    for block in _blocks(text):
+        cost = estimate_tokens(block) + 1
+        parts = [block] if cost <= budget else _split_oversized(block, budget)
+        for part in parts:
+            cost = estimate_tokens(part) + 1
+            if size + cost > budget and current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(part)
+            size += cost
+    if current:
+        chunks.append("\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def _norm(value):
+    if isinstance(value, dict):
+        return json.dumps({k: _norm(v) for k, v in value.items()}, sort_keys=True)
+    if isinstance(value, list):
+        return json.dumps([_norm(item) for item in value])
+    return " ".join(str(value).lower().split())
+
+
+def _identity(entry):
+    identity = tuple(_norm(entry[field]) for field in IDENTITY_FIELDS if entry.get(field))
+    return identity or _norm(entry)
+
+
+def _is_empty(value):
+    return value is None or value == "" or value == [] or value == {} or value == "N/A"
+
+
+def _merge_lists(first, second):
+    merged = list(first)
+    seen = {}
+    for position, item in enumerate(merged):
+        seen[_identity(item) if isinstance(item, dict) else _norm(item)] = position
+    for item in second:
+        key = _identity(item) if isinstance(item, dict) else _norm(item)
+        if key in seen:
+            position = seen[key]
+            if isinstance(item, dict) and isinstance(merged[position], dict):
+                merged[position] = merge_values(merged[position], item)
+        elif not _is_empty(item):
+            seen[key] = len(merged)
+            merged.append(item)
+    return merged
+
+
+def merge_values(first, second):
+    # Deterministic: earlier chunks win for scalars, lists are unioned in order of first appearance
+    if _is_empty(first):
+        return second
+    if _is_empty(second):
+        return first
+    if isinstance(first, dict) and isinstance(second, dict):
+        merged = dict(first)
+        for key, value in second.items():
+            merged[key] = merge_values(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(first, list) or isinstance(second, list):
+        return _merge_lists(first if isinstance(first, list) else [first],
+                            second if isinstance(second, list) else [second])
+    return first
+
+
+def merge_results(partials):
+    merged = None
+    for partial in partials:
+        if isinstance(partial, dict):
+            merged = partial if merged is None else merge_values(merged, partial)
+    return merged
+
+
+def _outcome(partial):
+    # (partial, error) for one chunk; anything but a dict means the chunk was lost
+    if isinstance(partial, dict):
+        return partial, None
+    return None, "extraction returned no result"
+
+
+def _extract(extract, chunk):
+    try:
+        return _outcome(extract(chunk))
+    except Exception as e:
+        logging.error(f"Error extracting resume chunk: {e}")
+        return None, str(e)
+
+
+def _merged(outcomes):
+    # One lost chunk fails the whole resume: a merge missing whole sections must not be
+    # cached, checkpointed or reported as a complete parse
+    errors = [error for _, error in outcomes if error is not None]
+    if errors:
+        raise ValueError(f"{len(errors)} of {len(outcomes)} resume chunks could not be extracted: {errors[0]}")
+    return merge_results([partial for partial, _ in outcomes])
+
+
+def map_chunks(chunks, extract):
+    # Extract every chunk in parallel, then merge in chunk order. Each chunk runs in a copy of
+    # the caller's context so its LLM requests keep the caller's priority.
+    futures = [_pool.submit(contextvars.copy_context().run, _extract, extract, chunk) for chunk in chunks]
+    return _merged([future.result() for future in futures])
+
+
+async def amap_chunks(chunks, aextract):
+    async def extract(chunk):
+        try:
+            return _outcome(await aextract(chunk))
+        except Exception as e:
+            logging.error(f"Error extracting resume chunk: {e}")
+            return None, str(e)
+
+    return _merged(await asyncio.gather(*(extract(chunk) for chunk in chunks)))
@@ -0,0 +1,156 @@
+# Compare the "summarise" and "direct" extraction modes over a local folder of resumes.
+#
+#   python compare_extraction.py ./sample_cvs --agent recruit --limit 20 --json report.json
+#
+# Reports latency, LLM tokens and field-level agreement between the two modes so a
+# deployment can pick EXTRACTION_MODE from measured numbers.
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+from uploads import LocalUpload, iter_resume_files
+from LLMLab45 import client_stats
+
+MODES = ("summarise", "direct")
+IDENTITY_FIELDS = ("Title", "Company", "Degree", "Institution")
+
+
+def _norm(value):
+    if isinstance(value, dict):
+        identity = [_norm(value[field]) for field in IDENTITY_FIELDS if value.get(field)]
+        if identity:
+            return " | ".join(identity)
+        return json.dumps({k: _norm(v) for k, v in value.items()}, sort_keys=True)
+    if isinstance(value, list):
+        return json.dumps(sorted(_norm(item) for item in value))
+    return " ".join(str(value).lower().split())
+
+
+def field_agreement(a, b):
+    # 1.0 for identical fields, Jaccard overlap for lists, 0.0 otherwise
+    if a in (None, "", [], {}) and b in (None, "", [], {}):
+        return 1.0
+    if isinstance(a, list) or isinstance(b, list):
+        items_a = {_norm(item) for item in (a if isinstance(a, list) else [a]) if item}
+        items_b = {_norm(item) for item in (b if isinstance(b, list) else [b]) if item}
+        union = items_a | items_b
+        return len(items_a & items_b) / len(union) if union else 1.0
+    return 1.0 if _norm(a) == _norm(b) else 0.0
+
+
+def run_mode(parse_resume, resume_text, mode):
+    # A failed parse is recorded with the time and tokens it spent, so it counts against its mode
+    before = client_stats()
+    start = time.perf_counter()
+    error = None
+    try:
+        result = parse_resume(resume_text, mode=mode)
+        if not isinstance(result, dict):
+            error = "Parsing returned no result."
+    except Exception as e:
+        result, error = None, str(e)
+    elapsed = time.perf_counter() - start
+    after = client_stats()
+    tokens = (after["prompt_tokens"] - before["prompt_tokens"]) + (after["completion_tokens"] - before["completion_tokens"])
+    run = {"ok": error is None, "seconds": elapsed, "tokens": tokens, "calls": after["requests"] - before["requests"]}
+    if error is None:
+        run["result"] = result
+    else:
+        run["error"] = error
+    return run
+
+
+def compare(folder, agent="recruit", limit=None):
+    # The *_core modules carry the parsing without the Streamlit pages; the background quality
+    # rating is switched off so its LLM calls do not land in either mode's numbers
+    if agent == "sales":
+        from sales_core import read_resume, parse_resume
+    else:
+        from recruit_core import read_resume, parse_resume
+        from rating import rating_stage
+        rating_stage.mode = "off"
+
+    rows = []
+    for path in list(iter_resume_files(folder))[:limit]:
+        name = os.path.basename(path)
+        try:
+            resume_text = read_resume(LocalUpload(path))
+        except Exception as e:
+            print(f"skip {name}: {e}", file=sys.stderr)
+            continue
+        if not resume_text:
+            print(f"skip {name}: unreadable", file=sys.stderr)
+            continue
+        row = {"file": name}
+        for mode in MODES:
+            row[mode] = run_mode(parse_resume, resume_text, mode)
+            if not row[mode]["ok"]:
+                print(f"{name}: {mode} failed: {row[mode]['error']}", file=sys.stderr)
+        if row["summarise"]["ok"] and row["direct"]["ok"]:
+            a, b = row["summarise"]["result"], row["direct"]["result"]
+            row["agreement"] = {field: field_agreement(a.get(field), b.get(field)) for field in sorted(set(a) | set(b))}
+        rows.append(row)
+        print(f"{name}: summarise {row['summarise']['seconds']:.1f}s / direct {row['direct']['seconds']:.1f}s", file=sys.stderr)
+    return rows
+
+
+def summarise_report(rows):
+    report = {"files": len(rows), "modes": {}, "agreement": {}}
+    for mode in MODES:
+        runs = [row[mode] for row in rows]
+        ok = [run for run in runs if run["ok"]]
+        report["modes"][mode] = {
+            "success": len(ok),
+            "failure_rate": 1 - len(ok) / len(runs) if runs else 0.0,
+            "mean_seconds": statistics.mean(run["seconds"] for run in runs) if runs else 0.0,
+            "median_seconds": statistics.median(run["seconds"] for run in runs) if runs else 0.0,
+            "mean_tokens": statistics.mean(run["tokens"] for run in runs) if runs else 0.0,
+            "mean_calls": statistics.mean(run["calls"] for run in runs) if runs else 0.0,
+        }
+    per_field = {}
+    for row in rows:
+        for field, score in row.get("agreement", {}).items():
+            per_field.setdefault(field, []).append(score)
+    report["agreement"] = {field: statistics.mean(scores) for field, scores in sorted(per_field.items())}
+    if per_field:
+        report["overall_agreement"] = statistics.mean(report["agreement"].values())
+    return report
+
+
+def print_report(report):
+    print(f"Resumes compared: {report['files']}")
+    print(f"{'mode':<10} {'ok':>4} {'failed':>7} {'mean s':>8} {'median s':>9} {'tokens':>8} {'calls':>6}")
+    for mode, stats in report["modes"].items():
+        print(f"{mode:<10} {stats['success']:>4} {stats['failure_rate']:>7.1%} {stats['mean_seconds']:>8.2f} {stats['median_seconds']:>9.2f} "
+              f"{stats['mean_tokens']:>8.0f} {stats['mean_calls']:>6.1f}")
+    if report["agreement"]:
+        print("\nField agreement (summarise vs direct):")
+        for field, score in report["agreement"].items():
+            print(f"  {field:<50} {score:6.1%}")
+        print(f"  {'overall':<50} {report['overall_agreement']:6.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare summarise-then-extract with direct extraction.")
+    parser.add_argument("folder", help="folder of PDF/DOCX resumes")
+    parser.add_argument("--agent", choices=("recruit", "sales"), default="recruit", help="which prompt set to use")
+    parser.add_argument("--limit", type=int, default=None, help="only compare the first N resumes")
+    parser.add_argument("--json", dest="json_path", help="also write the full report (including results) here")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        parser.error(f"{args.folder} is not a folder")
+
+    rows = compare(args.folder, args.agent, args.limit)
+    report = summarise_report(rows)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"report": report, "rows": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,180 +4,61 @@ import streamlit as st
 from docx import Document
 import logging
 import random
-import pdfplumber
 import json
 import os
-import zipfile
+import io
+from export import bundle_key, cached_bundle, memoised_bundle
+from assets import ASSET_DIR, asset, preload
 import pandas as pd
-from doccreation import layout3, layout1, layout2 # docx templates for different layouts
-from pydantic import BaseModel
-from typing import List
-from langchain.prompts import PromptTemplate
-from LLMLab45 import LlamaLLM  # Your custom LLM wrapper
+import recruit_core
+from doccreation import TEMPLATE_VERSION
+from recruit_core import CACHE_VERSION, llm, layout3, layout1, layout2, renderer, layout_id
+from ingest import process_uploads
 
 # Configure logging to enabled
 logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
  
-# Define the Pydantic model for structured output
-class Resume(BaseModel):
-    name: str
-    email: str
-    phone: str
-    linkedin: str
-    summary: str
-    skills: List[str]
-    certifications: List[str]
-    experience: List[dict]
-    education: List[dict]
-
-# Prompt template for resume parsing
-prompt_template = PromptTemplate(
-    input_variables=["resume_text"],
-    template="""
-    Extract the following information from the resume:
-    - Name
-    - Email
-    - Phone
-    - Linkedin Look for any linkedin.com profile mentioned in the resume
-    - Summary
-    - Skills
-    - Certifications
-    - Experience with Roles and Responsibilities
-    - Education OR Academic Profile
- 
-    Provide the output in JSON format with the following keys:
-    - Name
-    - Email
-    - Phone
-    - Linkedin
-    - Summary
-    - Skills
-    - Certifications
-    - Experience
-    - Education
- 
-    For each experience, extract:
-    - Title
-    - Company
-    - Duration
-    - Roles and Responsibilities (as a list)
- 
-    For each education entry, extract:
-    - Degree
-    - Institution
-    - Duration or Year
- 
-    Resume text:
-    {resume_text}
-    """
-)
- 
-# Initialize LLM
-llm = LlamaLLM()
- 
+# Prompts, extraction and layouts live in recruit_core (shared with the headless CLI);
+# these wrappers report failures in the UI the way the app always has
 def read_resume(uploaded_file):
     try:
-        if uploaded_file.type == "text/plain":
-            return uploaded_file.read().decode("utf-8")
-        elif uploaded_file.type == "application/pdf":
-            with pdfplumber.open(uploaded_file) as pdf:
-                #return "".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-                text = ""
-                for page in pdf.pages:
-                    # Extract regular text
-                    if page.extract_text():
-                        text += page.extract_text() + "\n"
- 
-                    # Extract tables
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            text += "\t".join(cell if cell else "" for cell in row) + "\n"
-            return text
-        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            doc = Document(uploaded_file)
-            return "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        else:
-            raise ValueError("Unsupported file type")
+        return recruit_core.read_resume(uploaded_file)
     except Exception as e:
         logging.error(f"Error reading resume: {e}")
         st.error("Please try to upload again")
         return None
 
-#New Code 
-def parse_resume(resume_text):
+def parse_resume(resume_text, on_rated=None, mode=None, on_field=None):
     try:
-        summarised_text = llm._call(
-            "Kindly provide summary of profile, ensuring to include full name, email address, phone number, only single list of technical skills without categorizing, details of business capabilities, an overview of functional capabilities and complete professional experience along with roles and responsibilities if any,special notes read the entire profile before summarising as there can be multiple prifile formats emmeded one below another, Read profile till the end and the summarise" + resume_text,
-            user="user"
-        )
-        formatted_prompt = prompt_template.format(resume_text=summarised_text)
-        parsed_response = llm._call(prompt=formatted_prompt, user="user")
-        #st.write(parsed_response)
-
-        # Self Correcting Prompt ################################
-
-        prompt_temp = "Kindly provide summary of profile, ensuring to include full name, email address, phone number, only single list of technical skills without categorizing, details of business capabilities, an overview of functional capabilities and complete professional experience along with roles and responsibilities if any,special notes read the entire profile before summarising as there can be multiple prifile formats emmeded one below another, Read profile till the end and the summarise"
-
-        prompt_template2 = PromptTemplate(
-            input_variables=["parsed_response","prompt_temp"],
-            template="""
-            Please process the following parsed response, ensure it is correct as per following instructions {prompt_temp} and rate the relevance in match with {parsed_response}, provide rating from 1 to 10 and why the rating is provided:
-            """
-        )
-
-        try:
-            parsed_response2 = llm._call(prompt_template2.format(parsed_response=parsed_response, prompt_temp=prompt_temp), user="user")
-            #st.write(parsed_response2)
-        except Exception as e:
-            logging.error(f"Error in additional processing: {e}")
-            st.error("Please try to upload again")
-            return None
-
-        # ####################################################################
-
-        if isinstance(parsed_response, tuple):
-            parsed_response = parsed_response[0]
-
-        if isinstance(parsed_response, dict) and "data" in parsed_response and "content" in parsed_response["data"]: # type: ignore
-            parsed_text = parsed_response["data"]["content"] # type: ignore
-        else:
-            parsed_text = parsed_response
-
-        if isinstance(parsed_text, str):
-            parsed_text = parsed_text.strip()
-            if parsed_text.startswith("```json"):
-                parsed_text = parsed_text.replace("```json", "").strip()
-            if parsed_text.endswith("```"):
-                parsed_text = parsed_text.replace("```", "").strip()
-                print(type(parsed_text))
-            parsed_resume = json.loads(parsed_text)
-            
-            return parsed_resume
+        return recruit_core.parse_resume(resume_text, on_rated, mode, on_field)
     except Exception as e:
         logging.error(f"Error parsing resume: {e}")
         st.error("Please try to upload again")
         return None
- 
+
+async def aparse_resume(resume_text, on_rated=None, mode=None):
+    # Runs on the background event loop, which cannot reach the page: the error is raised
+    # and process_uploads reports it on the script thread
+    try:
+        return await recruit_core.aparse_resume(resume_text, on_rated, mode)
+    except Exception as e:
+        logging.error(f"Error parsing resume: {e}")
+        raise ValueError("Please try to upload again") from e
+
 # ... [imports and initial setup remain unchanged] ...
  
 # Helper function to generate and offer download
 def generate_and_offer_download(parsed_result, layout_function):
     try:
-        save_path = os.path.join(os.path.expanduser("~"), "Documents", "resumeparser")
-        os.makedirs(save_path, exist_ok=True)
-        resume_json = json.dumps(parsed_result)
-        file_path = layout_function(resume_json, save_path)
- 
-        if file_path:
-            file_name = os.path.basename(file_path)
-            with open(file_path, "rb") as f:
-                st.download_button(
-                    label="⬇️ Download",
-                    data=f.read(),
-                    file_name=file_name,
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
+        sink = io.BytesIO()
+        file_name = layout_function(parsed_result, sink)
+        if file_name:
+            st.download_button(
+                label="⬇️ Download",
+                data=sink.getvalue(),
+                file_name=file_name,
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            )
             #st.success("Resume generated and ready for download!")
         else:
             logging.error("Failed to generate resume. Please check the logs or try again.")
@@ -199,29 +80,14 @@ def option_three(parsed_result):
     st.success("Layout 3 selected!")
     generate_and_offer_download(parsed_result, layout3)  # Replace with layout3 if different
  
-def generate_and_zip_resumes(parsed_results, layout_function, zip_file_name="resumes.zip"):
+def export_key(parsed_results, layout_function):
+    return bundle_key(parsed_results, layout_id(layout_function), TEMPLATE_VERSION)
+
+def generate_and_zip_resumes(parsed_results, layout_function):
+    # Renders every resume in memory into a ZIP written atomically to this session's own
+    # export workspace; returns the ZIP path. Unchanged inputs reuse the bundle already built.
     try:
-        save_path = os.path.join(os.path.expanduser("~"), "Documents", "resumeparser")
-        os.makedirs(save_path, exist_ok=True)
- 
-        temp_dir = os.path.join(save_path, "temp_resumes")
-        os.makedirs(temp_dir, exist_ok=True)
- 
-        for file_name, parsed_result in parsed_results:
-            resume_json = json.dumps(parsed_result)
-            layout_function(resume_json, temp_dir)
- 
-        zip_file_path = os.path.join(save_path, zip_file_name)
-        with zipfile.ZipFile(zip_file_path, 'w') as zipf:
-            for root, _, files in os.walk(temp_dir):
-                for file in files:
-                    zipf.write(os.path.join(root, file), arcname=file)
- 
-        for file in os.listdir(temp_dir):
-            os.remove(os.path.join(temp_dir, file))
-        os.rmdir(temp_dir)
- 
-        return zip_file_path
+        return memoised_bundle(parsed_results, renderer(layout_function), export_key(parsed_results, layout_function))
  
     except Exception as e:
         st.error(f"Error generating or zipping resumes: {e}")
@@ -276,10 +142,12 @@ def pd2csv(parsed_results):
 
 # Image layout options
 images = [
-    ("Kallisti", "./New folder/Layout1.png", option_one),
-    ("Phaedon", "./New folder/Layout2.png", option_two),
-    ("Erasmos", "./New folder/Layout3.png", option_three),
+    ("Kallisti", os.path.join(ASSET_DIR, "Layout1.png"), option_one),
+    ("Phaedon", os.path.join(ASSET_DIR, "Layout2.png"), option_two),
+    ("Erasmos", os.path.join(ASSET_DIR, "Layout3.png"), option_three),
 ]
+# Layout previews are read once per process and served from memory on every rerun
+preload(*(img_path for _, img_path, _ in images))
 
 # Recruit Agent
 def recruit_agent():
@@ -295,28 +163,7 @@ def recruit_agent():
         error_logs = []
         
         if uploaded_files:
-            progress_bar = st.progress(0)
-            total_files = len(uploaded_files)
-        
-            for idx, uploaded_file in enumerate(uploaded_files):
-                with st.spinner(f"Processing {uploaded_file.name}..."):
-                    try:
-                        resume_text = read_resume(uploaded_file)
-                        if not resume_text:
-                            raise ValueError("Empty or unreadable resume text.")
-        
-                        parsed_result = parse_resume(resume_text)
-                        if not parsed_result:
-                            raise ValueError("Parsing returned no result.")
-        
-                        parsed_results.append((uploaded_file.name, parsed_result))
-                    except Exception as e:
-                        error_logs.append((uploaded_file.name, str(e)))
-        
-                # Update progress bar
-                progress_bar.progress((idx + 1) / total_files)
-        
-            progress_bar.empty()  # Remove the progress bar after completion
+            parsed_results, error_logs = process_uploads(uploaded_files, read_resume, parse_resume, CACHE_VERSION, llm.model_name, aparse_resume=aparse_resume, agent="recruit")
         
         # Display error summary
         if error_logs:
@@ -360,7 +207,9 @@ def recruit_agent():
             cols = st.columns(3, vertical_alignment="center",border=True)
             for i, (title, img_path, func) in enumerate(images):
                 with cols[i]:
-                    st.image(img_path, use_container_width=False)
+                    preview = asset(img_path)
+                    if preview:
+                        st.image(preview.data, use_container_width=False)
                     if st.button(f"Layout: {title}", use_container_width=True, disabled=True): #key=f"{random.randint(0, 10000)}"):
                         print("") 
         
@@ -375,13 +224,17 @@ def recruit_agent():
             selected_layout_function = layout_options[selected_layout_label]
         
             st.markdown("<h8 style='font-size: 16px;'> 📦 Download All Resumes as ZIP</h8>", unsafe_allow_html=True)
-            zip_file_path = generate_and_zip_resumes(parsed_results, selected_layout_function)
+            # Built only on request; reruns with the same resumes and layout reuse the finished bundle
+            zip_file_path = cached_bundle(export_key(parsed_results, selected_layout_function))
+            if zip_file_path is None and st.button("📦 Prepare ZIP"):
+                with st.spinner("Building ZIP..."):
+                    zip_file_path = generate_and_zip_resumes(parsed_results, selected_layout_function)
             if zip_file_path:
                 with open(zip_file_path, "rb") as f:
                     st.download_button(
                         label="⬇️ Download All Resumes",
-                        data=f.read(),
-                        file_name=os.path.basename(zip_file_path),
+                        data=f,
+                        file_name="resumes.zip",
                         mime="application/zip"
                     )
         return parsed_results
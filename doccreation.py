@@ -2,17 +2,33 @@ import os
 import json
 import re
 import logging
-from doc_gen import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 from docx.shared import Inches
 from docx.shared import Pt, RGBColor
+from docx_template import CompiledTemplate
  
  
 # Configure logging to enabled
 logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
- 
+
+# Bump whenever a layout's output changes so cached export bundles are rebuilt
+TEMPLATE_VERSION = "1"
+# docx_template.WRITERS: "python-docx" for single downloads, the string-based "xml" writer for bulk exports
+DOCX_WRITER = os.getenv("DOCX_WRITER", "python-docx")
+BULK_DOCX_WRITER = os.getenv("BULK_DOCX_WRITER", "xml")
+ 
+def save_output(document, path, filename):
+    # path is a folder, or a writable binary stream (e.g. BytesIO) to render in memory.
+    # Returns the saved file path, or just the file name when writing to a stream.
+    if hasattr(path, "write"):
+        document.save(path)
+        return filename
+    full_path = os.path.join(path, filename)
+    document.save(full_path)
+    return full_path
+
 def add_horizontal_line(paragraph): 
     p = paragraph._p
     pPr = p.get_or_add_pPr()
@@ -44,520 +60,362 @@ def add_horizontal_divider(doc, text="────────────"):
     run = para.runs[0]
     run.bold = True
  
-def layout1(parsed_result, path):
-    try:
-        if not os.path.exists(path):
-            os.makedirs(path)
-           
-        #JSON string or a dictionary
-        if isinstance(parsed_result, str):
-            data = json.loads(parsed_result)
-        elif isinstance(parsed_result, dict):
-            data = parsed_result
-        else:
-            raise ValueError("parsed_result must be a JSON string or a dictionary")
- 
-        doc = Document()
- 
-        # Title
-        title_para = doc.add_paragraph(data.get("Name", "Unnamed"))
-        title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_para.style = 'Title'
- 
-        # Contact Information
-        contact_info = [
-            data.get("Email", ""),
-            data.get("Phone", ""),
-            data.get("LinkedIn", ""),
-            data.get("Address", "")
-        ]
-        contact_para = doc.add_paragraph("\n".join(contact_info))
-        contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        add_horizontal_line(doc.add_paragraph())
- 
-        # Summary
-        if data.get("Summary"):
-            doc.add_heading("Summary", level=2)
-            doc.add_paragraph(data["Summary"])
-        add_horizontal_line(doc.add_paragraph())
- 
-        # Education
-        if data.get("Education"):
-            doc.add_heading("Education", level=2)
-            table = doc.add_table(rows=1, cols=3)
-            table.style = 'Table Grid'
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = 'Institution'
-            hdr_cells[1].text = 'Degree'
-            hdr_cells[2].text = 'Field'
-            for edu in data.get("Education") or []:
-                row_cells = table.add_row().cells
-                row_cells[0].text = edu.get('Institution', '')
-                row_cells[1].text = edu.get('Degree', '')
-                row_cells[2].text = edu.get('Field', '')
-            add_horizontal_line(doc.add_paragraph())
- 
-        # Skills
-        if data.get("Skills"):
-            doc.add_heading("Skills", level=2)
-            for skill in data.get("Skills", []):
-                doc.add_paragraph(skill, style='List Bullet')
-            add_horizontal_line(doc.add_paragraph())
- 
-        # Experience
-        if data.get("Experience"):
-            doc.add_heading("Experience", level=2)
-            table = doc.add_table(rows=1, cols=4)
-            table.style = 'Table Grid'
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = 'Company'
-            hdr_cells[1].text = 'Duration'
-            hdr_cells[2].text = 'Title'
-            hdr_cells[3].text = 'Roles and Responsibilities'
-            for exp in data.get("Experience") or []:
-                row_cells = table.add_row().cells
-                row_cells[0].text = exp.get('Company', '')
-                row_cells[1].text = exp.get('Duration', '')
-                row_cells[2].text = exp.get('Title', '')
-                roles_cell = row_cells[3]
-                for role in exp.get('Roles and Responsibilities') or []:
-                    roles_cell.add_paragraph(role, style='List Bullet')
-            add_horizontal_line(doc.add_paragraph())
- 
-        # Footer
-        footer = doc.sections[0].footer
-        footer_para = footer.paragraphs[0]
-        footer_para.text = "Generated by TalentStream Pro"
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
- 
-        # Save
-        safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
-        filename = f"Formatted_Resume-{safe_name}.docx"
-        full_path = os.path.join(path, filename)
-        doc.save(full_path)
- 
-        return full_path
  
-    except Exception as e:
-        logging.error(f"An error occurred while generating the resume: {e}")
-        return None
+def add_footer(doc):
+    footer = doc.sections[0].footer
+    footer_para = footer.paragraphs[0]
+    footer_para.text = "Generated by TalentStream Pro"
+    footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
-def layout2(parsed_result, path):
-    try:
-        if not os.path.exists(path):
-            os.makedirs(path)
-        if isinstance(parsed_result, str):
-            data = json.loads(parsed_result)
-        elif isinstance(parsed_result, dict):
-            data = parsed_result
-        else:
-            raise ValueError("parsed_result must be a JSON string or a dictionary")
- 
-        doc = Document()
- 
-        # Create a two-column layout using a table
-        table = doc.add_table(rows=1, cols=2)
+def add_section_heading(container, color=None):
+    # "Title" / line break / rule in one bold 14pt run; the title is filled in per resume
+    heading = container.add_paragraph("x")
+    heading.runs[0].bold = True
+    heading.runs[0].add_break(break_type=WD_BREAK.LINE)
+    heading.runs[0].add_text(text = "────────────")
+    heading.runs[0].font.size = Pt(14)
+    if color is not None:
+        heading.runs[0].font.color.rgb = color
+    return heading._p
+
+def add_name(paragraph, color=None):
+    run = paragraph.add_run("x")
+    run.bold = True
+    run.font.size = Pt(14)
+    if color is not None:
+        run.font.color.rgb = color
+    paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    return paragraph._p
+
+def add_entry(container):
+    # bold first line, plain second line: "Degree in Field\nInstitution", "Title\nCompany | Duration"
+    p = container.add_paragraph()
+    p.add_run("x").bold = True
+    p.add_run("\nx")
+    return p._p
+
+def heading_text(title):
+    return f"{title}\n────────────"
+
+def contact_lines(data):
+    return [
+        data.get("Email", ""),
+        data.get("Phone", ""),
+        data.get("LinkedIn", ""),
+        data.get("Address", "")
+    ]
+
+# Each layout is compiled once per thread into a skeleton document plus prototype
+# paragraphs/rows; see docx_template.CompiledTemplate.
+def compile_classic(doc):
+    prototypes = {}
+    title_para = doc.add_paragraph("x")
+    title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title_para.style = 'Title'
+    prototypes["title"] = title_para._p
+    contact_para = doc.add_paragraph("x")
+    contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    prototypes["contact"] = contact_para._p
+    rule = doc.add_paragraph()
+    add_horizontal_line(rule)
+    prototypes["rule"] = rule._p
+    prototypes["heading"] = doc.add_heading("x", level=2)._p
+    prototypes["text"] = doc.add_paragraph("x")._p
+    prototypes["bullet"] = doc.add_paragraph("x", style='List Bullet')._p
+
+    table = doc.add_table(rows=1, cols=3)
+    table.style = 'Table Grid'
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].text = 'Institution'
+    hdr_cells[1].text = 'Degree'
+    hdr_cells[2].text = 'Field'
+    row_cells = table.add_row().cells
+    for cell in row_cells:
+        cell.text = "x"
+    prototypes["education_table"] = table._tbl
+    prototypes["education_row"] = table.rows[1]._tr
+
+    table = doc.add_table(rows=1, cols=4)
+    table.style = 'Table Grid'
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].text = 'Company'
+    hdr_cells[1].text = 'Duration'
+    hdr_cells[2].text = 'Title'
+    hdr_cells[3].text = 'Roles and Responsibilities'
+    row_cells = table.add_row().cells
+    for cell in row_cells[:3]:
+        cell.text = "x"
+    prototypes["experience_table"] = table._tbl
+    prototypes["experience_row"] = table.rows[1]._tr
+
+    add_footer(doc)
+    return prototypes
+
+def load_parsed(parsed_result):
+    #JSON string or a dictionary
+    if isinstance(parsed_result, str):
+        return json.loads(parsed_result)
+    if isinstance(parsed_result, dict):
+        return parsed_result
+    raise ValueError("parsed_result must be a JSON string or a dictionary")
+
+def hex_color(r, g, b):
+    return f"{r:02X}{g:02X}{b:02X}"
+
+# Table-based layouts described as data and drawn by render_layout. Colours are hex strings and
+# widths are inches, so a spec can come straight from JSON (e.g. a user's custom template).
+#   banner:      optional full-width shaded band above the columns
+#   columns:     left to right; sections render top to bottom in the listed order
+#   cell_widths: set widths on every cell (Word honours these) rather than on the grid only
+LAYOUT_SPECS = {
+    "layout2": {
+        "file_prefix": "Formatted_Resume_-",
+        "name_color": hex_color(varR1, varG1, varB1),
+        "heading_color": hex_color(varR2, varG2, varB2),
+        "cell_widths": False,
+        "columns": [
+            {"width": 2, "sections": ["name", "contact", "skills"]},
+            {"width": 4.5, "sections": ["summary", "education", "experience"]},
+        ],
+    },
+    "layout3": {
+        "file_prefix": "Formatted_Resume-",
+        "name_color": hex_color(varR1, varG1, varB1),
+        "heading_color": hex_color(varR2, varG2, varB2),
+        "banner": {"shading": "D9E1F2", "sections": ["name", "contact"]},
+        "cell_widths": True,
+        "columns": [
+            {"width": 2, "sections": ["skills"]},
+            {"width": 4.5, "sections": ["summary", "education", "experience"]},
+        ],
+    },
+    "layout4": {
+        "file_prefix": "Formatted_Resume-",
+        "cell_widths": True,
+        "columns": [
+            {"width": 2, "sections": ["name", "contact", "skills"]},
+            {"width": 4.5, "sections": ["summary", "education", "experience"]},
+        ],
+    },
+}
+
+def section_name(fill, cell, data):
+    fill.add(cell, "name", data.get("Name", "Unnamed"))
+
+def section_contact(fill, cell, data):
+    for info in contact_lines(data):
+        fill.add(cell, "text", info)
+
+def section_skills(fill, cell, data):
+    if data.get("Skills"):
+        fill.add(cell, "heading", heading_text("Skills"))
+        for skill in data.get("Skills", []):
+            fill.add(cell, "bullet", skill)
+
+def section_summary(fill, cell, data):
+    if data.get("Summary"):
+        fill.add(cell, "heading", heading_text("Summary"))
+        fill.add(cell, "text", data["Summary"])
+
+def section_education(fill, cell, data):
+    if data.get("Education"):
+        fill.add(cell, "heading", heading_text("Education"))
+        for edu in data.get("Education", []):
+            fill.add(cell, "entry", f"{edu.get('Degree', '')} in {edu.get('Field', '')}", f"\n{edu.get('Institution', '')}")
+
+def section_experience(fill, cell, data):
+    if data.get("Experience"):
+        fill.add(cell, "heading", heading_text("Experience"))
+        for exp in data.get("Experience", []):
+            fill.add(cell, "entry", exp.get("Title", ""), f"\n{exp.get('Company', '')} | {exp.get('Duration', '')}")
+            for role in exp.get("Roles and Responsibilities", []):
+                fill.add(cell, "bullet", role)
+
+SECTIONS = {
+    "name": section_name,
+    "contact": section_contact,
+    "skills": section_skills,
+    "summary": section_summary,
+    "education": section_education,
+    "experience": section_experience,
+}
+
+def spec_color(spec, key):
+    return RGBColor.from_string(spec[key]) if spec.get(key) else None
+
+def build_layout(spec, doc):
+    # Skeleton tables plus one prototype per paragraph kind, styled once from the spec
+    regions = []
+    if spec.get("banner"):
+        table = doc.add_table(rows=1, cols=1)
         table.autofit = False
-       
-        # Set fixed widths instead of calculating from page width
-        table.columns[0].width = Inches(2) # Sidebar
-        table.columns[1].width = Inches(4.5) # Main content
- 
- 
-        left_cell = table.cell(0, 0)
-        right_cell = table.cell(0, 1)
- 
-        # LEFT SIDEBAR
-        name_para = left_cell.paragraphs[0]
-        name_para.add_run(data.get("Name", "Unnamed")).bold = True
-        name_para.runs[0].font.size = Pt(14)
-        name_para.runs[0].font.color.rgb = RGBColor(varR1,varG1, varB1) # Default black color
-        name_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
- 
-        contact_info = [
-            data.get("Email", ""),
-            data.get("Phone", ""),
-            data.get("LinkedIn", ""),
-            data.get("Address", "")
-        ]
-        for info in contact_info:
-            left_cell.add_paragraph(info)
- 
-        if data.get("Skills"):
-            heading = left_cell.add_paragraph("Skills")
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            heading.runs[0].font.color.rgb= RGBColor(varR2, varG2, varB2)
-            #type: ignore
-            for skill in data.get("Skills", []):
-                left_cell.add_paragraph(skill, style='List Bullet')
- 
-        # RIGHT MAIN SECTION
-        if data.get("Summary"):
-            heading = right_cell.add_paragraph("Summary")
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            heading.runs[0].font.color.rgb= RGBColor(varR2, varG2, varB2)
-            right_cell.add_paragraph(data["Summary"])
- 
-        if data.get("Education"):
-            heading = right_cell.add_paragraph("Education")
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            heading.runs[0].font.color.rgb= RGBColor(varR2, varG2, varB2)
-            for edu in data.get("Education", []):
-                p = right_cell.add_paragraph()
-                p.add_run(f"{edu.get('Degree', '')} in {edu.get('Field', '')}").bold = True
-                p.add_run(f"\n{edu.get('Institution', '')}")
- 
-        if data.get("Experience"):
-            heading = right_cell.add_paragraph("Experience")
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            heading.runs[0].font.color.rgb= RGBColor(varR2, varG2, varB2)
-            for exp in data.get("Experience", []):
-                p = right_cell.add_paragraph()
-                p.add_run(exp.get("Title", "")).bold = True
-                p.add_run(f"\n{exp.get('Company', '')} | {exp.get('Duration', '')}")
-                for role in exp.get("Roles and Responsibilities", []):
-                    right_cell.add_paragraph(role, style='List Bullet')
- 
-        # Footer
-        footer = doc.sections[0].footer
-        footer_para = footer.paragraphs[0]
-        footer_para.text = "Generated by TalentStream Pro"
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
- 
-        # Save
-        safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
-        filename = f"Formatted_Resume_-{safe_name}.docx"
-        full_path = os.path.join(path, filename)
-        doc.save(full_path)
- 
-        return full_path
- 
-    except Exception as e:
-        logging.error(f"An error occurred while generating layout 2 resume: {e}")
-        return None
- 
-def layout4(parsed_result, path):
+        cell = table.cell(0, 0)
+        set_cell_background(cell, spec["banner"]["shading"])
+        regions.append((cell, spec["banner"]["sections"]))
+
+    columns = spec["columns"]
+    table = doc.add_table(rows=1, cols=len(columns))
+    table.autofit = False
+    for i, column in enumerate(columns):
+        width = Inches(column["width"])
+        if spec.get("cell_widths"):
+            for cell in table.columns[i].cells:
+                cell.width = width
+        else:
+            table.columns[i].width = width
+        regions.append((table.cell(0, i), column["sections"]))
+    add_footer(doc)
+
+    # A region that opens with the name writes it into the cell's own first paragraph
+    first_cell = regions[0][0]
+    name_para = next((cell.paragraphs[0] for cell, sections in regions if sections[:1] == ["name"]), None)
+    return {
+        "name": add_name(name_para or first_cell.add_paragraph(), spec_color(spec, "name_color")),
+        "text": first_cell.add_paragraph("x")._p,
+        "heading": add_section_heading(first_cell, spec_color(spec, "heading_color")),
+        "bullet": first_cell.add_paragraph("x", style='List Bullet')._p,
+        "entry": add_entry(first_cell),
+    }
+
+def region_sections(spec):
+    # Sections for each cell build_layout created, in document order
+    regions = [spec["banner"]["sections"]] if spec.get("banner") else []
+    return regions + [column["sections"] for column in spec["columns"]]
+
+_layout_templates = {}
+
+def layout_template(name, spec=None):
+    # Compiled once per layout; a spec that no longer matches the cached one is compiled afresh
+    spec = spec or LAYOUT_SPECS[name]
+    cached = _layout_templates.get(name)
+    if cached is None or cached[0] != spec:
+        cached = _layout_templates[name] = (spec, CompiledTemplate(lambda doc: build_layout(spec, doc)))
+    return cached[1]
+
+def render_layout(name, parsed_result, path, writer=None, spec=None):
     try:
-        if not os.path.exists(path):
+        if isinstance(path, str) and not os.path.exists(path):
             os.makedirs(path)
-        if isinstance(parsed_result, str):
-            data = json.loads(parsed_result)
-        elif isinstance(parsed_result, dict):
-            data = parsed_result
-        else:
-            raise ValueError("parsed_result must be a JSON string or a dictionary")
- 
-        doc = Document()
- 
-        # Create a two-column layout
-        table = doc.add_table(rows=1, cols=2)
-        table.autofit = False
-       
-        # Set fixed widths for each cell in the columns
-        for cell in table.columns[0].cells:
-            cell.width = Inches(2) # Sidebar
-        for cell in table.columns[1].cells:
-            cell.width = Inches(4.5) # Main content
- 
-        left_cell = table.cell(0, 0)
-        right_cell = table.cell(0, 1)
- 
-        # LEFT SIDEBAR
-        name_para = left_cell.paragraphs[0]
-        run = name_para.add_run(data.get("Name", "Unnamed"))
-        run.bold = True
-        run.font.size = Pt(14)
-        name_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
- 
-        contact_info = [
-            data.get("Email", ""),
-            data.get("Phone", ""),
-            data.get("LinkedIn", ""),
-            data.get("Address", "")
-        ]
-        for info in contact_info:
-            left_cell.add_paragraph(info)
- 
-        if data.get("Skills"):
-            heading = left_cell.add_paragraph("Skills")
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            ## add_horizontal_divider(left_cell)
-            for skill in data["Skills"]:
-                left_cell.add_paragraph(skill, style='List Bullet')
- 
-        # RIGHT MAIN SECTION
-        def add_section(cell, title, content):
-            ## add_horizontal_divider(cell)
-            heading = cell.add_paragraph(title)
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            if isinstance(content, str):
-                cell.add_paragraph(content)
-            elif isinstance(content, list):
-                for item in content:
-                    cell.add_paragraph(item)
- 
-        if data.get("Summary"):
-            add_section(right_cell, "Summary", data["Summary"])
- 
-        if data.get("Education"):
-            add_section(right_cell, "Education", [])
-            for edu in data["Education"]:
-                p = right_cell.add_paragraph()
-                p.add_run(f"{edu.get('Degree', '')} in {edu.get('Field', '')}").bold = True
-                p.add_run(f"\n{edu.get('Institution', '')}")
- 
-        if data.get("Experience"):
-            add_section(right_cell, "Experience", [])
-            for exp in data["Experience"]:
-                p = right_cell.add_paragraph()
-                p.add_run(exp.get("Title", "")).bold = True
-                p.add_run(f"\n{exp.get('Company', '')} | {exp.get('Duration', '')}")
-                for role in exp.get("Roles and Responsibilities", []):
-                    right_cell.add_paragraph(role, style='List Bullet')
-                   
-    # Footer
-        footer = doc.sections[0].footer
-        footer_para = footer.paragraphs[0]
-        footer_para.text = "Generated by TalentStream Pro"
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
- 
-    # Save
-        safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
-        filename = f"Formatted_Resume-{safe_name}.docx"
-        full_path = os.path.join(path, filename)
-        doc.save(full_path)
-        return full_path
-   
+        data = load_parsed(parsed_result)
+        spec = spec or LAYOUT_SPECS[name]
+
+        with layout_template(name, spec).document(writer or DOCX_WRITER) as (doc, fill):
+            for cell, sections in zip(fill.cells, region_sections(spec)):
+                for section in sections:
+                    SECTIONS[section](fill, cell, data)
+
+            # Save
+            safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
+            filename = f"{spec['file_prefix']}{safe_name}.docx"
+            return save_output(doc, path, filename)
+
     except Exception as e:
-        logging.error(f"An error occurred while generating the resume: {e}")
+        logging.error(f"An error occurred while generating {name} resume: {e}")
         return None
-   
-def layout3(parsed_result, path):
+
+class SpecLayout:
+    """Render function for a layout added with register_layout.
+
+    Unlike a lambda it pickles, and it carries its spec along: a spawned render pool
+    worker never ran register_layout, yet renders the layout the same way.
+    """
+
+    def __init__(self, name, spec):
+        self.__name__ = name  # layout_id() keys export caches by it
+        self.spec = spec
+
+    def __call__(self, parsed_result, path, writer=None):
+        return render_layout(self.__name__, parsed_result, path, writer, self.spec)
+
+def register_layout(name, spec):
+    # Adds (or replaces) a spec-driven layout and returns its render function
+    LAYOUT_SPECS[name] = spec
+    _layout_templates.pop(name, None)
+    return SpecLayout(name, spec)
+
+CLASSIC = CompiledTemplate(compile_classic)
+
+
+def fill_classic(fill, data):
+    fill.add(fill.body, "title", data.get("Name", "Unnamed"))
+    fill.add(fill.body, "contact", "\n".join(contact_lines(data)))
+    fill.add(fill.body, "rule")
+
+    # Summary
+    if data.get("Summary"):
+        fill.add(fill.body, "heading", "Summary")
+        fill.add(fill.body, "text", data["Summary"])
+    fill.add(fill.body, "rule")
+
+    # Education
+    if data.get("Education"):
+        fill.add(fill.body, "heading", "Education")
+        table = fill.add(fill.body, "education_table")
+        for edu in data.get("Education") or []:
+            fill.add(table, "education_row", edu.get('Institution', ''), edu.get('Degree', ''), edu.get('Field', ''))
+        fill.add(fill.body, "rule")
+
+    # Skills
+    if data.get("Skills"):
+        fill.add(fill.body, "heading", "Skills")
+        for skill in data.get("Skills", []):
+            fill.add(fill.body, "bullet", skill)
+        fill.add(fill.body, "rule")
+
+    # Experience
+    if data.get("Experience"):
+        fill.add(fill.body, "heading", "Experience")
+        table = fill.add(fill.body, "experience_table")
+        for exp in data.get("Experience") or []:
+            row = fill.add(table, "experience_row", exp.get('Company', ''), exp.get('Duration', ''), exp.get('Title', ''))
+            roles_cell = fill.cell(row, 3)
+            for role in exp.get('Roles and Responsibilities') or []:
+                fill.add(roles_cell, "bullet", role)
+        fill.add(fill.body, "rule")
+
+def layout1(parsed_result, path, writer=None):
     try:
-        if not os.path.exists(path):
+        if isinstance(path, str) and not os.path.exists(path):
             os.makedirs(path)
-        if isinstance(parsed_result, str):
-            data = json.loads(parsed_result)
-        elif isinstance(parsed_result, dict):
-            data = parsed_result
-        else:
-            raise ValueError("parsed_result must be a JSON string or a dictionary")
- 
-        doc = Document()
- 
-        # Create a two-column layout
-        table = doc.add_table(rows=1, cols=1)
-        table.autofit = False
- 
-        top_cell = table.cell(0, 0)
- 
-         # Apply light blue background to sidebar
-        set_cell_background(top_cell, 'D9E1F2')
- 
-        # Name
-        name_para = top_cell.paragraphs[0]
-        run = name_para.add_run(data.get("Name", "Unnamed"))
-        run.bold = True
-        run.font.size = Pt(14)
-        run.font.color.rgb= RGBColor(varR1, varG1, varB1)
-        name_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
- 
-        contact_info = [
-            data.get("Email", ""),
-            data.get("Phone", ""),
-            data.get("LinkedIn", ""),
-            data.get("Address", "")
-        ]
-        for info in contact_info:
-            top_cell.add_paragraph(info)
- 
-        # Create a two-column layout
-        table = doc.add_table(rows=1, cols=2)
-        table.autofit = False
-       
-        # Set fixed widths for each cell in the columns
-        for cell in table.columns[0].cells:
-            cell.width = Inches(2) # Sidebar
-        for cell in table.columns[1].cells:
-            cell.width = Inches(4.5) # Main content
- 
-        left_cell = table.cell(0, 0)
-        right_cell = table.cell(0, 1)
- 
-        if data.get("Skills"):
-            heading = left_cell.add_paragraph("Skills")
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            heading.runs[0].font.color.rgb= RGBColor(varR2, varG2, varB2)
-            ## add_horizontal_divider(left_cell)
-            for skill in data["Skills"]:
-                left_cell.add_paragraph(skill, style='List Bullet')
- 
-        # RIGHT MAIN SECTION
-        def add_section(cell, title, content):
-            ## add_horizontal_divider(cell)
-            heading = cell.add_paragraph(title)
-            heading.runs[0].bold = True
-            heading.runs[0].add_break(break_type=WD_BREAK.LINE)
-            heading.runs[0].add_text(text = "────────────")
-            heading.runs[0].font.size = Pt(14)
-            heading.runs[0].font.color.rgb= RGBColor(varR2, varG2, varB2)
-            if isinstance(content, str):
-                cell.add_paragraph(content)
-            elif isinstance(content, list):
-                for item in content:
-                    cell.add_paragraph(item)
- 
-        if data.get("Summary"):
-            add_section(right_cell, "Summary", data["Summary"])
- 
-        if data.get("Education"):
-            add_section(right_cell, "Education", [])
-            for edu in data["Education"]:
-                p = right_cell.add_paragraph()
-                p.add_run(f"{edu.get('Degree', '')} in {edu.get('Field', '')}").bold = True
-                p.add_run(f"\n{edu.get('Institution', '')}")
+           
+        data = load_parsed(parsed_result)
  
-        if data.get("Experience"):
-            add_section(right_cell, "Experience", [])
-            for exp in data["Experience"]:
-                p = right_cell.add_paragraph()
-                p.add_run(exp.get("Title", "")).bold = True
-                p.add_run(f"\n{exp.get('Company', '')} | {exp.get('Duration', '')}")
-                for role in exp.get("Roles and Responsibilities", []):
-                    right_cell.add_paragraph(role, style='List Bullet')
-                   
-    # Footer
-        footer = doc.sections[0].footer
-        footer_para = footer.paragraphs[0]
-        footer_para.text = "Generated by TalentStream Pro"
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        with CLASSIC.document(writer or DOCX_WRITER) as (doc, fill):
+            fill_classic(fill, data)
+
+            # Save
+            safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
+            filename = f"Formatted_Resume-{safe_name}.docx"
+            return save_output(doc, path, filename)
  
-    # Save
-        safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
-        filename = f"Formatted_Resume-{safe_name}.docx"
-        full_path = os.path.join(path, filename)
-        doc.save(full_path)
-        return full_path
-   
     except Exception as e:
         logging.error(f"An error occurred while generating the resume: {e}")
         return None
-   
-def generate_formatted_resume(parsed_result, path):
+
+def layout2(parsed_result, path, writer=None):
+    return render_layout("layout2", parsed_result, path, writer)
+
+def layout4(parsed_result, path, writer=None):
+    return render_layout("layout4", parsed_result, path, writer)
+
+def layout3(parsed_result, path, writer=None):
+    return render_layout("layout3", parsed_result, path, writer)
+
+def generate_formatted_resume(parsed_result, path, writer=None):
     try:
-        if not os.path.exists(path):
+        if isinstance(path, str) and not os.path.exists(path):
             os.makedirs(path)
            
-        #JSON string or a dictionary
-        if isinstance(parsed_result, str):
-            data = json.loads(parsed_result)
-        elif isinstance(parsed_result, dict):
-            data = parsed_result
-        else:
-            raise ValueError("parsed_result must be a JSON string or a dictionary")
- 
-        doc = Document()
- 
-        # Title
-        title_para = doc.add_paragraph(data.get("Name", "Unnamed"))
-        title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_para.style = 'Title'
- 
-        # Contact Information
-        contact_info = [
-            data.get("Email", ""),
-            data.get("Phone", ""),
-            data.get("LinkedIn", ""),
-            data.get("Address", "")
-        ]
-        contact_para = doc.add_paragraph("\n".join(contact_info))
-        contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        add_horizontal_line(doc.add_paragraph())
+        data = load_parsed(parsed_result)
  
-        # Summary
-        if data.get("Summary"):
-            doc.add_heading("Summary", level=2)
-            doc.add_paragraph(data["Summary"])
-        add_horizontal_line(doc.add_paragraph())
- 
-        # Education
-        if data.get("Education"):
-            doc.add_heading("Education", level=2)
-            table = doc.add_table(rows=1, cols=3)
-            table.style = 'Table Grid'
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = 'Institution'
-            hdr_cells[1].text = 'Degree'
-            hdr_cells[2].text = 'Field'
-            for edu in data.get("Education") or []:
-                row_cells = table.add_row().cells
-                row_cells[0].text = edu.get('Institution', '')
-                row_cells[1].text = edu.get('Degree', '')
-                row_cells[2].text = edu.get('Field', '')
-            add_horizontal_line(doc.add_paragraph())
- 
-        # Skills
-        if data.get("Skills"):
-            doc.add_heading("Skills", level=2)
-            for skill in data.get("Skills", []):
-                doc.add_paragraph(skill, style='List Bullet')
-            add_horizontal_line(doc.add_paragraph())
- 
-        # Experience
-        if data.get("Experience"):
-            doc.add_heading("Experience", level=2)
-            table = doc.add_table(rows=1, cols=4)
-            table.style = 'Table Grid'
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = 'Company'
-            hdr_cells[1].text = 'Duration'
-            hdr_cells[2].text = 'Title'
-            hdr_cells[3].text = 'Roles and Responsibilities'
-            for exp in data.get("Experience") or []:
-                row_cells = table.add_row().cells
-                row_cells[0].text = exp.get('Company', '')
-                row_cells[1].text = exp.get('Duration', '')
-                row_cells[2].text = exp.get('Title', '')
-                roles_cell = row_cells[3]
-                for role in exp.get('Roles and Responsibilities') or []:
-                    roles_cell.add_paragraph(role, style='List Bullet')
-            add_horizontal_line(doc.add_paragraph())
- 
-        # Footer
-        footer = doc.sections[0].footer
-        footer_para = footer.paragraphs[0]
-        footer_para.text = "Generated by TalentStream Pro"
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
- 
-        # Save
-        safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
-        filename = f"formatted_resume-{safe_name}.docx"
-        full_path = os.path.join(path, filename)
-        doc.save(full_path)
- 
-        return full_path
+        with CLASSIC.document(writer or DOCX_WRITER) as (doc, fill):
+            fill_classic(fill, data)
+
+            # Save
+            safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
+            filename = f"formatted_resume-{safe_name}.docx"
+            return save_output(doc, path, filename)
  
     except Exception as e:
         logging.error(f"An error occurred while generating the resume: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,314 @@
+import io
+import re
+import copy
+import queue
+import zipfile
+import threading
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
+
+from lxml import etree
+from docx import Document
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+
+# "python-docx" fills the compiled template through lxml/python-docx objects.
+# "xml" emits WordprocessingML strings from the same template and only writes document.xml
+# into a pre-built package; the output is XML-equivalent (see check_docx_writer.py).
+WRITERS = ("python-docx", "xml")
+
+
+class CompiledTemplate:
+    """A DOCX layout prepared once and then filled per resume.
+
+    build(doc) runs the ordinary python-docx calls once on a blank Document: it lays out
+    the static skeleton (tables, widths, shading, footer) and returns a dict of prototype
+    elements (styled paragraphs, table rows, ...) by name. The result is kept as immutable
+    bytes for the whole process. Rendering takes a working document opened from those bytes,
+    resets its body to the skeleton and appends cloned prototypes; working documents are
+    reused by later renders on any thread (Streamlit runs every rerun on a new one), so
+    style lookups, formatting and Document() start-up are not paid per resume.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._lock = threading.Lock()
+        self._compiled = None
+        self._xml = None
+        self._idle = queue.SimpleQueue()
+
+    def _compile(self):
+        # (package bytes, skeleton body XML, prototype XML by name), built once per process
+        with self._lock:
+            if self._compiled is None:
+                doc = Document()
+                prototypes = self._build(doc)
+                for element in prototypes.values():
+                    if element.getparent() is not None:
+                        element.getparent().remove(element)
+                saved = io.BytesIO()
+                doc.save(saved)
+                self._compiled = (
+                    saved.getvalue(),
+                    [etree.tostring(child) for child in doc.element.body],
+                    {name: etree.tostring(element) for name, element in prototypes.items()},
+                )
+        return self._compiled
+
+    def _working_copy(self):
+        # (doc, skeleton, prototypes) owned by one render at a time
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            package, skeleton, prototypes = self._compile()
+            return (Document(io.BytesIO(package)), [parse_xml(xml) for xml in skeleton],
+                    {name: parse_xml(xml) for name, xml in prototypes.items()})
+
+    def _compiled_xml(self):
+        with self._lock:
+            compiled = self._xml
+        if compiled is None:
+            working = self._working_copy()
+            try:
+                compiled = XmlTemplate(*working)
+            finally:
+                self._idle.put(working)
+            with self._lock:
+                if self._xml is None:
+                    self._xml = compiled
+                compiled = self._xml
+        return compiled
+
+    @contextmanager
+    def document(self, writer="python-docx"):
+        # Yields (doc, filler) with doc reset to the skeleton; save doc inside the block
+        if writer == "xml":
+            template = self._compiled_xml()
+            doc = XmlDocument(template)
+            yield doc, XmlFiller(template, doc)
+            return
+        if writer != "python-docx":
+            raise ValueError(f"Unknown DOCX writer: {writer}")
+        working = self._working_copy()
+        doc, skeleton, prototypes = working
+        body = doc.element.body
+        for child in list(body):
+            body.remove(child)
+        body.extend(copy.deepcopy(child) for child in skeleton)
+        try:
+            yield doc, Filler(prototypes, doc)
+        finally:
+            self._idle.put(working)
+
+
+class Filler:
+    # body, cells (skeleton table cells in document order) and cell(row, i) are the containers
+    # layouts append to; XmlFiller offers the same interface
+
+    def __init__(self, prototypes, doc):
+        self.prototypes = prototypes
+        self.body = doc.element.body
+        self.cells = list(self.body.iter(qn("w:tc")))
+
+    def clone(self, name, *texts):
+        # Copy a prototype and put texts into its runs in document order; an empty text
+        # drops its run, like add_paragraph("") never creating one
+        element = copy.deepcopy(self.prototypes[name])
+        for run, text in zip(list(element.iter(qn("w:r"))), texts):
+            if text:
+                run.text = text
+            else:
+                run.getparent().remove(run)
+        return element
+
+    def add(self, container, name, *texts):
+        # container is a body/cell/table element or python-docx object; returns the new element
+        element = self.clone(name, *texts)
+        append(container, element)
+        return element
+
+    def cell(self, row, index):
+        return row.findall(qn("w:tc"))[index]
+
+
+def append(container, element):
+    parent = container.element.body if hasattr(container, "sections") else getattr(container, "_element", container)
+    sect_pr = parent.find(qn("w:sectPr"))
+    if sect_pr is not None:
+        sect_pr.addprevious(element)
+    else:
+        parent.append(element)
+
+
+# --- XML writer -------------------------------------------------------------------------
+
+_MARKER = re.compile(r"<\?(run|slot) ([^?]*)\?>")
+_NS_DECL = re.compile(r' xmlns:(\w+)="([^"]*)"')
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_RUN_BREAKS = re.compile(r"([\t\r\n])")
+
+
+def run_xml(text):
+    # Same content python-docx's run.text setter produces: <w:t> for text, <w:tab/> for tabs
+    # and <w:br/> for each CR/LF, with xml:space="preserve" on text with outer whitespace
+    if _INVALID_XML.search(text):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+    out = []
+    for piece in _RUN_BREAKS.split(text):
+        if piece == "\t":
+            out.append("<w:tab/>")
+        elif piece in ("\r", "\n"):
+            out.append("<w:br/>")
+        elif piece:
+            if len(piece.strip()) < len(piece):
+                out.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+            else:
+                out.append(f"<w:t>{escape(piece)}</w:t>")
+    return "".join(out)
+
+
+class Prototype:
+    """A serialised element split into literal XML, fillable runs and child slots."""
+
+    def __init__(self, xml, runs):
+        self.tokens = []
+        self.runs = runs
+        self.default_slot = None
+        parts = _MARKER.split(xml)
+        for i in range(0, len(parts), 3):
+            if parts[i]:
+                self.tokens.append(parts[i])
+            if i + 2 < len(parts):
+                kind, arg = parts[i + 1], parts[i + 2]
+                if kind == "run":
+                    self.tokens.append(("run", int(arg)))
+                else:
+                    self.tokens.append(("slot", arg))
+                    self.default_slot = arg
+
+
+class XmlTemplate:
+    def __init__(self, doc, skeleton, prototypes):
+        root = copy.deepcopy(doc.element)
+        self._root_ns = dict(root.nsmap)
+        body = root.find(qn("w:body"))
+        for child in list(body):
+            body.remove(child)
+        body.extend(copy.deepcopy(child) for child in skeleton)
+        cells = list(body.iter(qn("w:tc")))
+        for i, tc in enumerate(cells):
+            tc.append(etree.ProcessingInstruction("slot", f"tc {i}"))
+        sect_pr = body.find(qn("w:sectPr"))
+        slot = etree.ProcessingInstruction("slot", "body")
+        if sect_pr is not None:
+            sect_pr.addprevious(slot)
+        else:
+            body.append(slot)
+        self.skeleton = Prototype(serialize_part_xml(root).decode("utf-8"), [])
+        self.cell_keys = [f"tc {i}" for i in range(len(cells))]
+        self.prototypes = {name: self._compile(element) for name, element in prototypes.items()}
+
+        # Every part except document.xml is fixed per template: deflate them once
+        self.partname = doc.part.partname.lstrip("/")
+        saved = io.BytesIO()
+        doc.save(saved)
+        package = io.BytesIO()
+        with zipfile.ZipFile(saved) as src, zipfile.ZipFile(package, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename != self.partname:
+                    dst.writestr(info, src.read(info.filename))
+        self.package = package.getvalue()
+
+    def _fragment(self, element):
+        # Serialise without the namespace declarations the document root already makes
+        xml = etree.tostring(element, encoding="unicode")
+        return _NS_DECL.sub(lambda m: "" if self._root_ns.get(m.group(1)) == m.group(2) else m.group(0), xml)
+
+    def _compile(self, element):
+        element = copy.deepcopy(element)
+        runs = []
+        for i, run in enumerate(list(element.iter(qn("w:r")))):
+            content = [child for child in run if child.tag != qn("w:rPr")]
+            original = "".join(self._fragment(child) for child in content)
+            for child in content:
+                run.remove(child)
+            run.append(etree.ProcessingInstruction("run", "content"))
+            head, tail = self._fragment(run).split("<?run content?>")
+            runs.append((head, tail, original))
+            marker = etree.ProcessingInstruction("run", str(i))
+            marker.tail = run.tail
+            run.getparent().replace(run, marker)
+        for i, tc in enumerate(element.iter(qn("w:tc"))):
+            tc.append(etree.ProcessingInstruction("slot", f"tc {i}"))
+        if element.tag == qn("w:tbl"):
+            element.append(etree.ProcessingInstruction("slot", "tbl"))
+        return Prototype(self._fragment(element), runs)
+
+
+class XmlNode:
+    __slots__ = ("prototype", "texts", "children")
+
+    def __init__(self, prototype, texts):
+        self.prototype = prototype
+        self.texts = texts
+        self.children = {}
+
+
+def _render(node, out):
+    prototype = node.prototype
+    texts = node.texts
+    for token in prototype.tokens:
+        if token.__class__ is str:
+            out.append(token)
+        elif token[0] == "run":
+            head, tail, original = prototype.runs[token[1]]
+            if token[1] < len(texts):
+                text = texts[token[1]]
+                if text:
+                    out.append(head)
+                    out.append(run_xml(text))
+                    out.append(tail)
+            else:
+                out.append(head)
+                out.append(original)
+                out.append(tail)
+        else:
+            for child in node.children.get(token[1], ()):
+                _render(child, out)
+
+
+class XmlDocument:
+    def __init__(self, template):
+        self.template = template
+        self.root = XmlNode(template.skeleton, ())
+
+    def save(self, path_or_stream):
+        out = []
+        _render(self.root, out)
+        package = io.BytesIO(self.template.package)
+        with zipfile.ZipFile(package, "a", zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr(self.template.partname, "".join(out).encode("utf-8"))
+        if hasattr(path_or_stream, "write"):
+            path_or_stream.write(package.getvalue())
+        else:
+            with open(path_or_stream, "wb") as f:
+                f.write(package.getvalue())
+
+
+class XmlFiller:
+    def __init__(self, template, doc):
+        self.prototypes = template.prototypes
+        self.body = (doc.root, "body")
+        self.cells = [(doc.root, key) for key in template.cell_keys]
+
+    def add(self, container, name, *texts):
+        node = XmlNode(self.prototypes[name], texts)
+        if isinstance(container, XmlNode):
+            container = (container, container.prototype.default_slot)
+        parent, slot = container
+        parent.children.setdefault(slot, []).append(node)
+        return node
+
+    def cell(self, row, index):
+        return (row, f"tc {index}")
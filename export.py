@@ -0,0 +1,302 @@
+import io
+import os
+import json
+import hashlib
+import re
+import time
+import uuid
+import shutil
+import logging
+import zipfile
+import tempfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from parse_cache import LRUCache
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# Bundles up to this size stay in memory; bigger ones roll over to an anonymous temp file
+ZIP_SPOOL_BYTES = int(os.getenv("ZIP_SPOOL_MB", "64")) * 1024 * 1024
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(os.path.expanduser("~"), "Documents", "resumeparser", "exports"))
+EXPORT_TTL_SECONDS = int(os.getenv("EXPORT_TTL_HOURS", "6")) * 3600
+# Finished jobs a live session keeps on disk; older ones are removed when a new job starts
+EXPORT_JOBS_PER_SESSION = int(os.getenv("EXPORT_JOBS_PER_SESSION", "4"))
+BUNDLE_CACHE_ENTRIES = int(os.getenv("BUNDLE_CACHE_ENTRIES", "64"))
+# Bulk exports of at least RENDER_PARALLEL_MIN resumes render across a warm process pool,
+# RENDER_CHUNK resumes per task
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(8, os.cpu_count() or 1))))
+RENDER_PARALLEL_MIN = int(os.getenv("RENDER_PARALLEL_MIN", "16"))
+RENDER_CHUNK = int(os.getenv("RENDER_CHUNK", "8"))
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def current_session_id():
+    # Streamlit session when running under the app, otherwise one id per process
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx else f"local-{os.getpid()}"
+
+
+def unique_name(name, taken):
+    # "Formatted_Resume-Ann Lee.docx" -> "Formatted_Resume-Ann Lee (2).docx" when already used
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate.lower() in taken:
+        n += 1
+        candidate = f"{stem} ({n}){ext}"
+    taken.add(candidate.lower())
+    return candidate
+
+
+class ExportWorkspace:
+    """Private directory for one export job: EXPORT_DIR/<session>/<job>.
+
+    Concurrent sessions (and concurrent jobs in one session) never share files, names are
+    de-duplicated within the job, and every artifact appears atomically or not at all.
+    """
+
+    def __init__(self, session_id=None, job_id=None, root=EXPORT_DIR):
+        session = re.sub(r"[^A-Za-z0-9_-]", "", session_id or current_session_id()) or "anonymous"
+        self.job_id = job_id or uuid.uuid4().hex
+        self.session_dir = os.path.join(root, session)
+        self.path = os.path.join(self.session_dir, self.job_id)
+        self._taken = set()
+        self.artifact = None
+        os.makedirs(self.path, exist_ok=True)
+        _prune_session(self.session_dir, keep=self.path)
+        collect_expired(root)
+
+    def unique_name(self, name):
+        return unique_name(name, self._taken)
+
+    @contextmanager
+    def atomic_write(self, name):
+        # Yields a binary file in the workspace; it is renamed into place only if the block succeeds
+        final_path = os.path.join(self.path, self.unique_name(name))
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.artifact = final_path
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _prune_session(session_dir, keep):
+    jobs = []
+    for name in os.listdir(session_dir):
+        path = os.path.join(session_dir, name)
+        if path != keep:
+            try:
+                jobs.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+    jobs.sort(reverse=True)
+    for _, path in jobs[max(EXPORT_JOBS_PER_SESSION - 1, 0):]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def collect_expired(root=EXPORT_DIR, now=None):
+    # Sessions that went away without cleaning up are removed once idle for EXPORT_TTL_SECONDS
+    now = now or time.time()
+    try:
+        sessions = os.listdir(root)
+    except FileNotFoundError:
+        return
+    for name in sessions:
+        path = os.path.join(root, name)
+        try:
+            if now - os.path.getmtime(path) > EXPORT_TTL_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+class Renderer:
+    """A layout function bound to its keyword arguments, e.g. Renderer(layout5, image_path=...).
+
+    Unlike a lambda it pickles (by module-level layout reference), so bulk exports can ship
+    it to the render process pool.
+    """
+
+    def __init__(self, layout, **kwargs):
+        self.layout = layout
+        self.kwargs = kwargs
+
+    def __call__(self, parsed_result, sink):
+        return self.layout(parsed_result, sink, **self.kwargs)
+
+
+def render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: forking a multi-threaded Streamlit server is not safe
+            _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=True)
+            _render_pool = None
+
+
+def _discard_render_pool(pool):
+    # A crashed worker breaks the pool for good: forget it (without waiting on it) so the next
+    # export starts a fresh one. Another thread may already have replaced it.
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_one(parsed_result, render):
+    # A layout error on one resume skips that resume, like a layout returning None
+    try:
+        return render_to_bytes(parsed_result, render)
+    except Exception as e:
+        logging.error(f"Error rendering resume: {e}")
+        return None, None
+
+
+def _render_chunk(render, payloads):
+    # Runs in a pool worker: JSON text in, (file name, document bytes) out
+    return [_render_one(payload, render) for payload in payloads]
+
+
+def _rendered(parsed_results, render, workers):
+    # Yields (source file name, arcname, bytes) in input order. Large batches of picklable
+    # renderers fan out across the pool; each chunk is yielded as soon as it and all earlier
+    # chunks are done, so the ZIP is written while later chunks are still rendering.
+    if workers <= 1 or len(parsed_results) < RENDER_PARALLEL_MIN or not isinstance(render, Renderer):
+        for file_name, parsed_result in parsed_results:
+            yield (file_name,) + render_to_bytes(parsed_result, render)
+        return
+
+    pool = render_pool()
+    chunks = [parsed_results[i:i + RENDER_CHUNK] for i in range(0, len(parsed_results), RENDER_CHUNK)]
+    futures = []
+    try:
+        for chunk in chunks:
+            futures.append(pool.submit(_render_chunk, render, [json.dumps(parsed_result) for _, parsed_result in chunk]))
+    except BrokenProcessPool as e:
+        # Chunks that never reached the pool are rendered in-process below
+        logging.error(f"Render pool broke, rendering the rest in-process: {e}")
+        _discard_render_pool(pool)
+    for i, chunk in enumerate(chunks):
+        rendered = None
+        if i < len(futures):
+            try:
+                rendered = futures[i].result()
+            except BrokenProcessPool as e:
+                logging.error(f"Render pool broke, rendering chunk in-process: {e}")
+                _discard_render_pool(pool)
+            except Exception as e:
+                # e.g. a result that failed to pickle; the pool itself is fine
+                logging.error(f"Render chunk failed, rendering it in-process: {e}")
+        if rendered is None:
+            rendered = [_render_one(parsed_result, render) for _, parsed_result in chunk]
+        for (file_name, _), (arcname, data) in zip(chunk, rendered):
+            yield file_name, arcname, data
+
+
+def render_to_bytes(parsed_result, render):
+    # render(parsed_result, sink) is a layout function bound to its extra arguments;
+    # it returns the file name, or None on failure
+    sink = io.BytesIO()
+    file_name = render(parsed_result, sink)
+    if not file_name:
+        return None, None
+    return file_name, sink.getvalue()
+
+
+def zip_layouts(parsed_results, render, sink=None, workers=RENDER_WORKERS):
+    # Writes the bundle into sink (any writable binary file) or an in-memory spool.
+    # Office files are already deflated zips, so they are stored rather than recompressed.
+    if sink is None:
+        sink = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_BYTES)
+    taken = set()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zipf:
+        for file_name, arcname, data in _rendered(list(parsed_results), render, workers):
+            if arcname is None:
+                logging.error(f"Skipping {file_name}: layout failed to render")
+                continue
+            # Two candidates with the same name must not overwrite each other
+            zipf.writestr(unique_name(arcname, taken), data)
+    if sink.seekable():
+        sink.seek(0)
+    return sink
+
+
+def export_bundle(parsed_results, render, workspace=None, zip_file_name="resumes.zip"):
+    # Builds the bundle inside a job workspace and returns the path of the finished ZIP
+    workspace = workspace or ExportWorkspace()
+    with workspace.atomic_write(zip_file_name) as f:
+        zip_layouts(parsed_results, render, f)
+    return workspace.artifact
+
+
+def bundle_key(parsed_results, layout_id, template_version):
+    # Same resumes + same layout + same template => byte-identical bundle
+    digest = hashlib.sha256()
+    for file_name, parsed_result in parsed_results:
+        digest.update(json.dumps([file_name, parsed_result], sort_keys=True).encode("utf-8"))
+        digest.update(b"\n")
+    digest.update(b"\0" + layout_id.encode("utf-8"))
+    digest.update(b"\0" + str(template_version).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# (session, bundle key) -> finished ZIP path; bundles are never shared across sessions
+_bundles = LRUCache(BUNDLE_CACHE_ENTRIES, EXPORT_TTL_SECONDS)
+
+
+def cached_bundle(key, session_id=None):
+    # Path of an already built bundle, or None. Cheap enough to call on every rerun.
+    cache_key = (session_id or current_session_id(), key)
+    path = _bundles.get(cache_key)
+    if path is None:
+        return None
+    if not os.path.exists(path):
+        # pruned with its workspace or expired on disk
+        _bundles.pop(cache_key)
+        return None
+    return path
+
+
+def memoised_artifact(key, write, file_name, session_id=None):
+    # Builds an export only when no identical one exists for this session; write(f) fills the
+    # file. The job workspace is named after the key so a rebuild replaces it rather than adding another.
+    session_id = session_id or current_session_id()
+    path = cached_bundle(key, session_id)
+    if path is None:
+        workspace = ExportWorkspace(session_id, job_id=key[:32])
+        with workspace.atomic_write(file_name) as f:
+            write(f)
+        path = workspace.artifact
+        _bundles.put((session_id, key), path)
+    return path
+
+
+def memoised_bundle(parsed_results, render, key, session_id=None, zip_file_name="resumes.zip"):
+    return memoised_artifact(key, lambda f: zip_layouts(parsed_results, render, f), zip_file_name, session_id)
@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+import inspect
+import contextvars
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from parse_cache import parse_cache, cache_key
+from LLMLab45 import submit_coroutine
+from rate_limit import INTERACTIVE, BATCH, llm_priority
+
+# Number of resumes parsed at the same time; the LLM wrapper still caps requests per endpoint
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "8"))
+# "threads" runs parse_resume on a thread pool, "async" runs aparse_resume on the shared event loop,
+# "queue" hands uploads to the durable job queue (job_queue.py) and polls it
+INGEST_MODE = os.getenv("INGEST_MODE", "threads")
+PARSE_ASYNC_CONCURRENCY = int(os.getenv("PARSE_ASYNC_CONCURRENCY", "32"))
+# Stream extraction responses and show each field as soon as the LLM closes it
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+
+def _accepts(fn, name):
+    return name in inspect.signature(fn).parameters
+
+
+def _parse_upload(uploaded_file, key, read_resume, parse_resume, on_field=None):
+    resume_text = read_resume(uploaded_file)
+    if not resume_text:
+        raise ValueError("Empty or unreadable resume text.")
+
+    kwargs = {}
+    # A background quality rating is written back to the same cache entry when it arrives
+    if _accepts(parse_resume, "on_rated"):
+        kwargs["on_rated"] = partial(parse_cache.put, key)
+    if on_field is not None and _accepts(parse_resume, "on_field"):
+        kwargs["on_field"] = on_field
+    parsed_result = parse_resume(resume_text, **kwargs)
+    if not parsed_result:
+        raise ValueError("Parsing returned no result.")
+
+    parse_cache.put(key, parsed_result)
+    return parsed_result
+
+
+def _live_preview(placeholder, file_name):
+    # on_field callback that re-renders the fields extracted so far
+    fields = {}
+
+    def on_field(key, value):
+        fields[key] = value
+        with placeholder.container():
+            st.caption(f"⏳ {file_name}")
+            st.json(dict(fields), expanded=True)
+    return on_field
+
+
+def _run_with_ctx(ctx, fn, *args):
+    # Let st.error/st.spinner calls inside the worker reach the user's session
+    add_script_run_ctx(ctx=ctx)
+    return fn(*args)
+
+
+async def _aparse_upload(ctx, semaphore, uploaded_file, key, read_resume, aparse_resume):
+    # The semaphore bounds how many resumes are in flight; file I/O stays off the event loop
+    async with semaphore:
+        resume_text = await asyncio.to_thread(_run_with_ctx, ctx, read_resume, uploaded_file)
+        if not resume_text:
+            raise ValueError("Empty or unreadable resume text.")
+
+        if _accepts(aparse_resume, "on_rated"):
+            parsed_result = await aparse_resume(resume_text, on_rated=partial(parse_cache.put, key))
+        else:
+            parsed_result = await aparse_resume(resume_text)
+        if not parsed_result:
+            raise ValueError("Parsing returned no result.")
+
+    await asyncio.to_thread(parse_cache.put, key, parsed_result)
+    return parsed_result
+
+
+def _collect(futures, uploaded_files, results, errors, progress_bar, done, total_files):
+    for future in as_completed(futures):
+        idx = futures[future]
+        try:
+            results[idx] = future.result()
+        except Exception as e:
+            errors[idx] = str(e)
+        done += 1
+        progress_bar.progress(done / total_files, text=f"Processed {uploaded_files[idx].name}")
+    return done
+
+
+def _await_jobs(uploaded_files, pending, agent, results, errors, progress_bar, status, done, total_files):
+    # Submits the uploads as jobs and polls until each is done or failed. Work runs in the job
+    # workers, so a closed tab or a rerun loses nothing: the same files map to the same jobs.
+    from job_queue import job_queue, ensure_workers, progress, JOB_POLL_SECONDS, QUEUED, DONE, FAILED
+    job_ids = {idx: job_queue.submit(uploaded_files[idx], agent, key) for idx, key in pending}
+    ensure_workers()
+    remaining = dict(job_ids)
+    while remaining:
+        jobs = job_queue.jobs(remaining.values())
+        running = []
+        for idx, job_id in list(remaining.items()):
+            job = jobs.get(job_id)
+            if job is None:
+                errors[idx] = "Job was removed before it finished."
+            elif job.status == DONE:
+                results[idx] = job.result
+            elif job.status == FAILED:
+                errors[idx] = job.error or "Parsing failed."
+            else:
+                running.append((uploaded_files[idx].name, job))
+                continue
+            del remaining[idx]
+        finished = done + len(job_ids) - len(remaining)
+        in_flight = sum(progress(job) for _, job in running)
+        progress_bar.progress(min((finished + in_flight) / total_files, 1.0), text=f"Processed {finished} of {total_files}")
+        with status.container():
+            for name, job in running:
+                st.caption(f"⏳ {name}: {job.stage}" + (f" (attempt {job.attempts})" if job.attempts > 1 else ""))
+        if remaining:
+            if any(job.status == QUEUED for _, job in running):
+                ensure_workers()  # the workers may have exited idle just as these were submitted
+            time.sleep(JOB_POLL_SECONDS)
+    return done + len(job_ids)
+
+
+def process_uploads(uploaded_files, read_resume, parse_resume, prompt_version, model_name, workers=PARSE_WORKERS,
+                    aparse_resume=None, mode=INGEST_MODE, agent=None):
+    # Returns (parsed_results, error_logs) in upload order, whatever order the files finish in.
+    # The queue mode needs the agent name ("recruit"/"sales") so workers use the same prompts.
+    total_files = len(uploaded_files)
+    results = [None] * total_files
+    errors = [None] * total_files
+    pending = []
+
+    # Cache hits are resolved up front so only real work reaches the pool
+    for idx, uploaded_file in enumerate(uploaded_files):
+        try:
+            key = cache_key(uploaded_file, prompt_version, model_name)
+            cached = parse_cache.get(key)
+        except Exception as e:
+            errors[idx] = str(e)
+            continue
+        if cached is not None:
+            results[idx] = cached
+        else:
+            pending.append((idx, key))
+
+    progress_bar = st.progress(0)
+    done = total_files - len(pending)
+    progress_bar.progress(done / total_files)
+
+    previews = {}
+    live = st.empty()
+    if STREAM_RESPONSES and pending:
+        with live.container():
+            previews = {idx: _live_preview(st.empty(), uploaded_files[idx].name) for idx, _ in pending}
+
+    # One resume is someone waiting at the screen; several are bulk work that yields the LLM budget to them
+    priority = INTERACTIVE if len(pending) == 1 else BATCH
+    if pending and mode == "queue" and agent is not None:
+        done = _await_jobs(uploaded_files, pending, agent, results, errors, progress_bar, live, done, total_files)
+    elif pending and (workers <= 1 or len(pending) == 1):
+        for idx, key in pending:
+            uploaded_file = uploaded_files[idx]
+            with st.spinner(f"Processing {uploaded_file.name}..."), llm_priority(priority):
+                try:
+                    results[idx] = _parse_upload(uploaded_file, key, read_resume, parse_resume, previews.get(idx))
+                except Exception as e:
+                    errors[idx] = str(e)
+            done += 1
+            progress_bar.progress(done / total_files)
+    elif pending:
+        ctx = get_script_run_ctx()
+        with st.spinner(f"Processing {len(pending)} resumes..."), llm_priority(priority):
+            if mode == "async" and aparse_resume is not None:
+                # Coroutines run on the shared background loop; this thread only tracks progress
+                semaphore = asyncio.Semaphore(PARSE_ASYNC_CONCURRENCY)
+                futures = {
+                    submit_coroutine(_aparse_upload(ctx, semaphore, uploaded_files[idx], key, read_resume, aparse_resume)): idx
+                    for idx, key in pending
+                }
+                done = _collect(futures, uploaded_files, results, errors, progress_bar, done, total_files)
+            else:
+                with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                    futures = {
+                        pool.submit(contextvars.copy_context().run, _run_with_ctx, ctx, _parse_upload,
+                                    uploaded_files[idx], key, read_resume, parse_resume, previews.get(idx)): idx
+                        for idx, key in pending
+                    }
+                    done = _collect(futures, uploaded_files, results, errors, progress_bar, done, total_files)
+
+    progress_bar.empty()  # Remove the progress bar after completion
+    live.empty()
+
+    parsed_results = []
+    error_logs = []
+    for uploaded_file, parsed_result, error in zip(uploaded_files, results, errors):
+        if error is not None:
+            error_logs.append((uploaded_file.name, error))
+        elif parsed_result is not None:
+            parsed_results.append((uploaded_file.name, parsed_result))
+    return parsed_results, error_logs
@@ -0,0 +1,436 @@
+# Durable resume-parsing jobs: a SQLite queue on local disk plus worker processes.
+#
+#   python -m job_queue work --processes 2 --threads 4
+#   python -m job_queue status
+#
+# A job id is the parse-cache key of the upload (file hash + prompt version + model), so the
+# same file submitted again, from any session or after a rerun, maps to the same job. Uploads
+# are copied next to the queue, workers claim jobs under a lease they keep renewing, and a job
+# whose worker died is picked up again once its lease runs out (up to JOB_MAX_ATTEMPTS).
+# Sessions only submit and poll; closing the tab does not stop or repeat any work.
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import shutil
+import logging
+import sqlite3
+import inspect
+import argparse
+import importlib
+import threading
+import subprocess
+import multiprocessing
+from functools import partial
+from collections import namedtuple
+
+from parse_cache import CACHE_DIR, parse_cache
+from uploads import LocalUpload
+from resume_parser import AGENTS
+from rate_limit import BATCH, set_priority
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+JOB_DB = os.getenv("JOB_DB", os.path.join(CACHE_DIR, "jobs.sqlite"))
+JOB_FILE_DIR = os.getenv("JOB_FILE_DIR", os.path.join(CACHE_DIR, "jobs"))
+# A running job whose worker has not renewed its lease for this long is handed to another worker
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_HOURS", "72")) * 3600
+JOB_PROCESSES = int(os.getenv("JOB_PROCESSES", "2"))
+JOB_THREADS = int(os.getenv("JOB_THREADS", "4"))
+# Start local workers from the app when none are alive
+JOB_AUTOSTART = os.getenv("JOB_AUTOSTART", "true").lower() in ("1", "true", "yes")
+# Workers started by the app exit after this long without a job; the app starts them again on demand
+JOB_WORKER_IDLE_SECONDS = int(os.getenv("JOB_WORKER_IDLE_SECONDS", "600"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+# stage -> progress shown while a job is in it
+STAGES = {"queued": 0.0, "reading": 0.1, "parsing": 0.3, "done": 1.0, "failed": 1.0}
+
+Job = namedtuple("Job", "id agent file_name file_type path status stage attempts result error")
+
+
+def _job(row):
+    job = Job(*row)
+    return job._replace(result=json.loads(job.result) if job.result else None)
+
+
+class JobQueue:
+    """Jobs table in SQLite (WAL), shared by app sessions and any number of worker processes."""
+
+    COLUMNS = "id, agent, file_name, file_type, path, status, stage, attempts, result, error"
+
+    def __init__(self, db_path=JOB_DB, file_dir=JOB_FILE_DIR):
+        self.db_path = db_path
+        self.file_dir = file_dir
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    os.makedirs(self.file_dir, exist_ok=True)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS jobs ("
+                        "id TEXT PRIMARY KEY, agent TEXT NOT NULL, file_name TEXT NOT NULL, file_type TEXT NOT NULL, "
+                        "path TEXT, status TEXT NOT NULL, stage TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                        "result TEXT, error TEXT, worker TEXT, lease_until REAL, created REAL NOT NULL, updated REAL NOT NULL)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created)")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS workers ("
+                        "id TEXT PRIMARY KEY, host TEXT NOT NULL, pid INTEGER NOT NULL, started REAL NOT NULL, "
+                        "seen REAL NOT NULL, done INTEGER NOT NULL DEFAULT 0)"
+                    )
+                    self._ready = True
+        return conn
+
+    def _store_file(self, job_id, upload):
+        # Copy the upload where worker processes can read it, in blocks rather than one in-memory copy;
+        # atomic so a worker never sees half a file
+        path = os.path.join(self.file_dir, job_id + os.path.splitext(upload.name)[1].lower())
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            upload.seek(0)
+            shutil.copyfileobj(upload, f)
+        os.replace(tmp_path, path)
+        return path
+
+    def submit(self, upload, agent, job_id, cached=None):
+        # Idempotent: an existing job is left alone unless it failed, in which case it is retried.
+        # cached is an already known parse result; the job is then recorded as done straight away.
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None and row[0] != FAILED:
+                return job_id
+            now = time.time()
+            if cached is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (id, agent, file_name, file_type, path, status, stage, attempts, result, "
+                    "created, updated) VALUES (?, ?, ?, ?, NULL, ?, ?, 0, ?, ?, ?)",
+                    (job_id, agent, upload.name, upload.type, DONE, DONE, json.dumps(cached), now, now)
+                )
+                return job_id
+            path = self._store_file(job_id, upload)
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, agent, file_name, file_type, path, status, stage, attempts, "
+                "created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                (job_id, agent, upload.name, upload.type, path, QUEUED, QUEUED, now, now)
+            )
+            return job_id
+        finally:
+            conn.close()
+
+    def jobs(self, job_ids):
+        # id -> Job for the ids that exist
+        job_ids = list(job_ids)
+        conn = self._connect()
+        try:
+            found = {}
+            for i in range(0, len(job_ids), 500):
+                chunk = job_ids[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT {self.COLUMNS} FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((row[0], _job(row)) for row in rows)
+            return found
+        finally:
+            conn.close()
+
+    def claim(self, worker_id):
+        # Oldest queued job, or a running one whose worker stopped renewing its lease
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, error = ?, updated = ? "
+                    "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (FAILED, FAILED, "Worker stopped responding", now, RUNNING, now, JOB_MAX_ATTEMPTS)
+                )
+                row = conn.execute(
+                    f"SELECT {self.COLUMNS} FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?) "
+                    "ORDER BY created LIMIT 1",
+                    (QUEUED, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, attempts = attempts + 1, worker = ?, lease_until = ?, "
+                    "updated = ? WHERE id = ?",
+                    (RUNNING, "reading", worker_id, now + JOB_LEASE_SECONDS, now, row[0])
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return _job(row)._replace(status=RUNNING, stage="reading", attempts=row[7] + 1)
+        finally:
+            conn.close()
+
+    def _update_own(self, job_id, worker_id, sql, params):
+        # Only the worker holding the lease may change a running job; False when it was lost
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {sql}, updated = ? WHERE id = ? AND worker = ? AND status = ?",
+                params + (time.time(), job_id, worker_id, RUNNING)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id, worker_id, stage=None):
+        if stage is None:
+            return self._update_own(job_id, worker_id, "lease_until = ?", (time.time() + JOB_LEASE_SECONDS,))
+        return self._update_own(job_id, worker_id, "lease_until = ?, stage = ?", (time.time() + JOB_LEASE_SECONDS, stage))
+
+    def complete(self, job, worker_id, parsed_result):
+        if self._update_own(job.id, worker_id, "status = ?, stage = ?, result = ?, error = NULL",
+                            (DONE, DONE, json.dumps(parsed_result))):
+            self._remove_file(job.path)
+
+    def fail(self, job, worker_id, error):
+        # Retried while attempts remain: LLM answers that did not decode often succeed next time
+        if job.attempts < JOB_MAX_ATTEMPTS:
+            self._update_own(job.id, worker_id, "status = ?, stage = ?, error = ?, lease_until = NULL",
+                             (QUEUED, QUEUED, error))
+        elif self._update_own(job.id, worker_id, "status = ?, stage = ?, error = ?", (FAILED, FAILED, error)):
+            self._remove_file(job.path)
+
+    def _remove_file(self, path):
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def counts(self):
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        finally:
+            conn.close()
+
+    def worker_seen(self, worker_id, done=0):
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT INTO workers (id, host, pid, started, seen, done) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET seen = excluded.seen, done = excluded.done",
+                (worker_id, socket.gethostname(), os.getpid(), now, now, done)
+            )
+        finally:
+            conn.close()
+
+    def worker_gone(self, worker_id):
+        # A worker that exits cleanly stops counting as live at once, so the app can start another
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+        finally:
+            conn.close()
+
+    def live_workers(self):
+        conn = self._connect()
+        try:
+            since = time.time() - JOB_LEASE_SECONDS
+            return conn.execute("SELECT id, host, pid, done FROM workers WHERE seen >= ?", (since,)).fetchall()
+        finally:
+            conn.close()
+
+    def prune(self, now=None):
+        # Finished jobs and dead workers are forgotten after JOB_TTL_SECONDS
+        now = now or time.time()
+        conn = self._connect()
+        try:
+            for (path,) in conn.execute(
+                "SELECT path FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, now - JOB_TTL_SECONDS)
+            ).fetchall():
+                self._remove_file(path)
+            conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, now - JOB_TTL_SECONDS))
+            conn.execute("DELETE FROM workers WHERE seen < ?", (now - JOB_TTL_SECONDS,))
+        finally:
+            conn.close()
+
+
+def progress(job):
+    return STAGES.get(job.stage, 0.0)
+
+
+# --- workers ------------------------------------------------------------------------------
+
+def _keep_lease(queue, job, worker_id, stop):
+    while not stop.wait(JOB_LEASE_SECONDS / 3):
+        if not queue.heartbeat(job.id, worker_id):
+            return
+
+
+def process_job(queue, job, worker_id):
+    core = importlib.import_module(AGENTS[job.agent])
+    stop = threading.Event()
+    lease = threading.Thread(target=_keep_lease, args=(queue, job, worker_id, stop), daemon=True)
+    lease.start()
+    try:
+        upload = LocalUpload(job.path)
+        upload.name, upload.type = job.file_name, job.file_type
+        resume_text = core.read_resume(upload)
+        if not resume_text:
+            raise ValueError("Empty or unreadable resume text.")
+        queue.heartbeat(job.id, worker_id, "parsing")
+        kwargs = {}
+        if "on_rated" in inspect.signature(core.parse_resume).parameters:
+            # the job id is the parse-cache key
+            kwargs["on_rated"] = partial(parse_cache.put, job.id)
+        parsed_result = core.parse_resume(resume_text, **kwargs)
+        if not isinstance(parsed_result, dict):
+            raise ValueError("Parsing returned no result.")
+        parse_cache.put(job.id, parsed_result)
+        queue.complete(job, worker_id, parsed_result)
+    except Exception as e:
+        logging.error(f"Job {job.id} ({job.file_name}) failed on attempt {job.attempts}: {e}")
+        queue.fail(job, worker_id, str(e))
+    finally:
+        stop.set()
+
+
+def run_worker(queue=None, threads=JOB_THREADS, stop=None, idle_seconds=0):
+    # One worker process: `threads` loops claiming and parsing jobs until stop is set, or
+    # (with idle_seconds) until no job has been claimed for that long and none is queued
+    queue = queue or JobQueue()
+    stop = stop or threading.Event()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    done = [0]
+    busy = [0]
+    last_active = [time.monotonic()]
+    busy_lock = threading.Lock()
+
+    def loop():
+        # Queued jobs yield the LLM budget to interactive single-resume requests
+        set_priority(BATCH)
+        while not stop.is_set():
+            job = queue.claim(worker_id)
+            if job is None:
+                stop.wait(JOB_POLL_SECONDS)
+                continue
+            with busy_lock:
+                busy[0] += 1
+            try:
+                process_job(queue, job, worker_id)
+            finally:
+                with busy_lock:
+                    busy[0] -= 1
+                    done[0] += 1
+                    last_active[0] = time.monotonic()
+
+    def idle():
+        with busy_lock:
+            if busy[0] or time.monotonic() - last_active[0] < idle_seconds:
+                return False
+        return not queue.counts().get(QUEUED)
+
+    tick = JOB_LEASE_SECONDS / 3
+    if idle_seconds:
+        tick = min(tick, max(idle_seconds / 4, JOB_POLL_SECONDS))
+    loops = [threading.Thread(target=loop, name=f"job-worker-{i}", daemon=True) for i in range(threads)]
+    queue.worker_seen(worker_id)
+    for thread in loops:
+        thread.start()
+    try:
+        while not stop.wait(tick):
+            queue.worker_seen(worker_id, done[0])
+            if idle_seconds and idle():
+                stop.set()
+        for thread in loops:
+            thread.join()
+    finally:
+        queue.worker_gone(worker_id)
+
+
+def _worker_main(threads, idle_seconds):
+    try:
+        run_worker(JobQueue(), threads, idle_seconds=idle_seconds)
+    except KeyboardInterrupt:
+        pass
+
+
+def work(processes=JOB_PROCESSES, threads=JOB_THREADS, idle_seconds=0):
+    # spawn: the same start method as the PDF and render pools
+    JobQueue().prune()
+    context = multiprocessing.get_context("spawn")
+    children = [context.Process(target=_worker_main, args=(threads, idle_seconds), name=f"job-worker-{i}") for i in range(processes)]
+    for child in children:
+        child.start()
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        # Running jobs are picked up again by the next worker once their lease expires
+        for child in children:
+            child.terminate()
+        for child in children:
+            child.join()
+
+
+_autostart_lock = threading.Lock()
+_autostarted = None
+
+
+def ensure_workers(queue=None):
+    # Starts a detached local worker group when no worker has checked in recently. It outlives
+    # the Streamlit session so queued jobs always finish, then exits once idle for
+    # JOB_WORKER_IDLE_SECONDS; the next submit starts it again.
+    global _autostarted
+    queue = queue or JobQueue()
+    if not JOB_AUTOSTART:
+        return False
+    with _autostart_lock:
+        if queue.live_workers():
+            return False
+        if _autostarted is not None and _autostarted.poll() is None:
+            return False
+        _autostarted = subprocess.Popen(
+            [sys.executable, "-m", "job_queue", "work", "--idle-exit", str(JOB_WORKER_IDLE_SECONDS)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        return True
+
+
+job_queue = JobQueue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m job_queue", description="Resume parsing job queue.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("work", help="run worker processes until interrupted")
+    worker.add_argument("--processes", type=int, default=JOB_PROCESSES, help="worker processes to start")
+    worker.add_argument("--threads", type=int, default=JOB_THREADS, help="jobs each process runs at once")
+    worker.add_argument("--idle-exit", type=int, default=0, metavar="SECONDS",
+                        help="exit after this long with no jobs (default: run until interrupted)")
+    commands.add_parser("status", help="show job counts and live workers")
+    args = parser.parse_args(argv)
+
+    if args.command == "work":
+        work(args.processes, args.threads, args.idle_exit)
+    else:
+        print(json.dumps({"jobs": job_queue.counts(), "workers": job_queue.live_workers()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import json
+
+
+class JSONFieldStream:
+    """Incremental parser that reports top-level JSON fields as soon as they close.
+
+    Feed it text as it streams in; anything before the first "{" (such as a ```json
+    fence) is ignored. Each completed member (e.g. "Name", "Email", "Skills") is
+    returned from feed() as a (key, value) pair.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self._buf = ""
+        self._pos = 0
+        self._member_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.done = False
+
+    def feed(self, text):
+        completed = []
+        if self.done or not text:
+            return completed
+        self._buf += text
+        buf = self._buf
+        i = self._pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buf[self._member_start:i], completed)
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                self._emit(buf[self._member_start:i], completed)
+                self._member_start = i + 1
+            i += 1
+
+        # Drop text that belongs to members already emitted
+        drop = self._member_start if self._started else i
+        self._buf = buf[drop:]
+        self._pos = i - drop
+        self._member_start -= drop if self._started else 0
+        return completed
+
+    def _emit(self, member, completed):
+        if not member.strip():
+            return
+        try:
+            obj = json.loads("{" + member + "}")
+        except ValueError:
+            return
+        for key, value in obj.items():
+            self.fields[key] = value
+            completed.append((key, value))
+
+
+def collect_stream(chunks, on_field=None):
+    # Joins streamed text chunks, calling on_field(key, value) for each field as it closes
+    parser = JSONFieldStream()
+    text = []
+    for chunk in chunks:
+        text.append(chunk)
+        for key, value in parser.feed(chunk):
+            if on_field is not None:
+                on_field(key, value)
+    return "".join(text)
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), "Documents", "resumeparser")
+CACHE_DB = os.getenv("PARSE_CACHE_DB", os.path.join(CACHE_DIR, "parse_cache.sqlite"))
+MEMORY_ENTRIES = int(os.getenv("PARSE_CACHE_MEMORY_ENTRIES", "256"))
+DISK_MAX_BYTES = int(os.getenv("PARSE_CACHE_DISK_MB", "256")) * 1024 * 1024
+MAX_AGE_SECONDS = int(os.getenv("PARSE_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600
+EVICT_EVERY = 32  # run disk eviction once every N writes
+HASH_BLOCK = 1024 * 1024
+
+
+def cache_key(source, prompt_version, model_name):
+    # Same upload + same prompt + same model => same parse.
+    # source is bytes or a seekable file object, hashed in blocks without a full copy.
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(HASH_BLOCK), b""):
+            digest.update(block)
+        source.seek(0)
+    digest.update(b"\0" + prompt_version.encode("utf-8"))
+    digest.update(b"\0" + model_name.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU with an optional max age per entry."""
+
+    def __init__(self, max_entries=MEMORY_ENTRIES, max_age=None):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if self.max_age is not None and time.time() - stored_at > self.max_age:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (time.time(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            item = self._items.pop(key, None)
+            return item[1] if item else None
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ParseCache:
+    """Two-tier parse cache: in-memory LRU in front of a SQLite store on disk."""
+
+    def __init__(self, db_path=CACHE_DB, memory_entries=MEMORY_ENTRIES,
+                 max_bytes=DISK_MAX_BYTES, max_age=MAX_AGE_SECONDS):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.memory = LRUCache(memory_entries, max_age)
+        self._lock = threading.Lock()
+        self._ready = False
+        self._writes = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS parse_cache ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                        "created REAL NOT NULL, accessed REAL NOT NULL)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_accessed ON parse_cache(accessed)")
+                    conn.commit()
+                    self._ready = True
+        return conn
+
+    def get(self, key):
+        result = self.memory.get(key)
+        if result is not None:
+            return result
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT value, created FROM parse_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if now - row[1] > self.max_age:
+                    conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    return None
+                conn.execute("UPDATE parse_cache SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+            finally:
+                conn.close()
+            result = json.loads(row[0])
+            self.memory.put(key, result)
+            return result
+        except Exception as e:
+            # A broken cache must never break parsing
+            logging.error(f"Error reading parse cache: {e}")
+            return None
+
+    def put(self, key, result):
+        self.memory.put(key, result)
+        try:
+            value = json.dumps(result)
+            now = time.time()
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO parse_cache (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now)
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % EVICT_EVERY == 1:
+                    self._evict(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"Error writing parse cache: {e}")
+
+    def _evict(self, conn):
+        # Age first, then least recently used until the store fits the size budget
+        conn.execute("DELETE FROM parse_cache WHERE created < ?", (time.time() - self.max_age,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+        if total > self.max_bytes:
+            freed = 0
+            doomed = []
+            for key, size in conn.execute("SELECT key, size FROM parse_cache ORDER BY accessed"):
+                doomed.append((key,))
+                freed += size
+                if total - freed <= self.max_bytes:
+                    break
+            conn.executemany("DELETE FROM parse_cache WHERE key = ?", doomed)
+        conn.commit()
+
+    def clear(self):
+        self.memory.clear()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM parse_cache")
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"Error clearing parse cache: {e}")
+
+
+os.makedirs(os.path.dirname(CACHE_DB), exist_ok=True)
+parse_cache = ParseCache()
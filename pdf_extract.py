@@ -0,0 +1,217 @@
+import io
+import os
+import shutil
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# "full" runs pdfplumber text + table extraction on every page.
+# "fast" reads text with pdfium and only runs pdfplumber table detection on pages that draw lines/boxes.
+PDF_BACKEND = os.getenv("PDF_BACKEND", "full")
+# PDFs with more pages than this are split across a process pool
+PDF_PARALLEL_PAGES = int(os.getenv("PDF_PARALLEL_PAGES", "24"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Uploads larger than this are spooled to a temp file and read from disk page by page
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_MB", "8")) * 1024 * 1024
+COPY_BLOCK = 1024 * 1024
+
+PAGE_BREAK = "\f"
+
+_pool = None
+_pool_lock = threading.Lock()
+# PDFium is not thread-safe: every pdfium call in this process goes through this lock.
+# Workers in the spawn pool run one range at a time and need no lock.
+_pdfium_lock = threading.Lock()
+
+
+def _table_rows(page):
+    rows = []
+    for table in page.extract_tables():
+        for row in table:
+            rows.append("\t".join(cell if cell else "" for cell in row))
+    return rows
+
+
+def _page_lines(text, rows):
+    lines = [text] if text else []
+    lines.extend(rows)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _open_plumber(src):
+    return pdfplumber.open(io.BytesIO(src) if isinstance(src, bytes) else src)
+
+
+def _full_pages(src, start, stop):
+    # pdfplumber for everything; each page is extracted once and its cache released
+    with _open_plumber(src) as pdf:
+        for number in range(start, min(stop, len(pdf.pages))):
+            page = pdf.pages[number]
+            try:
+                yield _page_lines(page.extract_text(), _table_rows(page))
+            finally:
+                page.close()  # flush_cache(): drop parsed layout objects as we go
+
+
+def _has_ruling(pdf_page):
+    # pdfplumber's default table finder builds tables from drawn edges; no paths means no tables
+    for _ in pdf_page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH], max_depth=2):
+        return True
+    return False
+
+
+def _pdfium_page(document, number):
+    pdf_page = document[number]
+    try:
+        textpage = pdf_page.get_textpage()
+        text = textpage.get_text_range().replace("\r\n", "\n").strip()
+        textpage.close()
+        return text, _has_ruling(pdf_page)
+    finally:
+        pdf_page.close()
+
+
+def _fast_pages(src, start, stop, lock=_pdfium_lock):
+    # The lock is held per page, never across a yield; pdfplumber's table pass runs outside it
+    with lock:
+        document = pdfium.PdfDocument(src)
+        total = len(document)
+    plumber = None
+    try:
+        for number in range(start, min(stop, total)):
+            with lock:
+                text, ruled = _pdfium_page(document, number)
+            rows = []
+            if ruled:
+                if plumber is None:
+                    plumber = _open_plumber(src)
+                page = plumber.pages[number]
+                try:
+                    rows = _table_rows(page)
+                finally:
+                    page.close()
+            yield _page_lines(text, rows)
+    finally:
+        if plumber is not None:
+            plumber.close()
+        with lock:
+            document.close()
+
+
+BACKENDS = {
+    "full": _full_pages,
+    "fast": _fast_pages,
+}
+
+
+def page_count(src, backend=None):
+    # The full backend never touches pdfium, so it counts pages with pdfplumber
+    if (backend or PDF_BACKEND) == "full":
+        with _open_plumber(src) as pdf:
+            return len(pdf.pages)
+    with _pdfium_lock:
+        document = pdfium.PdfDocument(src)
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+
+def _extract_range(backend, src, start, stop):
+    # Runs in a spawn pool worker, which has pdfium to itself
+    if backend == "fast":
+        return list(_fast_pages(src, start, stop, lock=nullcontext()))
+    return list(BACKENDS[backend](src, start, stop))
+
+
+def _process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a multi-threaded Streamlit server is not safe
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def iter_pages(src, backend=None, workers=PDF_WORKERS):
+    # Yields the text of every page, in order. src is PDF bytes or a file path;
+    # large PDFs fan out across processes by page range.
+    backend = backend or PDF_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    total = page_count(src, backend)
+    if total <= PDF_PARALLEL_PAGES or workers <= 1:
+        yield from BACKENDS[backend](src, 0, total)
+        return
+
+    step = -(-total // workers)
+    pool = _process_pool()
+    futures = [pool.submit(_extract_range, backend, src, start, min(start + step, total))
+               for start in range(0, total, step)]
+    for future in futures:
+        yield from future.result()
+
+
+def extract_pages(src, backend=None, workers=PDF_WORKERS):
+    return list(iter_pages(src, backend, workers))
+
+
+def _source_size(source):
+    size = getattr(source, "size", None)
+    if size is None:
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+    return size
+
+
+@contextmanager
+def spooled_source(source, threshold=UPLOAD_SPOOL_BYTES):
+    # Small inputs are handed over as bytes; big ones are copied to a temp file in blocks so
+    # pdfium/pdfplumber (and pool workers) read them from disk instead of another in-memory copy
+    if isinstance(source, str):
+        yield source
+        return
+    if isinstance(source, (bytes, bytearray)):
+        if len(source) <= threshold:
+            yield bytes(source)
+            return
+        source = io.BytesIO(source)
+    elif _source_size(source) <= threshold:
+        source.seek(0)
+        yield source.read()
+        return
+
+    spool = tempfile.NamedTemporaryFile(prefix="resume-", suffix=".pdf", delete=False)
+    try:
+        source.seek(0)
+        shutil.copyfileobj(source, spool, COPY_BLOCK)
+        spool.close()
+        yield spool.name
+    finally:
+        spool.close()
+        os.remove(spool.name)
+
+
+def extract_pdf_text(source, backend=None):
+    # source: bytes, a path, or a file-like object such as Streamlit's UploadedFile
+    with spooled_source(source) as src:
+        return PAGE_BREAK.join(iter_pages(src, backend))
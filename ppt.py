@@ -3,174 +3,29 @@ from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
-import pdfplumber
 import json
 import os
-import zipfile
+import io
+from export import bundle_key, cached_bundle, memoised_bundle, memoised_artifact
 from doccreation import layout3, layout1, layout2
-from pptcreation import layout5
-from pydantic import BaseModel
-from typing import List
-from langchain.prompts import PromptTemplate
-from LLMLab45 import LlamaLLM  # Your custom LLM wrapper
- 
-# Define the Pydantic model for structured output
-class Resume(BaseModel):
-    name: str
-    email: str
-    phone: str
-    linkedin: str
-    summary: str
-    skills: List[str]
-    certifications: List[str]
-    experience: List[dict]
-    education: List[dict]
-     
-#logo
-image_path= r"D:\OneDrive - Wipro\Desktop\Trainng-Perl_Python\Python_Codes\LLM_USE Cases\Resume_Parser\New folder\\Wipro_Primary Logo_Color_RGB.png"
-# Prompt template for resume parsing
-prompt_template = PromptTemplate(
-    input_variables=["resume_text"],
-    template="""
-Extract the following information from the resume:
- 
-- Name
-- Email
-- Phone
-- Linkedin (look for any linkedin.com profile or link mentioned in the Profile)
-- Summary (summarize within 500 characters)
-- Roles Played
-- Areas of Expertise
-- Skills (Populate Top 15 skills based on your understanding of the complete profile)
-- Industry Sectors
-- Consulting Engagements (Only take the Top 5 engagements name where person have performed a Consultant role as per profile)
-- Education or Academic Profile and Certifications
-- Experience and Accomplishments
- 
-Provide the output in JSON format with the following keys:
-- Name
-- Email
-- Phone
-- Linkedin
-- Summary
-- Roles Played
-- Areas of Expertise
-- Skills
-- Industry Sectors
-- Consulting Engagements
-- Education or Academic Profile and Certifications
-- Experience and Accomplishments
- 
-### Parsing Instructions:
- 
-**Roles Played**:
-- From the experience section, extract all distinct roles the individual has held.
- 
-**Industry Sectors**:
-- From the experience section, identify the domains or industries the individual has worked in (e.g., Healthcare, Finance, Retail).
- 
-**Areas of Expertise**:
-- Identify domains, technologies, methodologies, or roles the individual has demonstrated experience in.
-- Focus on what they have done, built, led, or contributed to.
-- Present the output as a list of implicit areas of expertise, grouped by category if possible (e.g., Technical Domains, Tools & Technologies, Business Functions, etc.).
- 
-**Experience and Accomplishments**:
-For each professional experience listed in the resume, extract the following details:
-- Title
-- Company
-- Duration
-- Location (if available)
-- Detailed Roles and Responsibilities:
-    - List each responsibility as a separate bullet point.
-    - Include both technical and managerial responsibilities.
-    - Capture any leadership, mentoring, or cross-functional collaboration.
-    - Include tools, technologies, or methodologies used.
-    - If achievements or outcomes are mentioned (e.g., improved performance, cost savings), include them as part of the responsibility.
-    - Maintain the original context and phrasing as much as possible, but ensure clarity.
-    - Ensure completeness—do not summarize or omit relevant details.
- 
-**Education or Academic Profile and Certifications**:
-For each education entry, extract:
-- Degree
-- Institution
-- Duration or Year
- 
-Resume text:
-{resume_text}
-"""
-)
- 
-# Initialize LLM
-llm = LlamaLLM()
- 
+import sales_core
+from pptcreation import TEMPLATE_VERSION, deck_layout5
+from sales_core import CACHE_VERSION, image_path, llm, layout5, renderer, layout_id
+from assets import ASSET_DIR, asset, preload
+from ingest import process_uploads
+ 
+# Prompts, extraction and layouts live in sales_core (shared with the headless CLI);
+# these wrappers report failures in the UI the way the app always has
 def read_resume(uploaded_file):# -> Any | str | None:
     try:
-        if uploaded_file.type == "text/plain":
-            return uploaded_file.read().decode("utf-8")
-        elif uploaded_file.type == "application/pdf":
-            with pdfplumber.open(uploaded_file) as pdf:
-                #return "".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-                text = ""
-                for page in pdf.pages:
-                    # Extract regular text
-                    if page.extract_text():
-                        text += page.extract_text() + "\n"
- 
-                    # Extract tables
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            text += "\t".join(cell if cell else "" for cell in row) + "\n"
-            return text
-        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            doc = Document(uploaded_file)
-            return "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        else:
-            raise ValueError("Unsupported file type")
+        return sales_core.read_resume(uploaded_file)
     except Exception as e:
         st.error(f"Error reading resume: {e}")
         return None
- 
-def parse_resume(resume_text):
+
+def parse_resume(resume_text, mode=None, on_field=None):
     try:
-        summarised_response = llm._call(
-            "Kindly provide summary of profile, ensuring to include full name, email address, phone number, only single list of technical skills without categorizing, details of business capabilities, an overview of functional capabilities and complete professional experience along with roles and responsibilities if any, special notes read the entire profile before summarising as there can be multiple profile formats embedded one below another. Read profile till the end and then summarise." + resume_text,
-            user="user"
-        )
- 
-        if isinstance(summarised_response, tuple):
-            summarised_response = summarised_response[0]
- 
-        if isinstance(summarised_response, dict) and "data" in summarised_response and "content" in summarised_response["data"]: # type: ignore
-            summarised_text = summarised_response["data"]["content"] # type: ignore
-        else:
-            summarised_text = summarised_response  # fallback if already a string
- 
-        formatted_prompt = prompt_template.format(resume_text=summarised_text)
-        parsed_response = llm._call(prompt=formatted_prompt, user="user")
- 
-        if isinstance(parsed_response, tuple):
-            parsed_response = parsed_response[0]
- 
-        if isinstance(parsed_response, dict) and "data" in parsed_response and "content" in parsed_response["data"]: # type: ignore
-            parsed_text = parsed_response["data"]["content"] # type: ignore
-        else:
-            parsed_text = parsed_response
- 
-        if isinstance(parsed_text, str):
-            parsed_text = parsed_text.strip()
-            if parsed_text.startswith("```json"):
-                parsed_text = parsed_text.replace("```json", "").strip()
-            if parsed_text.endswith("```"):
-                parsed_text = parsed_text.replace("```", "").strip()
-                print(type(parsed_text))
-            parsed_resume = json.loads(parsed_text)
-           
-        else:
-            raise ValueError("Parsed content is not a string")
- 
-        return parsed_resume
- 
+        return sales_core.parse_resume(resume_text, mode, on_field)
     except json.JSONDecodeError as e:
         st.error(f"JSON parsing error: {e}")
         return None
@@ -178,24 +33,27 @@ def parse_resume(resume_text):
         st.error(f"Error parsing resume: {e}")
         return None
 
+# Async variant of parse_resume for the event-loop ingestion mode. The loop cannot reach the
+# page, so errors are raised and process_uploads reports them on the script thread.
+async def aparse_resume(resume_text, mode=None):
+    try:
+        return await sales_core.aparse_resume(resume_text, mode)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON parsing error: {e}") from e
+    except Exception as e:
+        raise ValueError(f"Error parsing resume: {e}") from e
 
 def generate_and_offer_download(parsed_result, layout_function):
     try:
-        save_path = os.path.join(os.path.expanduser("~"), "Documents", "resumeparser")
-        os.makedirs(save_path, exist_ok=True)
-        resume_json = json.dumps(parsed_result)
-        #st.json(resume_json)
-        file_path = layout_function(resume_json, save_path, image_path)
-        #st.write(file_path)
-        if file_path:
-            file_name = os.path.basename(file_path)
-            with open(file_path, "rb") as f:
-                st.download_button(
-                    label="⬇️ Download",
-                    data=f.read(),
-                    file_name=file_name,
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
+        sink = io.BytesIO()
+        file_name = layout_function(parsed_result, sink, image_path)
+        if file_name:
+            st.download_button(
+                label="⬇️ Download",
+                data=sink.getvalue(),
+                file_name=file_name,
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            )
             st.balloons()
             #st.success("Resume generated and ready for download!")
         else:
@@ -203,32 +61,29 @@ def generate_and_offer_download(parsed_result, layout_function):
     except Exception as e:
         st.error(f"Error generating or downloading resume: {e}")
  
-def generate_and_zip_resumes(parsed_results, layout_function, zip_file_name="resumes.zip"):
+def export_key(parsed_results, layout_function):
+    return bundle_key(parsed_results, layout_id(layout_function), TEMPLATE_VERSION)
+
+def deck_key(parsed_results):
+    return export_key(parsed_results, deck_layout5)
+
+def generate_and_zip_resumes(parsed_results, layout_function):
+    # Renders every resume in memory into a ZIP written atomically to this session's own
+    # export workspace; returns the ZIP path. Unchanged inputs reuse the bundle already built.
     try:
-        save_path = os.path.join(os.path.expanduser("~"), "Documents", "resumeparser")
-        os.makedirs(save_path, exist_ok=True)
- 
-        temp_dir = os.path.join(save_path, "temp_resumes")
-        os.makedirs(temp_dir, exist_ok=True)
- 
-        for file_name, parsed_result in parsed_results:
-            resume_json = json.dumps(parsed_result)
-            layout_function(resume_json, temp_dir, image_path)
- 
-        zip_file_path = os.path.join(save_path, zip_file_name)
-        with zipfile.ZipFile(zip_file_path, 'w') as zipf:
-            for root, _, files in os.walk(temp_dir):
-                for file in files:
-                    zipf.write(os.path.join(root, file), arcname=file)
+        return memoised_bundle(parsed_results, renderer(layout_function), export_key(parsed_results, layout_function))
  
-        for file in os.listdir(temp_dir):
-            os.remove(os.path.join(temp_dir, file))
-        os.rmdir(temp_dir)
+    except Exception as e:
+        st.error(f"Error generating or zipping resumes: {e}")
+        return None
  
-        return zip_file_path
+def generate_deck(parsed_results):
+    # Every profile (and its continuation slides) in one presentation sharing the background and logo; memoised like the ZIP
+    try:
+        return memoised_artifact(deck_key(parsed_results), lambda f: deck_layout5(parsed_results, f, image_path), "Candidate_Profiles.pptx")
  
     except Exception as e:
-        st.error(f"Error generating or zipping resumes: {e}")
+        st.error(f"Error generating the deck: {e}")
         return None
  
 # Layout selection functions
@@ -246,10 +101,12 @@ def option_three(parsed_result):
  
 # Image layout options
 images = [
-    ("Kallisti", r"./New folder/Layout4.png", option_one)
-    #("Phaedon", r"./New folder/Layout2.png", option_two),
-    #("Erasmos", r"./New folder/Layout3.png", option_three),
+    ("Kallisti", os.path.join(ASSET_DIR, "Layout4.png"), option_one)
+    #("Phaedon", os.path.join(ASSET_DIR, "Layout2.png"), option_two),
+    #("Erasmos", os.path.join(ASSET_DIR, "Layout3.png"), option_three),
 ]
+# Logo and previews are read once per process; reruns and renders are served from memory
+preload(image_path, *(img_path for _, img_path, _ in images))
 
 def ppt_call(): 
     # Streamlit UI
@@ -263,28 +120,7 @@ def ppt_call():
     error_logs = []
     
     if uploaded_files:
-            progress_bar = st.progress(0)
-            total_files = len(uploaded_files)
-        
-            for idx, uploaded_file in enumerate(uploaded_files):
-                with st.spinner(f"Processing {uploaded_file.name}..."):
-                    try:
-                        resume_text = read_resume(uploaded_file)
-                        if not resume_text:
-                            raise ValueError("Empty or unreadable resume text.")
-        
-                        parsed_result = parse_resume(resume_text)
-                        if not parsed_result:
-                            raise ValueError("Parsing returned no result.")
-        
-                        parsed_results.append((uploaded_file.name, parsed_result))
-                    except Exception as e:
-                        error_logs.append((uploaded_file.name, str(e)))
-        
-                # Update progress bar
-                progress_bar.progress((idx + 1) / total_files)
-        
-            progress_bar.empty()  # Remove the progress bar after completion
+            parsed_results, error_logs = process_uploads(uploaded_files, read_resume, parse_resume, CACHE_VERSION, llm.model_name, aparse_resume=aparse_resume, agent="sales")
         
             # Display error summary
             if error_logs:
@@ -326,7 +162,9 @@ def ppt_call():
         cols = st.columns(3, vertical_alignment="center",border=False)
         for i, (title, img_path, func) in enumerate(images):
             with cols[i]:
-                st.image(img_path, use_container_width=False)
+                preview = asset(img_path)
+                if preview:
+                    st.image(preview.data, use_container_width=False)
                 if st.button(f"Layout: {title}", use_container_width=True,disabled=True):
                     #func(parsed_result)
                     print("")
@@ -343,13 +181,31 @@ def ppt_call():
         selected_layout_function = layout_options[selected_layout_label]
     
         st.markdown("<h8 style='font-size: 16px;'> 📦 Download All Resumes as ZIP</h8>", unsafe_allow_html=True)
-        zip_file_path = generate_and_zip_resumes(parsed_results, selected_layout_function)
+        # Built only on request; reruns with the same resumes and layout reuse the finished bundle
+        zip_file_path = cached_bundle(export_key(parsed_results, selected_layout_function))
+        if zip_file_path is None and st.button("📦 Prepare ZIP"):
+            with st.spinner("Building ZIP..."):
+                zip_file_path = generate_and_zip_resumes(parsed_results, selected_layout_function)
         if zip_file_path:
             with open(zip_file_path, "rb") as f:
                 st.download_button(
                     label="⬇️ Download All Resumes",
-                    data=f.read(),
-                    file_name=os.path.basename(zip_file_path),
+                    data=f,
+                    file_name="resumes.zip",
                     mime="application/zip"
                 )
+
+        st.markdown("<h8 style='font-size: 16px;'> 📑 Download All Profiles as One Deck</h8>", unsafe_allow_html=True)
+        deck_path = cached_bundle(deck_key(parsed_results))
+        if deck_path is None and st.button("📑 Prepare Deck"):
+            with st.spinner("Building deck..."):
+                deck_path = generate_deck(parsed_results)
+        if deck_path:
+            with open(deck_path, "rb") as f:
+                st.download_button(
+                    label="⬇️ Download Deck",
+                    data=f,
+                    file_name="Candidate_Profiles.pptx",
+                    mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+                )
     return parsed_results
\ No newline at end of file
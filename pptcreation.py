@@ -6,15 +6,251 @@ from pptx import Presentation
 from pptx.util import Cm, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import MSO_AUTO_SIZE
+from pptx.oxml.ns import qn
+
+from assets import asset, asset_stream
+from text_fit import Fit, Paragraph, fit, scaled
  
 # Configure logging
 logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
  
 FONT="Helvetica"
+# Bump whenever a layout's output changes so cached export bundles are rebuilt
+TEMPLATE_VERSION = "3"
+
+def save_output(presentation, path, filename):
+    # path is a folder, or a writable binary stream (e.g. BytesIO) to render in memory
+    if hasattr(path, "write"):
+        presentation.save(path)
+        return filename
+    full_path = os.path.join(path, filename)
+    presentation.save(full_path)
+    return full_path
  
+def _drop_slide(prs, slide):
+    # Unlink a slide from the deck; its part is no longer reachable so it is not saved
+    sld_id_lst = prs.slides._sldIdLst
+    for sld_id in sld_id_lst:
+        if prs.part.related_part(sld_id.rId) is slide.part:
+            prs.part.drop_rel(sld_id.rId)
+            sld_id_lst.remove(sld_id)
+            return
+
+def new_deck(image_path=None):
+    # Presentation whose profile layout already carries the grey half-slide background and the
+    # logo, so every slide inherits them and a deck of N profiles stores the picture once
+    prs = Presentation()
+ 
+    # Change slide size to 16:9 widescreen format (13.33 inches x 7.5 inches)
+    prs.slide_width = Cm(67.729)
+    prs.slide_height = Cm(38.1)
+    slide_layout = prs.slide_layouts[5]
+
+    # Layout shapes are read-only in python-pptx: draw on a scratch slide and move them over
+    scratch = prs.slides.add_slide(slide_layout)
+    decorations = []
+
+    # Add a shape to cover half of the slide with light gray background
+    left_bg, top_bg, width_bg, height_bg = Cm(0), Cm(-0), Cm(33.86), Cm(38.1) # Half slide
+    shape = scratch.shapes.add_shape(MSO_SHAPE.RECTANGLE, left_bg, top_bg, width_bg, height_bg)
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = RGBColor(242, 242, 242) # Light gray
+    # Remove the border
+    shape.line.fill.background()
+    decorations.append(shape._element)
+
+    # Add image to the top right corner if provided; the image is read and decoded once per process
+    if asset(image_path):
+        img_left = Cm(25.63)
+        img_top = Cm(0.48)
+        img_width = Cm(5.99)
+        img_height = Cm(5.99)
+        picture = scratch.shapes.add_picture(asset_stream(image_path), img_left, img_top, width=img_width, height=img_height)
+        _, rId = slide_layout.part.get_or_add_image_part(asset_stream(image_path))
+        picture._element.blipFill.blip.rEmbed = rId
+        decorations.append(picture._element)
+
+    sp_tree = slide_layout.shapes._spTree
+    for offset, element in enumerate(decorations):
+        element.find(".//" + qn("p:cNvPr")).set("id", str(slide_layout.shapes._next_shape_id))
+        # straight after nvGrpSpPr/grpSpPr: behind the placeholders and everything on the slide
+        sp_tree.insert(2 + offset, element)
+    _drop_slide(prs, scratch)
+    return prs
+
+DARK_BLUE = RGBColor(0, 0, 139)
+BLUE = RGBColor(0, 102, 204)
+LIGHT_BLUE = RGBColor(173, 216, 230)
+# style -> (size in pt, bold, colour, paragraph level); sizes are the largest a box may use
+STYLES = {
+    "name": (30, True, DARK_BLUE, 0),
+    "contact": (24, False, BLUE, 0),
+    "heading": (20, True, DARK_BLUE, 0),
+    "item": (18, False, None, 0),
+    "banner": (25, True, DARK_BLUE, 0),
+    "job": (20, True, BLUE, 0),
+    "duty": (18, False, None, 1),
+}
+# Insets python-pptx gives new text boxes and the level-1 indent of the default template, in pt
+INSET_X, INSET_Y, LEVEL_INDENT = 7.2, 3.6, 36.0
+
+# Text boxes as (left, top, width, height) in cm
+PROFILE_BOXES = {
+    "Name": (2, 2, 14, 6),
+    "Summary": (2, 5, 31, 7),
+    "Roles played": (2, 12, 8, 9),
+    "Areas of Expertise": (12, 12, 7, 8),
+    "Skills": (24, 12, 7, 8),
+    "Industry Sectors": (12, 20, 8, 6),
+    "Consulting Engagements": (2, 28, 6, 6),
+    "Education & Certifications": (12, 28, 21, 6),
+    "Banner": (35, 1.5, 32, 1.5),
+    "Experience": (35, 3, 32, 34),
+}
+# Continuation slides: the name, left-hand sections that did not fit their box, the rest of the experience
+CONTINUATION_BOXES = dict(PROFILE_BOXES, Name=(2, 2, 31, 3), Carried=(2, 5, 31, 32))
+EXPERIENCE_BANNER = "Experience and Accomplishments"
+
+
+def paragraph(text, style, section=None):
+    size, bold, _, level = STYLES[style]
+    return Paragraph(str(text), size, bold, LEVEL_INDENT * level, (style, section), style in ("heading", "job"))
+
+
+def _listed(value):
+    if isinstance(value, (str, dict)):
+        return [value]
+    return list(value or [])
+
+
+def profile_sections(data):
+    # (box/heading, items) for the left-hand sections, in slide order
+    education = []
+    for entry in _listed(data.get("Education or Academic Profile and Certifications", "N/A")):
+        if isinstance(entry, dict):
+            degree = entry.get("Degree", "N/A")
+            institution = entry.get("Institution", "N/A")
+            duration = entry.get("Duration or Year", "")
+            education.append(f"- {degree}, {institution} ({duration})")
+        else:
+            education.append(f"- {entry}")
+    return [
+        ("Summary", [data.get("Summary") or ""]),
+        ("Roles played", [f"- {role}" for role in _listed(data.get("Roles Played"))]),
+        ("Areas of Expertise", [f"- {area}" for area in _listed(data.get("Areas of Expertise"))]),
+        ("Skills", [f"- {skill}" for skill in _listed(data.get("Skills")) if skill]),
+        ("Industry Sectors", [f"- {sector}" for sector in _listed(data.get("Industry Sectors"))]),
+        ("Consulting Engagements", [f"- {item}" for item in _listed(data.get("Consulting Engagements", "N/A"))]),
+        ("Education & Certifications", education),
+    ]
+
+
+def experience_paragraphs(data):
+    paragraphs = []
+    for exp in _listed(data.get("Experience and Accomplishments")):
+        if isinstance(exp, dict):
+            title = exp.get("Title", "")
+            company = exp.get("Company", "")
+            duration = exp.get("Duration", "N/A")
+            paragraphs.append(paragraph(f"{title} at {company} ({duration})", "job"))
+            for resp in _listed(exp.get("Detailed Roles and Responsibilities")):
+                if resp:
+                    paragraphs.append(paragraph(f"- {resp}", "duty"))
+        elif isinstance(exp, str):
+            paragraphs.append(paragraph(f"- {exp}", "item"))
+    return paragraphs
+
+
+def fit_box(box, paragraphs, paginate=True):
+    # Fitted font scale for a box; without pagination everything is kept at the smallest scale
+    _, _, width, height = box
+    fitted = fit(paragraphs, Cm(width).pt - 2 * INSET_X, Cm(height).pt - 2 * INSET_Y)
+    if fitted.rest and not paginate:
+        return Fit(fitted.scale, paragraphs, [])
+    return fitted
+
+
+def _continued(rest):
+    # Repeat the section heading above items carried over from an earlier slide
+    style, section = rest[0].tag
+    if style == "heading" or section is None:
+        return rest
+    return [paragraph(f"{section} (continued)", "heading", section)] + rest
+
+
+def plan_profile(data):
+    """Measure a profile and split it into slides before anything is drawn.
+
+    Returns one {box name: Fit} dict per slide. Every box shrinks its text just enough to
+    fit; what still does not fit at the smallest scale moves to continuation slides.
+    """
+    name = data.get("Name") or "Unnamed"
+    contact = [data.get(key, "") or "" for key in ("Email", "Phone", "LinkedIn", "Address")]
+    slide = {"Name": fit_box(PROFILE_BOXES["Name"], [paragraph(name, "name")] + [paragraph(info, "contact") for info in contact], paginate=False)}
+    carried = []
+    for heading, items in profile_sections(data):
+        fitted = fit_box(PROFILE_BOXES[heading], [paragraph(heading, "heading", heading)] + [paragraph(item, "item", heading) for item in items])
+        slide[heading] = fitted
+        if fitted.rest:
+            carried += _continued(fitted.rest)
+    slide["Banner"] = fit_box(PROFILE_BOXES["Banner"], [paragraph(EXPERIENCE_BANNER, "banner")], paginate=False)
+    slide["Experience"] = fitted = fit_box(PROFILE_BOXES["Experience"], experience_paragraphs(data))
+    experience = fitted.rest
+    slides = [slide]
+
+    while carried or experience:
+        slide = {"Name": fit_box(CONTINUATION_BOXES["Name"], [paragraph(f"{name} (continued)", "name")], paginate=False)}
+        if carried:
+            slide["Carried"] = fitted = fit_box(CONTINUATION_BOXES["Carried"], carried)
+            carried = _continued(fitted.rest) if fitted.rest else []
+        if experience:
+            slide["Banner"] = fit_box(CONTINUATION_BOXES["Banner"], [paragraph(f"{EXPERIENCE_BANNER} (continued)", "banner")], paginate=False)
+            slide["Experience"] = fitted = fit_box(CONTINUATION_BOXES["Experience"], experience)
+            experience = fitted.rest
+        slides.append(slide)
+    return slides
+
+
+def draw_box(slide, box, fitted, fill=None):
+    left, top, width, height = box
+    text_box = slide.shapes.add_textbox(Cm(left), Cm(top), Cm(width), Cm(height))
+    if fill is not None:
+        text_box.fill.solid()
+        text_box.fill.fore_color.rgb = fill
+    text_frame = text_box.text_frame
+    # Sizes were measured for wrapped text in a box that keeps its size
+    text_frame.word_wrap = True
+    text_frame.auto_size = MSO_AUTO_SIZE.NONE
+    for i, para in enumerate(fitted.head):
+        p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+        p.text = para.text
+        _, bold, color, level = STYLES[para.tag[0]]
+        p.level = level
+        for run in p.runs:
+            font = run.font
+            font.name = FONT
+            font.size = Pt(scaled(para.size, fitted.scale))
+            if bold:
+                font.bold = True
+            if color is not None:
+                font.color.rgb = color
+
+
+def add_profile_slides(prs, data):
+    # One slide per profile, plus continuation slides for content that does not fit
+    slides = []
+    for i, plan in enumerate(plan_profile(data)):
+        boxes = PROFILE_BOXES if i == 0 else CONTINUATION_BOXES
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        for name, fitted in plan.items():
+            draw_box(slide, boxes[name], fitted, LIGHT_BLUE if name == "Banner" else None)
+        slides.append(slide)
+    return slides
+
 def layout5(parsed_result, path, image_path=None):
     try:
-        if not os.path.exists(path):
+        if isinstance(path, str) and not os.path.exists(path):
             os.makedirs(path)
         if isinstance(parsed_result, str):
             data = json.loads(parsed_result)
@@ -22,345 +258,36 @@ def layout5(parsed_result, path, image_path=None):
             data = parsed_result
         else:
             raise ValueError("parsed_result must be a JSON string or a dictionary")
-        print(type(data))
-        # Create a presentation object
-        prs = Presentation()
- 
- 
-        # Change slide size to 16:9 widescreen format (13.33 inches x 7.5 inches)
-        prs.slide_width = Cm(67.729)
-        prs.slide_height = Cm(38.1)
- 
-        # Add a slide with a title layout
-        slide_layout = prs.slide_layouts[5]  # Use the blank layout
-        slide = prs.slides.add_slide(slide_layout)
- 
- 
-        # Define the position and size of the text boxes
-        left0, top0, width0, height0 = Cm(2), Cm(2), Cm(14), Cm(6) #Name
-        left1, top1, width1, height1 = Cm(2), Cm(5), Cm(31), Cm(7) #Summary
-        left2, top2, width2, height2 = Cm(2), Cm(12), Cm(8), Cm(9) #Roles played
-        left3, top3, width3, height3 = Cm(12), Cm(12), Cm(7), Cm(8)#Area's of Experties
-        left4, top4, width4, height4 = Cm(24), Cm(12), Cm(7), Cm(8)#tools
-        left5, top5, width5, height5 = Cm(12), Cm(20), Cm(8), Cm(6)#Industry sectors
-        left6, top6, width6, height6 = Cm(2), Cm(28), Cm(6), Cm(6)#Consulting engagement
-        left7, top7, width7, height7 = Cm(12), Cm(28), Cm(21), Cm(6)#Education
-        left8, top8, width8, height8 = Cm(35), Cm(1.5), Cm(32), Cm(1.5)#Experience and Accomplishments
-        left9, top9, width9, height9 = Cm(35), Cm(3), Cm(32), Cm(34)#Education
- 
-        # Add a shape to cover half of the slide with light gray background
-        left_bg, top_bg, width_bg, height_bg = Cm(0), Cm(-0), Cm(33.86), Cm(38.1) # Half slide
-        shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, left_bg, top_bg, width_bg, height_bg)
-        shape.fill.solid()
-        shape.fill.fore_color.rgb = RGBColor(242, 242, 242) # Light gray
- 
-        # Remove the border
-        shape.line.fill.background()
-       
-        # Add image to the top right corner if provided
-        if image_path and os.path.exists(image_path):
-            img_left = Cm(25.63)
-            img_top = Cm(0.48)
-            img_width = Cm(5.99)
-            img_height = Cm(5.99)
-            slide.shapes.add_picture(image_path, img_left, img_top, width=img_width, height=img_height)
- 
-        # Add the first text box
-        text_box0 = slide.shapes.add_textbox(left0, top0, width0, height0)
-        text_frame0 = text_box0.text_frame
-        text_frame0.text =data.get("Name", "Unnamed")
-        p1 = text_frame0.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(30)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
-        contact_info = [
-            data.get("Email", ""),
-            data.get("Phone", ""),
-            data.get("LinkedIn", ""),
-            data.get("Address", "")
-        ]
-        for info in contact_info:
-            p2=text_frame0.add_paragraph()
-            p2.level = 0
-            p2.text=info
-            run2 = p2.add_run()
-            font2 = run2.font
-            font2.name = "Helvetica"
-            font2.size = Pt(24)
-            font2.color.rgb = RGBColor(0, 102, 204) # Blue
- 
-        # Add the first text box
-        text_box1 = slide.shapes.add_textbox(left1, top1, width1, height1)
-        text_frame1 = text_box1.text_frame
-        text_frame1.word_wrap = True # Enable word wrap
-        text_frame1.text = "Summary"
-        p1 = text_frame1.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(20)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
-        p2=text_frame1.add_paragraph()
-        p2.text=data.get("Summary") #type: ignore
-        p2.level = 0
-        run2 = p2.add_run()
-        font2 = run2.font
-        font2.name = "Helvetica"
-        font2.size = Pt(18)
-        #font2.color.rgb = RGBColor(0, 102, 204) # Blue
- 
-        # Add the second text box
-        text_box2 = slide.shapes.add_textbox(left2, top2, width2, height2)
-        text_frame2 = text_box2.text_frame
-        text_frame2.word_wrap = True
-        text_frame2.text = "Roles played"
-        p1 = text_frame2.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(20)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
-           
-        roles_played = data.get("Roles Played") or []
-        if isinstance(roles_played, str):
-            roles_played = [roles_played]
-        for role in roles_played:
-            p2 = text_frame2.add_paragraph()
-            p2.text = f"- {role}"
-            p2.level = 0
-            run2 = p2.runs[0]
-            font2 = run2.font
-            font2.name = FONT
-            font2.size = Pt(18)
-            #font2.color.rgb = RGBColor(0, 102, 204)
- 
-        # Add the third text box
-        text_box3 = slide.shapes.add_textbox(left3, top3, width3, height3)
-        text_frame3 = text_box3.text_frame
-        text_frame3.text = "Areas of Expertise"
-        p1 = text_frame3.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(20)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
-       
-        expertise_areas = data.get("Areas of Expertise") or []
-        if isinstance(expertise_areas, str):
-            expertise_areas = [expertise_areas]
-        for area in expertise_areas:
-            p2 = text_frame3.add_paragraph()
-            p2.text = f"- {area}"
-            p2.level = 0
-            run2 = p2.runs[0]
-            font2 = run2.font
-            font2.name = FONT
-            font2.size = Pt(18)
-            #font2.color.rgb = RGBColor(0, 102, 204)
- 
-        # Add the fourth text box
-        text_box4 = slide.shapes.add_textbox(left4, top4, width4, height4)
-        text_frame4 = text_box4.text_frame
-        text_frame4.word_wrap = True
-        text_frame4.text = "Skills"
-        p1 = text_frame4.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(20)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
-       
-        skills = data.get("Skills") or []
-        if isinstance(skills, str):
-            skills = [skills]
-        elif skills is None:
-            skills = []
-           
-        for skill in skills:
-            if skill:
-                p2 = text_frame4.add_paragraph()
-                p2.text = f"- {skill}"
-                p2.level = 0
-                run2 = p2.runs[0]
-                font2 = run2.font
-                font2.name = FONT
-                font2.size = Pt(18)
-                #font2.color.rgb = RGBColor(0, 102, 204) # Blue
- 
-        # Add the fifth text box
-        text_box5 = slide.shapes.add_textbox(left5, top5, width5, height5)
-        text_frame5 = text_box5.text_frame
-        text_frame5.text = "Industry Sectors"
-        p1 = text_frame5.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(20)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
-       
-        sectors = data.get("Industry Sectors") or []
-        if isinstance(sectors, str):
-            sectors = [sectors]
-        for sector in sectors:
-            p2 = text_frame5.add_paragraph()
-            p2.text = f"- {sector}"
-            p2.level = 0
-            run2 = p2.runs[0]
-            font2 = run2.font
-            font2.name = FONT
-            font2.size = Pt(18)
-            #font2.color.rgb = RGBColor(0, 102, 204)
- 
-        # Add the sixth text box
-        text_box6 = slide.shapes.add_textbox(left6, top6, width6, height6)
-        text_frame6 = text_box6.text_frame
-        text_frame6.text = "Consulting Engagements"
-        p1 = text_frame6.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(20)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
-       
-        consulting = data.get("Consulting Engagements", "N/A") or []
-        if isinstance(consulting, str):
-            consulting = [consulting]
-        for item in consulting:
-            p2 = text_frame6.add_paragraph()
-            p2.text = f"- {item}"
-            p2.level = 0
-            run2 = p2.runs[0]
-            font2 = run2.font
-            font2.name = FONT
-            font2.size = Pt(18)
-            #font2.color.rgb = RGBColor(0, 102, 204) # Blue
- 
-        # Add the seventh text box
-        text_box7 = slide.shapes.add_textbox(left7, top7, width7, height7)
-        text_frame7 = text_box7.text_frame
-        text_frame7.text = "Education & Certifications"
-        text_frame7.word_wrap = True
-        p1 = text_frame7.paragraphs[0]
-        run1 = p1.runs[0]
-        font1 = run1.font
-        font1.name = FONT
-        font1.size = Pt(20)
-        font1.bold = True
-        font1.color.rgb = RGBColor(0, 0, 139)
- 
-        education = data.get("Education or Academic Profile and Certifications", "N/A") or []
-        if isinstance(education, dict):
-            education = [education]
-        elif isinstance(education, str):
-            education = [education]
- 
-        for entry in education:
-            if isinstance(entry, dict):
-                degree = entry.get("Degree", "N/A")
-                institution = entry.get("Institution", "N/A")
-                duration = entry.get("Duration or Year", "")
-                p2 = text_frame7.add_paragraph()
-                p2.text = f"- {degree}, {institution} ({duration})"
-            else:
-                p2 = text_frame7.add_paragraph()
-                p2.text = f"- {entry}"
-            p2.level = 0
-            run2 = p2.runs[0]
-            font2 = run2.font
-            font2.name = FONT
-            font2.size = Pt(18)
-            #font2.color.rgb = RGBColor(0, 102, 204) # Blue
-           
-        # Add and style the eighth text box
-        text_box8 = slide.shapes.add_textbox(left8, top8, width8, height8)
-        text_frame8 = text_box8.text_frame
-        text_frame8.text = "Experience and Accomplishments"
-        fill = text_box8.fill
-        fill.solid()
-        fill.fore_color.rgb = RGBColor(173, 216, 230) # Light blue
-        p = text_frame8.paragraphs[0]
-        run = p.runs[0]
-        font = run.font
-        font.name = FONT
-        font.size = Pt(25)
-        font.bold = True
-        font.italic = False
-        font.color.rgb = RGBColor(0, 0, 139) # Dark Blue
- 
-        # Add the ninth text box (Content)
-        text_box9 = slide.shapes.add_textbox(left9, top9, width9, height9)
-        text_frame9 = text_box9.text_frame
-        text_frame9.word_wrap = True
- 
-        experience = data.get("Experience and Accomplishments")
-        if not experience:
-            experience = []
- 
-        if isinstance(experience, dict):
-            experience = [experience]
-        elif isinstance(experience, str):
-            experience = [experience]
- 
-        for exp in experience:
-            if isinstance(exp, dict):
-                title = exp.get("Title", "")
-                company = exp.get("Company", "")
-                duration = exp.get("Duration", "N/A")
-                responsibilities = exp.get("Detailed Roles and Responsibilities") or []
-               
-                # Add job title, company, and duration
-                p1 = text_frame9.add_paragraph()
-                p1.text = f"{title} at {company} ({duration})"
-                p1.level = 0
-                run1 = p1.runs[0]
-                font1 = run1.font
-                font1.name = FONT
-                font1.size = Pt(20)
-                font1.bold = True
-                font1.color.rgb = RGBColor(0, 102, 204)
- 
-                # Add responsibilities
-                if isinstance(responsibilities, str):
-                    responsibilities = [responsibilities]
-                for resp in responsibilities:
-                    if resp:
-                        p2 = text_frame9.add_paragraph()
-                        p2.text = f"- {resp}"
-                        p2.level = 1
-                        run2 = p2.runs[0]
-                        font2 = run2.font
-                        font2.name = FONT
-                        font2.size = Pt(18)
-                        #font2.color.rgb = RGBColor(0, 102, 204)
-            elif isinstance(exp, str):
-                p = text_frame9.add_paragraph()
-                p.text = f"- {exp}"
-                p.level = 0
-                run = p.runs[0]
-                font = run.font
-                font.name = FONT
-                font.size = Pt(18)
-                #font.color.rgb = RGBColor(0, 102, 204)
+        prs = new_deck(image_path)
+        add_profile_slides(prs, data)
  
         # Save
         safe_name = re.sub(r'[\\/*?:"<>|]', "", data.get('Name', 'Unnamed'))
         filename = f"Formatted_Resume-{safe_name}.pptx"
-        full_path = os.path.join(path, filename)
-        prs.save(full_path)
-        return full_path
-        # prs.save('presentation.pptx')
- 
-        # print("Presentation created successfully with two text boxes.")
+        return save_output(prs, path, filename)
    
     except Exception as e:
         logging.error(f"An error occurred while generating the resume: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def deck_layout5(parsed_results, path, image_path=None, file_name="Candidate_Profiles.pptx"):
+    # All profiles as slides of one deck: background, logo and picture part are shared.
+    # A profile that fails to render is logged and left out rather than failing the deck.
+    try:
+        if isinstance(path, str) and not os.path.exists(path):
+            os.makedirs(path)
+        prs = new_deck(image_path)
+        for source_name, parsed_result in parsed_results:
+            slide_count = len(prs.slides)
+            try:
+                data = json.loads(parsed_result) if isinstance(parsed_result, str) else parsed_result
+                add_profile_slides(prs, data)
+            except Exception as e:
+                logging.error(f"Skipping {source_name} in deck: {e}")
+                while len(prs.slides) > slide_count:
+                    _drop_slide(prs, prs.slides[-1])
+        return save_output(prs, path, file_name)
+ 
+    except Exception as e:
+        logging.error(f"An error occurred while generating the deck: {e}")
+        return None
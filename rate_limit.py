@@ -0,0 +1,326 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import sqlite3
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from parse_cache import CACHE_DIR
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# Optional client-side budget per LLM endpoint. Set these just under the account's measured
+# quota so requests are spaced out here instead of being rejected with 429s. 0 (the default)
+# leaves a limit off, and with both off requests go out unthrottled.
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+# The provider enforces the per-minute quota over short windows, so at most this many seconds
+# of token budget may be spent in one burst
+LLM_TOKEN_BURST_SECONDS = float(os.getenv("LLM_TOKEN_BURST_SECONDS", "10"))
+# Completion size reserved up front; corrected from the usage block once the response is in
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "1000"))
+# When a limit is set, the budget is shared by every process on this machine (app, API,
+# batch CLI, queue workers); set to an empty string for a per-process budget
+LLM_RATE_DB = os.getenv("LLM_RATE_DB", os.path.join(CACHE_DIR, "llm_rate.sqlite"))
+LLM_RATE_POLL = 0.05
+
+# Lower runs first: a single resume someone is waiting for goes ahead of bulk work
+INTERACTIVE, BATCH = 0, 1
+_priority = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def current_priority():
+    return _priority.get()
+
+
+def set_priority(priority):
+    # For the whole of the current thread, e.g. as a ThreadPoolExecutor initializer
+    _priority.set(priority)
+
+
+@contextmanager
+def llm_priority(priority):
+    # LLM requests made inside the block (and in tasks or copied contexts started from it) use priority
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Bucket:
+    """Requests and tokens buckets of one endpoint; refilled continuously, levels may go below zero."""
+
+    def __init__(self, requests_per_second, tokens_per_minute, token_burst_seconds):
+        self.request_rate = requests_per_second
+        self.request_capacity = max(1.0, requests_per_second)
+        self.token_rate = tokens_per_minute / 60
+        self.token_capacity = self.token_rate * token_burst_seconds
+
+    def full(self, now):
+        return {"requests": self.request_capacity, "tokens": self.token_capacity, "stamp": now, "blocked_until": 0.0}
+
+    def refill(self, state, now):
+        elapsed = max(0.0, now - state["stamp"])
+        state["requests"] = min(self.request_capacity, state["requests"] + elapsed * self.request_rate)
+        state["tokens"] = min(self.token_capacity, state["tokens"] + elapsed * self.token_rate)
+        state["stamp"] = now
+
+    def cost(self, tokens):
+        # A request bigger than the burst waits for a full bucket instead of forever
+        return min(tokens, self.token_capacity) if self.token_rate else 0
+
+    def wait(self, state, tokens, now):
+        # Seconds until a request costing tokens may go; 0 means now
+        waits = [state["blocked_until"] - now]
+        if self.request_rate:
+            waits.append((1 - state["requests"]) / self.request_rate)
+        if self.token_rate:
+            waits.append((self.cost(tokens) - state["tokens"]) / self.token_rate)
+        return max(0.0, *waits)
+
+    def take(self, state, tokens):
+        state["requests"] -= 1 if self.request_rate else 0
+        state["tokens"] -= self.cost(tokens)
+
+    def settle(self, state, tokens):
+        state["tokens"] = min(self.token_capacity, state["tokens"] + tokens)
+
+
+class _MemoryStore:
+    shared = False
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self._lock = threading.Lock()
+        self._state = bucket.full(time.time())
+
+    def take(self, tokens, priority, owner):
+        with self._lock:
+            now = time.time()
+            self.bucket.refill(self._state, now)
+            wait = self.bucket.wait(self._state, tokens, now)
+            if not wait:
+                self.bucket.take(self._state, tokens)
+            return wait
+
+    def update(self, tokens=0, pause=0):
+        with self._lock:
+            now = time.time()
+            self.bucket.refill(self._state, now)
+            self.bucket.settle(self._state, tokens)
+            self._state["blocked_until"] = max(self._state["blocked_until"], now + pause)
+
+
+class _SqliteStore:
+    """Bucket state in one SQLite row, so every process on the machine draws from the same budget.
+
+    A process whose oldest waiter cannot go yet registers that waiter's priority; batch
+    waiters in other processes hold back while an interactive one is registered.
+    """
+
+    shared = True
+
+    def __init__(self, bucket, db_path, name):
+        self.bucket = bucket
+        self.db_path = db_path
+        self.name = name
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, requests REAL NOT NULL, "
+                "tokens REAL NOT NULL, stamp REAL NOT NULL, blocked_until REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS waiters (name TEXT NOT NULL, owner TEXT NOT NULL, "
+                "priority INTEGER NOT NULL, expires REAL NOT NULL, PRIMARY KEY (name, owner))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn, now):
+        row = conn.execute("SELECT requests, tokens, stamp, blocked_until FROM buckets WHERE name = ?",
+                           (self.name,)).fetchone()
+        if row is None:
+            return self.bucket.full(now)
+        return dict(zip(("requests", "tokens", "stamp", "blocked_until"), row))
+
+    def _save(self, conn, state):
+        conn.execute("INSERT OR REPLACE INTO buckets (name, requests, tokens, stamp, blocked_until) VALUES (?, ?, ?, ?, ?)",
+                     (self.name, state["requests"], state["tokens"], state["stamp"], state["blocked_until"]))
+
+    def take(self, tokens, priority, owner):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            state = self._load(conn, now)
+            self.bucket.refill(state, now)
+            wait = self.bucket.wait(state, tokens, now)
+            ahead = conn.execute(
+                "SELECT 1 FROM waiters WHERE name = ? AND owner != ? AND priority < ? AND expires > ? LIMIT 1",
+                (self.name, owner, priority, now)
+            ).fetchone()
+            if ahead is not None:
+                wait = max(wait, LLM_RATE_POLL)
+            if wait:
+                # Outlives the sleep before the next attempt; a crashed process's entry simply expires
+                conn.execute("INSERT OR REPLACE INTO waiters (name, owner, priority, expires) VALUES (?, ?, ?, ?)",
+                             (self.name, owner, priority, now + wait + 1))
+            else:
+                self.bucket.take(state, tokens)
+                conn.execute("DELETE FROM waiters WHERE name = ? AND owner = ?", (self.name, owner))
+            self._save(conn, state)
+            conn.execute("COMMIT")
+            return wait
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def update(self, tokens=0, pause=0):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            state = self._load(conn, now)
+            self.bucket.refill(state, now)
+            self.bucket.settle(state, tokens)
+            state["blocked_until"] = max(state["blocked_until"], now + pause)
+            self._save(conn, state)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class RateLimiter:
+    """Token-bucket scheduler for one endpoint: requests/second and tokens/minute.
+
+    Waiters in this process queue by (priority, arrival) and only the head draws from the
+    bucket, so a steady stream of batch requests never starves an interactive one. A broken
+    shared store degrades to a per-process budget rather than failing requests.
+    """
+
+    def __init__(self, name, requests_per_second=LLM_REQUESTS_PER_SECOND, tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 db_path=LLM_RATE_DB, token_burst_seconds=LLM_TOKEN_BURST_SECONDS):
+        bucket = _Bucket(requests_per_second, tokens_per_minute, token_burst_seconds)
+        self.enabled = bool(requests_per_second or tokens_per_minute)
+        self.store = _SqliteStore(bucket, db_path, name) if db_path else _MemoryStore(bucket)
+        self._fallback = _MemoryStore(bucket)
+        self._owner = f"{os.getpid()}-{random.getrandbits(32):08x}"
+        self._lock = threading.Lock()
+        self._waiting = []
+        self._arrivals = itertools.count()
+        self.stats = {"waits": 0, "wait_seconds": 0.0, "pauses": 0}
+
+    def _store_call(self, method, *args):
+        if self.store is not self._fallback:
+            try:
+                return getattr(self.store, method)(*args)
+            except sqlite3.Error as e:
+                logging.error(f"Shared LLM rate limit unavailable, using a per-process budget: {e}")
+                self.store = self._fallback
+        return getattr(self._fallback, method)(*args)
+
+    def _enter(self, priority):
+        ticket = (priority, next(self._arrivals))
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _leave(self, ticket, waited):
+        with self._lock:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+            if waited:
+                self.stats["waits"] += 1
+                self.stats["wait_seconds"] += waited
+
+    def _attempt(self, ticket, tokens):
+        with self._lock:
+            head = self._waiting[0] == ticket
+        if not head:
+            return LLM_RATE_POLL
+        return self._store_call("take", tokens, ticket[0], self._owner)
+
+    def acquire(self, tokens=0, priority=None):
+        # Blocks until one request of about `tokens` tokens may be sent
+        if not self.enabled:
+            return
+        ticket = self._enter(current_priority() if priority is None else priority)
+        start = None
+        try:
+            while True:
+                wait = self._attempt(ticket, tokens)
+                if not wait:
+                    return
+                start = start or time.monotonic()
+                time.sleep(wait)
+        finally:
+            self._leave(ticket, start and time.monotonic() - start)
+
+    async def aacquire(self, tokens=0, priority=None):
+        if not self.enabled:
+            return
+        ticket = self._enter(current_priority() if priority is None else priority)
+        start = None
+        try:
+            while True:
+                if self.store.shared:
+                    wait = await asyncio.to_thread(self._attempt, ticket, tokens)
+                else:
+                    wait = self._attempt(ticket, tokens)
+                if not wait:
+                    return
+                start = start or time.monotonic()
+                await asyncio.sleep(wait)
+        finally:
+            self._leave(ticket, start and time.monotonic() - start)
+
+    def settle(self, reserved, used):
+        # Give back (or charge) the difference between the reserved and the reported token count
+        if self.enabled and reserved != used:
+            self._store_call("update", reserved - used)
+
+    def pause(self, seconds):
+        # The provider said 429: nobody sharing this budget sends anything for `seconds`
+        if self.enabled and seconds > 0:
+            self.stats["pauses"] += 1
+            self._store_call("update", 0, seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limiter(url):
+    with _limiters_lock:
+        if url not in _limiters:
+            _limiters[url] = RateLimiter(url)
+        return _limiters[url]
+
+
+def limiter_stats():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    stats = {"rate_waits": 0, "rate_wait_seconds": 0.0, "rate_pauses": 0}
+    for limiter in limiters:
+        stats["rate_waits"] += limiter.stats["waits"]
+        stats["rate_wait_seconds"] += limiter.stats["wait_seconds"]
+        stats["rate_pauses"] += limiter.stats["pauses"]
+    stats["requests_per_second"] = LLM_REQUESTS_PER_SECOND
+    stats["tokens_per_minute"] = LLM_TOKENS_PER_MINUTE
+    return stats
+
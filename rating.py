@@ -0,0 +1,86 @@
+import os
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rate_limit import BATCH, llm_priority
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# "off" skips the self-correction rating call, "background" rates every resume off the
+# critical path and "sampled" rates RATING_SAMPLE_PERCENT% of resumes in the background
+RATING_MODE = os.getenv("RATING_MODE", "off")
+RATING_SAMPLE_PERCENT = float(os.getenv("RATING_SAMPLE_PERCENT", "10"))
+RATING_WORKERS = int(os.getenv("RATING_WORKERS", "2"))
+RATING_KEY = "Quality Rating"
+
+
+class RatingStage:
+    def __init__(self, mode=RATING_MODE, sample_percent=RATING_SAMPLE_PERCENT, workers=RATING_WORKERS):
+        if mode not in ("off", "background", "sampled"):
+            raise ValueError(f"Unknown rating mode: {mode}")
+        self.mode = mode
+        self.sample_percent = sample_percent
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    def should_rate(self):
+        if self.mode == "off":
+            return False
+        if self.mode == "sampled":
+            return random.uniform(0, 100) < self.sample_percent
+        return True
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rating")
+            return self._pool
+
+    def _store(self, result, rating, on_rated):
+        # Copy rather than mutate: the original may be mid-render on another thread.
+        # on_rated (e.g. the parse cache) stores the scored copy for the next rerun.
+        rated = dict(result)
+        rated[RATING_KEY] = rating
+        if on_rated is not None:
+            on_rated(rated)
+
+    def _run(self, rate, result, on_rated):
+        # Ratings are off the critical path, so they queue behind extraction for the LLM budget
+        try:
+            with llm_priority(BATCH):
+                rating = rate()
+            self._store(result, rating, on_rated)
+        except Exception as e:
+            logging.error(f"Error in additional processing: {e}")
+
+    def submit(self, rate, result, on_rated=None):
+        # rate() is called on a background thread; returns the future, or None when skipped
+        if not self.should_rate():
+            return None
+        return self._executor().submit(self._run, rate, result, on_rated)
+
+    async def _arun(self, arate, result, on_rated):
+        try:
+            with llm_priority(BATCH):
+                rating = await arate()
+            await asyncio.to_thread(self._store, result, rating, on_rated)
+        except Exception as e:
+            logging.error(f"Error in additional processing: {e}")
+
+    def asubmit(self, arate, result, on_rated=None):
+        # Async counterpart of submit(): schedules arate() as a task on the running loop
+        if not self.should_rate():
+            return None
+        task = asyncio.get_running_loop().create_task(self._arun(arate, result, on_rated))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+rating_stage = RatingStage()
@@ -0,0 +1,213 @@
+# Recruit agent core: prompts, LLM extraction and layouts, without any Streamlit dependency.
+# doc_gen.py puts the Streamlit UI on top; resume_parser.py runs the same code headless.
+# Errors are raised rather than reported, so each front end reports them its own way.
+import os
+import json
+import logging
+from typing import List
+
+from docx import Document
+from pydantic import BaseModel
+from langchain.prompts import PromptTemplate
+
+from LLMLab45 import LlamaLLM  # Your custom LLM wrapper
+from pdf_extract import extract_pdf_text
+from rating import rating_stage
+from json_stream import collect_stream
+from chunking import split_resume, map_chunks, amap_chunks, CHUNK_TOKEN_BUDGET
+from export import Renderer
+from doccreation import BULK_DOCX_WRITER, layout1, layout2, layout3 # docx templates for different layouts
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# Define the Pydantic model for structured output
+class Resume(BaseModel):
+    name: str
+    email: str
+    phone: str
+    linkedin: str
+    summary: str
+    skills: List[str]
+    certifications: List[str]
+    experience: List[dict]
+    education: List[dict]
+
+# Bump whenever the prompts below change so cached parses are not reused
+PROMPT_VERSION = "recruit-v1"
+
+# "summarise" summarises the resume before JSON extraction, "direct" extracts in a single call
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "summarise")
+# Prompt version for the parse cache: also changes with the extraction mode and chunk budget
+CACHE_VERSION = f"{PROMPT_VERSION}/{EXTRACTION_MODE}/{CHUNK_TOKEN_BUDGET}"
+
+# Prompt template for resume parsing
+prompt_template = PromptTemplate(
+    input_variables=["resume_text"],
+    template="""
+    Extract the following information from the resume:
+    - Name
+    - Email
+    - Phone
+    - Linkedin Look for any linkedin.com profile mentioned in the resume
+    - Summary
+    - Skills
+    - Certifications
+    - Experience with Roles and Responsibilities
+    - Education OR Academic Profile
+ 
+    Provide the output in JSON format with the following keys:
+    - Name
+    - Email
+    - Phone
+    - Linkedin
+    - Summary
+    - Skills
+    - Certifications
+    - Experience
+    - Education
+ 
+    For each experience, extract:
+    - Title
+    - Company
+    - Duration
+    - Roles and Responsibilities (as a list)
+ 
+    For each education entry, extract:
+    - Degree
+    - Institution
+    - Duration or Year
+ 
+    Resume text:
+    {resume_text}
+    """
+)
+ 
+# Initialize LLM
+llm = LlamaLLM()
+ 
+def read_resume(uploaded_file):
+    # uploaded_file is a Streamlit UploadedFile or an uploads.LocalUpload; raises on unsupported or unreadable files
+    if uploaded_file.type == "text/plain":
+        return uploaded_file.read().decode("utf-8")
+    elif uploaded_file.type == "application/pdf":
+        # Each page is extracted once; see pdf_extract for backends and page parallelism
+        return extract_pdf_text(uploaded_file)
+    elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        doc = Document(uploaded_file)
+        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    else:
+        raise ValueError("Unsupported file type")
+
+# Summarise instruction, also used by the self-correcting rating prompt
+summary_instruction = "Kindly provide summary of profile, ensuring to include full name, email address, phone number, only single list of technical skills without categorizing, details of business capabilities, an overview of functional capabilities and complete professional experience along with roles and responsibilities if any,special notes read the entire profile before summarising as there can be multiple prifile formats emmeded one below another, Read profile till the end and the summarise"
+
+# Self Correcting Prompt
+prompt_template2 = PromptTemplate(
+    input_variables=["parsed_response","prompt_temp"],
+    template="""
+    Please process the following parsed response, ensure it is correct as per following instructions {prompt_temp} and rate the relevance in match with {parsed_response}, provide rating from 1 to 10 and why the rating is provided:
+    """
+)
+
+def response_content(response):
+    if isinstance(response, tuple):
+        response = response[0]
+
+    if isinstance(response, dict) and "data" in response and "content" in response["data"]: # type: ignore
+        return response["data"]["content"] # type: ignore
+    return response
+
+def decode_parsed_response(parsed_response):
+    parsed_text = response_content(parsed_response)
+
+    if isinstance(parsed_text, str):
+        parsed_text = parsed_text.strip()
+        if parsed_text.startswith("```json"):
+            parsed_text = parsed_text.replace("```json", "").strip()
+        if parsed_text.endswith("```"):
+            parsed_text = parsed_text.replace("```", "").strip()
+        return json.loads(parsed_text)
+    return None
+
+def rating_prompt(parsed_response):
+    return prompt_template2.format(parsed_response=parsed_response, prompt_temp=summary_instruction)
+
+def rate_resume(parsed_response):
+    return response_content(llm._call(rating_prompt(parsed_response), user="user"))
+
+async def arate_resume(parsed_response):
+    return response_content(await llm._acall(rating_prompt(parsed_response), user="user"))
+
+def extract_fields(formatted_prompt, on_field=None):
+    # With on_field, stream the extraction and report each top-level field as it closes
+    if on_field is None:
+        return llm._call(prompt=formatted_prompt, user="user")
+    return collect_stream((chunk.text for chunk in llm._stream(formatted_prompt, user="user")), on_field)
+
+def extract_resume(resume_text, mode=None, on_field=None):
+    # Summarise -> extract for one piece of resume text; returns (parsed_resume, raw response)
+    if (mode or EXTRACTION_MODE) == "direct":
+        summarised_text = resume_text
+    else:
+        summarised_text = llm._call(summary_instruction + resume_text, user="user")
+    formatted_prompt = prompt_template.format(resume_text=summarised_text)
+    parsed_response = extract_fields(formatted_prompt, on_field)
+    #st.write(parsed_response)
+    return decode_parsed_response(parsed_response), parsed_response
+
+async def aextract_resume(resume_text, mode=None):
+    if (mode or EXTRACTION_MODE) == "direct":
+        summarised_text = resume_text
+    else:
+        summarised_text = await llm._acall(summary_instruction + resume_text, user="user")
+    formatted_prompt = prompt_template.format(resume_text=summarised_text)
+    parsed_response = await llm._acall(prompt=formatted_prompt, user="user")
+    return decode_parsed_response(parsed_response), parsed_response
+
+#New Code 
+def parse_resume(resume_text, on_rated=None, mode=None, on_field=None):
+    # Long, multi-profile documents are extracted chunk by chunk and merged
+    chunks = split_resume(resume_text)
+    if len(chunks) == 1:
+        parsed_resume, parsed_response = extract_resume(resume_text, mode, on_field)
+    else:
+        parsed_resume = map_chunks(chunks, lambda chunk: extract_resume(chunk, mode)[0])
+        parsed_response = json.dumps(parsed_resume)
+
+    # Self-correction rating runs off the critical path (see RATING_MODE)
+    if isinstance(parsed_resume, dict):
+        rating_stage.submit(lambda: rate_resume(parsed_response), parsed_resume, on_rated)
+
+    return parsed_resume
+
+# Async variant of parse_resume: the summarise -> extract -> rate stages run as coroutines
+async def aparse_resume(resume_text, on_rated=None, mode=None):
+    chunks = split_resume(resume_text)
+    if len(chunks) == 1:
+        parsed_resume, parsed_response = await aextract_resume(resume_text, mode)
+    else:
+        async def aextract_chunk(chunk):
+            return (await aextract_resume(chunk, mode))[0]
+        parsed_resume = await amap_chunks(chunks, aextract_chunk)
+        parsed_response = json.dumps(parsed_resume)
+
+    if isinstance(parsed_resume, dict):
+        rating_stage.asubmit(lambda: arate_resume(parsed_response), parsed_resume, on_rated)
+
+    return parsed_resume
+
+# Layouts by the names the UI shows them under
+LAYOUTS = {
+    "kallisti": layout1,
+    "phaedon": layout2,
+    "erasmos": layout3,
+}
+
+def renderer(layout_function):
+    # Bulk exports use the fast XML writer; picklable, so they can render on the process pool
+    return Renderer(layout_function, writer=BULK_DOCX_WRITER)
+
+def layout_id(layout_function):
+    # Identifies the output of renderer(layout_function) in export cache keys
+    return f"{layout_function.__name__}/{BULK_DOCX_WRITER}"
@@ -0,0 +1,248 @@
+# Headless batch processing: a folder of resumes in, a ZIP of formatted resumes out.
+#
+#   python -m resume_parser batch ./cvs out.zip --layout kallisti --workers 16
+#   python -m resume_parser batch ./cvs profiles.zip --agent sales
+#
+# Runs the same extraction, LLM client, parse cache and layouts as the Streamlit app without
+# importing Streamlit. Parsed results are appended to <out>.checkpoint.jsonl as they finish,
+# so an interrupted or crashed run picks up where it stopped; the ZIP is written atomically
+# once every resume has been parsed. The checkpoint holds [file name, parsed result, cache key]
+# lines and can be fed to bench_render.py --results.
+import os
+import sys
+import json
+import time
+import inspect
+import logging
+import argparse
+import importlib
+import tempfile
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from uploads import LocalUpload, iter_resume_files
+from parse_cache import parse_cache, cache_key
+from export import RENDER_WORKERS, zip_layouts
+from LLMLab45 import client_stats
+from rate_limit import BATCH, set_priority
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+# Same knob as the app's ingestion: resumes parsed at once, the LLM wrapper still caps requests per endpoint
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "8"))
+
+# Agent -> module with read_resume, parse_resume, CACHE_VERSION, llm, LAYOUTS and renderer
+AGENTS = {
+    "recruit": "recruit_core",
+    "sales": "sales_core",
+}
+
+
+def checkpoint_path(out_path):
+    return f"{out_path}.checkpoint.jsonl"
+
+
+def load_checkpoint(path):
+    # file name -> (cache key, parsed result); a line torn by a crash is ignored and re-parsed
+    done = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    file_name, parsed_result, key = json.loads(line)
+                except ValueError:
+                    continue
+                done[file_name] = (key, parsed_result)
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class Checkpoint:
+    """Append-only record of finished resumes; every line is flushed to disk before moving on."""
+
+    def __init__(self, path, fresh=False):
+        self.path = path
+        self.done = {} if fresh else load_checkpoint(path)
+        self._file = open(path, "w" if fresh else "a", encoding="utf-8")
+
+    def lookup(self, file_name, key):
+        entry = self.done.get(file_name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        return None
+
+    def record(self, file_name, key, parsed_result):
+        self._file.write(json.dumps([file_name, parsed_result, key]) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.done[file_name] = (key, parsed_result)
+
+    def close(self):
+        self._file.close()
+
+
+def parse_file(core, path, file_name, checkpoint):
+    # Returns (cache key, parsed result, source) where source is "checkpoint", "cache" or "parsed"
+    upload = LocalUpload(path)
+    key = cache_key(upload, core.CACHE_VERSION, core.llm.model_name)
+    parsed_result = checkpoint.lookup(file_name, key)
+    if parsed_result is not None:
+        return key, parsed_result, "checkpoint"
+    parsed_result = parse_cache.get(key)
+    if parsed_result is not None:
+        return key, parsed_result, "cache"
+
+    resume_text = core.read_resume(upload)
+    if not resume_text:
+        raise ValueError("Empty or unreadable resume text.")
+    kwargs = {}
+    if "on_rated" in inspect.signature(core.parse_resume).parameters:
+        kwargs["on_rated"] = partial(parse_cache.put, key)
+    parsed_result = core.parse_resume(resume_text, **kwargs)
+    if not isinstance(parsed_result, dict):
+        raise ValueError("Parsing returned no result.")
+    parse_cache.put(key, parsed_result)
+    return key, parsed_result, "parsed"
+
+
+def write_zip(out_path, parsed_results, render, workers):
+    # Atomic: a crash while rendering never leaves a truncated ZIP at out_path
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out_path)), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            zip_layouts(parsed_results, render, f, workers=workers)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def run_batch(in_dir, out_path, agent="recruit", layout="kallisti", workers=PARSE_WORKERS,
+              render_workers=RENDER_WORKERS, fresh=False, out=sys.stderr):
+    core = importlib.import_module(AGENTS[agent])
+    layout_function = core.LAYOUTS[layout]
+    paths = list(iter_resume_files(in_dir))
+    names = [os.path.relpath(path, in_dir) for path in paths]
+    total = len(paths)
+    results = [None] * total
+    errors = []
+    counts = {"checkpoint": 0, "cache": 0, "parsed": 0}
+    llm_before = client_stats()
+    start = time.perf_counter()
+
+    checkpoint = Checkpoint(checkpoint_path(out_path), fresh)
+    # Batch priority: a recruiter's single upload in the app goes ahead of this run for the LLM budget
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), initializer=set_priority, initargs=(BATCH,))
+    interrupted = False
+    try:
+        futures = {
+            pool.submit(parse_file, core, path, file_name, checkpoint): i
+            for i, (path, file_name) in enumerate(zip(paths, names))
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                key, parsed_result, source = future.result()
+            except Exception as e:
+                logging.error(f"Batch: failed to parse {names[i]}: {e}")
+                errors.append((names[i], str(e)))
+                print(f"[{done}/{total}] FAILED {names[i]}: {e}", file=out)
+                continue
+            if source != "checkpoint":
+                checkpoint.record(names[i], key, parsed_result)
+            results[i] = parsed_result
+            counts[source] += 1
+            print(f"[{done}/{total}] {source:<10} {names[i]}", file=out)
+    except KeyboardInterrupt:
+        # Do not wait for LLM calls already in flight (and their retries); the checkpoint has what finished
+        interrupted = True
+        pool.shutdown(wait=False, cancel_futures=True)
+        print(f"Interrupted; {len(checkpoint.done)} results are checkpointed. Run again to resume.", file=out)
+        raise
+    finally:
+        if not interrupted:
+            pool.shutdown(wait=True)
+        checkpoint.close()
+    parse_seconds = time.perf_counter() - start
+
+    parsed_results = [(file_name, result) for file_name, result in zip(names, results) if result is not None]
+    render_seconds = 0.0
+    if parsed_results:
+        start = time.perf_counter()
+        write_zip(out_path, parsed_results, core.renderer(layout_function), render_workers)
+        render_seconds = time.perf_counter() - start
+
+    llm_after = client_stats()
+    stats = {
+        "files": total,
+        "from_checkpoint": counts["checkpoint"],
+        "cache_hits": counts["cache"],
+        "parsed": counts["parsed"],
+        "failed": len(errors),
+        "parse_seconds": parse_seconds,
+        "parsed_per_minute": counts["parsed"] * 60 / parse_seconds if parse_seconds else 0.0,
+        "llm_requests": llm_after["requests"] - llm_before["requests"],
+        "llm_tokens": (llm_after["prompt_tokens"] - llm_before["prompt_tokens"])
+                      + (llm_after["completion_tokens"] - llm_before["completion_tokens"]),
+        "rendered": len(parsed_results),
+        "render_seconds": render_seconds,
+        "rendered_per_second": len(parsed_results) / render_seconds if render_seconds else 0.0,
+        "zip_bytes": os.path.getsize(out_path) if parsed_results else 0,
+    }
+    return stats, errors
+
+
+def print_stats(stats, errors, out_path, out=sys.stderr):
+    print(f"\nFiles: {stats['files']}  parsed: {stats['parsed']}  cache hits: {stats['cache_hits']}  "
+          f"from checkpoint: {stats['from_checkpoint']}  failed: {stats['failed']}", file=out)
+    print(f"Parse: {stats['parse_seconds']:.1f}s, {stats['parsed_per_minute']:.1f} resumes/min, "
+          f"{stats['llm_requests']} LLM requests, ~{stats['llm_tokens']} tokens", file=out)
+    if stats["rendered"]:
+        print(f"Render: {stats['rendered']} documents in {stats['render_seconds']:.1f}s "
+              f"({stats['rendered_per_second']:.1f}/s), {stats['zip_bytes'] / 1024 / 1024:.1f} MB -> {out_path}", file=out)
+    else:
+        print("Render: nothing to render, no ZIP written", file=out)
+    for file_name, error in errors:
+        print(f"  failed: {file_name}: {error}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resume_parser", description="Headless resume parsing and formatting.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    batch = commands.add_parser("batch", help="parse a folder of resumes and write one ZIP of formatted resumes")
+    batch.add_argument("in_dir", help="folder of PDF/DOCX/TXT resumes (searched recursively)")
+    batch.add_argument("out_zip", help="ZIP to write; <out_zip>.checkpoint.jsonl records progress")
+    batch.add_argument("--agent", choices=sorted(AGENTS), default="recruit", help="prompt set and layouts to use")
+    batch.add_argument("--layout", default="kallisti", help="layout name as shown in the app (default: kallisti)")
+    batch.add_argument("--workers", type=int, default=PARSE_WORKERS, help="resumes parsed concurrently")
+    batch.add_argument("--render-workers", type=int, default=RENDER_WORKERS, help="processes rendering the ZIP")
+    batch.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint and start over")
+    batch.add_argument("--stats-json", help="also write the run statistics to this file")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.in_dir):
+        parser.error(f"{args.in_dir} is not a folder")
+    layouts = importlib.import_module(AGENTS[args.agent]).LAYOUTS
+    if args.layout.lower() not in layouts:
+        parser.error(f"unknown layout {args.layout!r} for the {args.agent} agent; choose from {', '.join(layouts)}")
+
+    try:
+        stats, errors = run_batch(args.in_dir, args.out_zip, args.agent, args.layout.lower(), args.workers,
+                                  args.render_workers, args.fresh)
+    except KeyboardInterrupt:
+        # sys.exit would join the parse threads still waiting on the LLM; the checkpoint is already closed
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(130)
+    print_stats(stats, errors, args.out_zip)
+    if args.stats_json:
+        with open(args.stats_json, "w", encoding="utf-8") as f:
+            json.dump({"stats": stats, "errors": errors}, f, indent=2)
+    sys.exit(1 if errors or not stats["rendered"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
-pip install streamlit python-docx pdfplumber pydantic python-dotenv langchain langchain_core langchain_community langchain_ollama python-pptx bcrypt
+pip install streamlit python-docx pdfplumber pypdfium2 pydantic python-dotenv langchain langchain_core langchain_community langchain_ollama python-pptx bcrypt httpx starlette uvicorn python-multipart
 python -m streamlit run app.py --server.port 8000 --server.address 0.0.0.0
\ No newline at end of file
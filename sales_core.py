@@ -0,0 +1,211 @@
+# Sales agent core: prompts, LLM extraction and the profile deck layout, without any Streamlit
+# dependency. ppt.py puts the Streamlit UI on top; resume_parser.py runs the same code headless.
+# Errors are raised rather than reported, so each front end reports them its own way.
+import os
+import json
+import logging
+from typing import List
+
+from docx import Document
+from pydantic import BaseModel
+from langchain.prompts import PromptTemplate
+
+from LLMLab45 import LlamaLLM  # Your custom LLM wrapper
+from pdf_extract import extract_pdf_text
+from json_stream import collect_stream
+from chunking import split_resume, map_chunks, amap_chunks, CHUNK_TOKEN_BUDGET
+from export import Renderer
+from assets import LOGO, asset_version
+from pptcreation import layout5
+
+# Configure logging
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+#logo
+image_path = LOGO
+
+# Define the Pydantic model for structured output
+class Resume(BaseModel):
+    name: str
+    email: str
+    phone: str
+    linkedin: str
+    summary: str
+    skills: List[str]
+    certifications: List[str]
+    experience: List[dict]
+    education: List[dict]
+     
+# Bump whenever the prompts below change so cached parses are not reused
+PROMPT_VERSION = "sales-v1"
+
+# "summarise" summarises the resume before JSON extraction, "direct" extracts in a single call
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "summarise")
+# Prompt version for the parse cache: also changes with the extraction mode and chunk budget
+CACHE_VERSION = f"{PROMPT_VERSION}/{EXTRACTION_MODE}/{CHUNK_TOKEN_BUDGET}"
+
+# Prompt template for resume parsing
+prompt_template = PromptTemplate(
+    input_variables=["resume_text"],
+    template="""
+Extract the following information from the resume:
+ 
+- Name
+- Email
+- Phone
+- Linkedin (look for any linkedin.com profile or link mentioned in the Profile)
+- Summary (summarize within 500 characters)
+- Roles Played
+- Areas of Expertise
+- Skills (Populate Top 15 skills based on your understanding of the complete profile)
+- Industry Sectors
+- Consulting Engagements (Only take the Top 5 engagements name where person have performed a Consultant role as per profile)
+- Education or Academic Profile and Certifications
+- Experience and Accomplishments
+ 
+Provide the output in JSON format with the following keys:
+- Name
+- Email
+- Phone
+- Linkedin
+- Summary
+- Roles Played
+- Areas of Expertise
+- Skills
+- Industry Sectors
+- Consulting Engagements
+- Education or Academic Profile and Certifications
+- Experience and Accomplishments
+ 
+### Parsing Instructions:
+ 
+**Roles Played**:
+- From the experience section, extract all distinct roles the individual has held.
+ 
+**Industry Sectors**:
+- From the experience section, identify the domains or industries the individual has worked in (e.g., Healthcare, Finance, Retail).
+ 
+**Areas of Expertise**:
+- Identify domains, technologies, methodologies, or roles the individual has demonstrated experience in.
+- Focus on what they have done, built, led, or contributed to.
+- Present the output as a list of implicit areas of expertise, grouped by category if possible (e.g., Technical Domains, Tools & Technologies, Business Functions, etc.).
+ 
+**Experience and Accomplishments**:
+For each professional experience listed in the resume, extract the following details:
+- Title
+- Company
+- Duration
+- Location (if available)
+- Detailed Roles and Responsibilities:
+    - List each responsibility as a separate bullet point.
+    - Include both technical and managerial responsibilities.
+    - Capture any leadership, mentoring, or cross-functional collaboration.
+    - Include tools, technologies, or methodologies used.
+    - If achievements or outcomes are mentioned (e.g., improved performance, cost savings), include them as part of the responsibility.
+    - Maintain the original context and phrasing as much as possible, but ensure clarity.
+    - Ensure completeness—do not summarize or omit relevant details.
+ 
+**Education or Academic Profile and Certifications**:
+For each education entry, extract:
+- Degree
+- Institution
+- Duration or Year
+ 
+Resume text:
+{resume_text}
+"""
+)
+ 
+# Initialize LLM
+llm = LlamaLLM()
+ 
+def read_resume(uploaded_file):
+    # uploaded_file is a Streamlit UploadedFile or an uploads.LocalUpload; raises on unsupported or unreadable files
+    if uploaded_file.type == "text/plain":
+        return uploaded_file.read().decode("utf-8")
+    elif uploaded_file.type == "application/pdf":
+        # Each page is extracted once; see pdf_extract for backends and page parallelism
+        return extract_pdf_text(uploaded_file)
+    elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        doc = Document(uploaded_file)
+        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    else:
+        raise ValueError("Unsupported file type")
+ 
+summary_instruction = "Kindly provide summary of profile, ensuring to include full name, email address, phone number, only single list of technical skills without categorizing, details of business capabilities, an overview of functional capabilities and complete professional experience along with roles and responsibilities if any, special notes read the entire profile before summarising as there can be multiple profile formats embedded one below another. Read profile till the end and then summarise."
+
+def response_content(response):
+    if isinstance(response, tuple):
+        response = response[0]
+ 
+    if isinstance(response, dict) and "data" in response and "content" in response["data"]: # type: ignore
+        return response["data"]["content"] # type: ignore
+    return response  # fallback if already a string
+
+def decode_parsed_response(parsed_response):
+    parsed_text = response_content(parsed_response)
+ 
+    if isinstance(parsed_text, str):
+        parsed_text = parsed_text.strip()
+        if parsed_text.startswith("```json"):
+            parsed_text = parsed_text.replace("```json", "").strip()
+        if parsed_text.endswith("```"):
+            parsed_text = parsed_text.replace("```", "").strip()
+        return json.loads(parsed_text)
+    else:
+        raise ValueError("Parsed content is not a string")
+ 
+def extract_fields(formatted_prompt, on_field=None):
+    # With on_field, stream the extraction and report each top-level field as it closes
+    if on_field is None:
+        return llm._call(prompt=formatted_prompt, user="user")
+    return collect_stream((chunk.text for chunk in llm._stream(formatted_prompt, user="user")), on_field)
+ 
+def extract_resume(resume_text, mode=None, on_field=None):
+    # Summarise -> extract for one piece of resume text
+    if (mode or EXTRACTION_MODE) == "direct":
+        summarised_text = resume_text
+    else:
+        summarised_text = response_content(llm._call(summary_instruction + resume_text, user="user"))
+ 
+    formatted_prompt = prompt_template.format(resume_text=summarised_text)
+    parsed_response = extract_fields(formatted_prompt, on_field)
+ 
+    return decode_parsed_response(parsed_response)
+ 
+async def aextract_resume(resume_text, mode=None):
+    if (mode or EXTRACTION_MODE) == "direct":
+        summarised_text = resume_text
+    else:
+        summarised_text = response_content(await llm._acall(summary_instruction + resume_text, user="user"))
+ 
+    formatted_prompt = prompt_template.format(resume_text=summarised_text)
+    parsed_response = await llm._acall(prompt=formatted_prompt, user="user")
+ 
+    return decode_parsed_response(parsed_response)
+ 
+def parse_resume(resume_text, mode=None, on_field=None):
+    # Long, multi-profile documents are extracted chunk by chunk and merged
+    chunks = split_resume(resume_text)
+    if len(chunks) == 1:
+        return extract_resume(resume_text, mode, on_field)
+    return map_chunks(chunks, lambda chunk: extract_resume(chunk, mode))
+
+# Async variant of parse_resume for the event-loop ingestion mode
+async def aparse_resume(resume_text, mode=None):
+    chunks = split_resume(resume_text)
+    if len(chunks) == 1:
+        return await aextract_resume(resume_text, mode)
+    return await amap_chunks(chunks, lambda chunk: aextract_resume(chunk, mode))
+
+# Layouts by the names the UI shows them under
+LAYOUTS = {
+    "kallisti": layout5,
+}
+
+def renderer(layout_function):
+    return Renderer(layout_function, image_path=image_path)
+
+def layout_id(layout_function):
+    # The logo's content hash is part of the id: replacing the file rebuilds cached exports
+    return f"{layout_function.__name__}/{asset_version(image_path)}"
@@ -0,0 +1,75 @@
+import copy
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class _Abandoned(Exception):
+    # The leading call was cancelled or interrupted; waiters start a flight of their own
+    pass
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; callers arriving meanwhile share its outcome.
+
+    A flight is a concurrent.futures.Future, so threads and coroutines on any event loop can
+    wait on the same call. The leader's exception is raised in every waiter. Waiters get a
+    deep copy of the result, so nobody sees another caller's changes to it.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.stats = {"flights": 0, "coalesced": 0}
+
+    def _join(self, key):
+        # (flight, leads)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Future()
+                self.stats["flights"] += 1
+                return flight, True
+            self.stats["coalesced"] += 1
+            return flight, False
+
+    def _land(self, key, flight, result=None, error=None):
+        with self._lock:
+            del self._flights[key]
+        if error is None:
+            flight.set_result(result)
+        else:
+            flight.set_exception(error if isinstance(error, Exception) else _Abandoned())
+
+    def do(self, key, fn):
+        while True:
+            flight, leads = self._join(key)
+            if leads:
+                try:
+                    result = fn()
+                except BaseException as e:
+                    self._land(key, flight, error=e)
+                    raise
+                self._land(key, flight, result)
+                return result
+            try:
+                return copy.deepcopy(flight.result())
+            except _Abandoned:
+                continue
+
+    async def ado(self, key, afn):
+        while True:
+            flight, leads = self._join(key)
+            if leads:
+                try:
+                    result = await afn()
+                except BaseException as e:
+                    self._land(key, flight, error=e)
+                    raise
+                self._land(key, flight, result)
+                return result
+            try:
+                # shield: a waiter being cancelled must not cancel the shared flight
+                return copy.deepcopy(await asyncio.shield(asyncio.wrap_future(flight)))
+            except _Abandoned:
+                continue
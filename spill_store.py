@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+
+# Configure logging to enabled
+logging.basicConfig(filename='resume_generator.log', level=logging.ERROR, format='%(asctime)s:%(levelname)s:%(message)s')
+
+SPILL_DIR = os.getenv("SPILL_DIR", os.path.join(os.path.expanduser("~"), "Documents", "resumeparser", "spill"))
+# Batches with at least this many parsed resumes are kept on disk rather than in session state
+SPILL_THRESHOLD = int(os.getenv("SPILL_THRESHOLD", "5"))
+SPILL_TTL_SECONDS = int(os.getenv("SPILL_TTL_HOURS", "24")) * 3600
+# How many batches a session remembers (the CV-2-CSV page only reads the latest)
+MAX_SESSION_BATCHES = int(os.getenv("MAX_SESSION_BATCHES", "5"))
+
+
+class SpilledResults:
+    """Handle to a batch of (file_name, parsed_result) pairs stored as JSON lines on disk.
+
+    Iterating streams the batch back one resume at a time, so callers such as pd2csv
+    work unchanged without the whole batch living in session state.
+    """
+
+    def __init__(self, batch_id, path, count):
+        self.batch_id = batch_id
+        self.path = path
+        self.count = count
+
+    def __iter__(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    file_name, parsed_result = json.loads(line)
+                    yield file_name, parsed_result
+        except FileNotFoundError:
+            logging.error(f"Spilled results {self.batch_id} have expired")
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+
+def _batch_id(parsed_results):
+    digest = hashlib.sha256()
+    for file_name, parsed_result in parsed_results:
+        digest.update(json.dumps([file_name, parsed_result], sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _collect_garbage(now):
+    for name in os.listdir(SPILL_DIR):
+        path = os.path.join(SPILL_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > SPILL_TTL_SECONDS:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def spill(parsed_results):
+    # Content-addressed: the same batch on every rerun maps to the same file
+    os.makedirs(SPILL_DIR, exist_ok=True)
+    batch_id = _batch_id(parsed_results)
+    path = os.path.join(SPILL_DIR, f"{batch_id}.jsonl")
+    now = time.time()
+    if os.path.exists(path):
+        os.utime(path, (now, now))
+    else:
+        fd, tmp_path = tempfile.mkstemp(dir=SPILL_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for file_name, parsed_result in parsed_results:
+                f.write(json.dumps([file_name, parsed_result]) + "\n")
+        os.replace(tmp_path, path)
+        _collect_garbage(now)
+    return SpilledResults(batch_id, path, len(parsed_results))
+
+
+def remember_results(batches, parsed_results):
+    # Returns the session's new batch list: big batches are spilled, reruns are not duplicated
+    if not parsed_results:
+        return batches
+    if len(parsed_results) >= SPILL_THRESHOLD:
+        try:
+            entry = spill(parsed_results)
+        except OSError as e:
+            logging.error(f"Error spilling parsed results: {e}")
+            entry = parsed_results
+    else:
+        entry = parsed_results
+    if batches:
+        last = batches[-1]
+        if isinstance(last, SpilledResults) and isinstance(entry, SpilledResults):
+            if last.batch_id == entry.batch_id:
+                return batches
+        elif last == entry:
+            return batches
+    return (list(batches) + [entry])[-MAX_SESSION_BATCHES:]
@@ -0,0 +1,128 @@
+# Streaming extraction against a local stand-in for the LLM endpoint.
+#
+#   python -m pytest -q test_llm_stream.py
+#
+# The stand-in answers every POST with a canned body sent as HTTP/1.1 chunks cut at the
+# given byte offsets, so events, lines and multi-byte characters arrive split across chunks.
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from LLMLab45 import LlamaLLM
+from json_stream import collect_stream
+
+RESUME = {"Name": "Zoë Brontë", "Email": "zoe@example.com", "Skills": ["Python", "SQL"],
+          "Experience": [{"Title": "Engineer", "Company": "Acme"}]}
+CONTENT = "```json\n" + json.dumps(RESUME, ensure_ascii=False) + "\n```"
+
+
+def _pieces(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def sse_body(content, size=7):
+    events = [f"data: {json.dumps({'data': {'content': piece}}, ensure_ascii=False)}\n\n" for piece in _pieces(content, size)]
+    return ": keep-alive\n\nevent: message\n" + "".join(events) + "data: [DONE]\n\n"
+
+
+def ndjson_body(content, size=5):
+    return "".join(json.dumps({"choices": [{"delta": {"content": piece}}]}, ensure_ascii=False) + "\n" for piece in _pieces(content, size))
+
+
+def envelope_body(content):
+    return json.dumps({"data": {"content": content}, "usage": {"prompt_tokens": 10, "completion_tokens": 20}},
+                      ensure_ascii=False)
+
+
+class StandIn:
+    """Serves one canned (content type, body) and cuts it at the given byte offsets."""
+
+    def __init__(self):
+        self.content_type = "text/plain"
+        self.body = b""
+        self.cuts = ()
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                stand_in.requests.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(200)
+                self.send_header("Content-Type", stand_in.content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                body, start = stand_in.body, 0
+                for end in list(stand_in.cuts) + [len(body)]:
+                    if end > start:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (end - start, body[start:end]))
+                        self.wfile.flush()
+                        start = end
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/completion"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def serve(self, content_type, body, cuts):
+        self.content_type = content_type
+        self.body = body.encode("utf-8")
+        self.cuts = sorted(cut for cut in cuts if 0 < cut < len(self.body))
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = StandIn()
+    monkeypatch.setenv("TOKEN", "Bearer test")
+    monkeypatch.setattr(LlamaLLM, "llm_url", server.url)
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _stream(server, content_type, body, cuts):
+    server.serve(content_type, body, cuts)
+    fields = []
+    text = collect_stream((chunk.text for chunk in LlamaLLM()._stream("prompt", user="user")),
+                          lambda key, value: fields.append(key))
+    assert server.requests[-1]["stream_response"] is True
+    return json.loads(text.strip().removeprefix("```json").removesuffix("```")), fields
+
+
+BODIES = {
+    "sse": ("text/event-stream; charset=utf-8", sse_body(CONTENT)),
+    "ndjson": ("application/x-ndjson", ndjson_body(CONTENT)),
+    "json fallback": ("application/json", envelope_body(CONTENT)),
+}
+
+
+@pytest.mark.parametrize("kind", sorted(BODIES))
+@pytest.mark.parametrize("step", [1, 3, 17, 256])
+def test_stream_split_at_byte_boundaries(stand_in, kind, step):
+    content_type, body = BODIES[kind]
+    cuts = range(step, len(body.encode("utf-8")), step)
+    result, fields = _stream(stand_in, content_type, body, cuts)
+    assert result == RESUME
+    assert fields == list(RESUME)
+
+
+@pytest.mark.parametrize("kind", sorted(BODIES))
+def test_stream_split_inside_multibyte_character(stand_in, kind):
+    content_type, body = BODIES[kind]
+    encoded = body.encode("utf-8")
+    start = encoded.index("ë".encode("utf-8"))
+    result, _ = _stream(stand_in, content_type, body, [start + 1, start + 2, start + 3])
+    assert result == RESUME
+
+
+def test_json_fallback_is_not_parsed_as_fields(stand_in):
+    # The envelope's own keys ("data", "usage") must never surface as resume fields
+    result, fields = _stream(stand_in, "application/json", envelope_body(CONTENT), [12, 40])
+    assert "data" not in fields and "usage" not in fields
+    assert result == RESUME
@@ -0,0 +1,151 @@
+import os
+from functools import lru_cache
+from collections import namedtuple
+
+from pdfminer.fontmetrics import FONT_METRICS
+
+# Text measurement for fixed-size text boxes: widths come from the standard AFM metrics that
+# pdfminer (via pdfplumber) already ships, so sizing needs no font files and no rendering.
+# Everything is in points; glyph widths are in 1/1000 em.
+
+# Smallest scale a box may shrink its text to before the rest is carried over
+FIT_MIN_SCALE = float(os.getenv("FIT_MIN_SCALE", "0.6"))
+FIT_SCALE_STEP = 0.05
+# Single line spacing as a multiple of the font size
+LINE_SPACING = 1.2
+
+# Metrics name -> (regular, bold); unknown fonts are measured as Helvetica
+_FONTS = {
+    "Helvetica": ("Helvetica", "Helvetica-Bold"),
+    "Arial": ("Helvetica", "Helvetica-Bold"),
+    "Times New Roman": ("Times-Roman", "Times-Bold"),
+    "Courier New": ("Courier", "Courier-Bold"),
+}
+
+# tag is passed through untouched for the caller; keep_with_next moves a trailing heading
+# to the next page rather than leaving it alone at the bottom of a box
+Paragraph = namedtuple("Paragraph", "text size bold indent tag keep_with_next", defaults=(False, 0, None, False))
+Fit = namedtuple("Fit", "scale head rest")
+
+
+def _metrics(font, bold):
+    regular, heavy = _FONTS.get(font, _FONTS["Helvetica"])
+    widths = FONT_METRICS[heavy if bold else regular][1]
+    return widths, widths.get("n", 556)
+
+
+@lru_cache(maxsize=65536)
+def word_units(word, font="Helvetica", bold=False):
+    widths, default = _metrics(font, bold)
+    return sum(widths.get(ch, default) for ch in word)
+
+
+def text_width(text, size, font="Helvetica", bold=False):
+    return word_units(text, font, bold) * size / 1000
+
+
+def scaled(size, scale):
+    # Font sizes are kept to half points
+    return max(round(size * scale * 2) / 2, 1)
+
+
+def _break_word(word, limit, font, bold):
+    # A word wider than the line is broken between characters, as PowerPoint and Word do
+    pieces, piece = [], ""
+    for ch in word:
+        if piece and word_units(piece + ch, font, bold) > limit:
+            pieces.append(piece)
+            piece = ch
+        else:
+            piece += ch
+    return pieces + [piece]
+
+
+def wrap(text, width, size, font="Helvetica", bold=False):
+    # Greedy word wrap. Returns (line, ends_segment) pairs; ends_segment marks a hard break.
+    limit = width * 1000 / size
+    space = word_units(" ", font, bold)
+    lines = []
+    for segment in text.split("\n"):
+        line, used = [], 0
+        for word in segment.split(" "):
+            units = word_units(word, font, bold)
+            if line and used + space + units > limit:
+                lines.append((" ".join(line), False))
+                line, used = [], 0
+            if not line and units > limit:
+                *full, word = _break_word(word, limit, font, bold)
+                lines.extend((piece, False) for piece in full)
+                units = word_units(word, font, bold)
+            used += units + (space if line else 0)
+            line.append(word)
+        lines.append((" ".join(line), True))
+    return lines
+
+
+def _lines(paragraph, width, scale, font):
+    size = scaled(paragraph.size, scale)
+    return wrap(paragraph.text, width - paragraph.indent, size, font, paragraph.bold), size * LINE_SPACING
+
+
+def height(paragraphs, width, scale=1.0, font="Helvetica"):
+    total = 0
+    for paragraph in paragraphs:
+        lines, line_height = _lines(paragraph, width, scale, font)
+        total += len(lines) * line_height
+    return total
+
+
+def scales(min_scale=FIT_MIN_SCALE):
+    steps = int(round((1 - min_scale) / FIT_SCALE_STEP))
+    return [round(1 - i * FIT_SCALE_STEP, 4) for i in range(steps + 1)]
+
+
+def _split(paragraph, lines, keep):
+    head, rest = lines[:keep], lines[keep:]
+    text = lambda part: "".join(line + ("\n" if hard else " ") for line, hard in part)[:-1]
+    return paragraph._replace(text=text(head)), paragraph._replace(text=text(rest))
+
+
+def fit(paragraphs, width, box_height, min_scale=FIT_MIN_SCALE, font="Helvetica"):
+    """Largest scale (of scales(min_scale)) at which paragraphs fit width x box_height.
+
+    Heights shrink monotonically with the scale, so the ladder is bisected. If even
+    min_scale is too big, head is what fits at min_scale (the last paragraph split between
+    lines) and rest is carried over; rest is then never empty and head always holds at
+    least one line, so paginating rest terminates.
+    """
+    paragraphs = list(paragraphs)
+    ladder = scales(min_scale)
+    if height(paragraphs, width, ladder[-1], font) <= box_height:
+        lo, hi = 0, len(ladder) - 1  # ladder[hi] fits
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if height(paragraphs, width, ladder[mid], font) <= box_height:
+                hi = mid
+            else:
+                lo = mid + 1
+        return Fit(ladder[hi], paragraphs, [])
+
+    scale = ladder[-1]
+    head, used = [], 0
+    for i, paragraph in enumerate(paragraphs):
+        lines, line_height = _lines(paragraph, width, scale, font)
+        if used + len(lines) * line_height <= box_height:
+            head.append(paragraph)
+            used += len(lines) * line_height
+            continue
+        keep = int((box_height - used) // line_height)
+        if not head and keep < 1:
+            keep = 1  # the box cannot hold a line: place one anyway so pagination advances
+        rest = paragraphs[i + 1:]
+        if keep > 0:
+            first, remainder = _split(paragraph, lines, keep)
+            head.append(first)
+            rest = [remainder] + rest
+        else:
+            rest = [paragraph] + rest
+        while len(head) > 1 and head[-1].keep_with_next:
+            rest.insert(0, head.pop())
+        return Fit(scale, head, rest)
+    return Fit(scale, head, [])
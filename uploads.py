@@ -0,0 +1,42 @@
+import io
+import os
+import mimetypes
+
+SUPPORTED_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+
+def upload_type(name, content_type=None):
+    # The extension wins: HTTP clients often send application/octet-stream for any file
+    extension = os.path.splitext(name)[1].lower()
+    return SUPPORTED_TYPES.get(extension) or content_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+class BytesUpload(io.BytesIO):
+    """File content in memory that quacks like Streamlit's UploadedFile (name, type, getvalue)."""
+
+    def __init__(self, data, name, content_type=None):
+        super().__init__(data)
+        self.name = name
+        self.type = upload_type(name, content_type)
+        self.size = len(self.getbuffer())
+
+
+class LocalUpload(BytesUpload):
+    """A file on disk as an upload."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read(), os.path.basename(path))
+        self.path = path
+
+
+def iter_resume_files(folder):
+    # Supported resumes under folder, in a stable order
+    for root, _, files in sorted(os.walk(folder)):
+        for file in sorted(files):
+            if os.path.splitext(file)[1].lower() in SUPPORTED_TYPES:
+                yield os.path.join(root, file)